@@ -18,6 +18,7 @@ ENCODING = "utf-8"
 APP_LOG_FILE = LOG_DIR / "app.log"
 ERROR_LOG_FILE = LOG_DIR / "error.log"
 REQUEST_LOG_FILE = LOG_DIR / "request.log"
+SLOW_QUERY_LOG_FILE = LOG_DIR / "slow_query.log"
 
 # --- Formatters ---
 formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
@@ -69,7 +70,17 @@ if not request_logger.hasHandlers():
     request_logger.addHandler(request_file_handler)
 
 
-# 3. Root Logger Configuration
+# 3. Slow Query Logger (Isolated)
+slow_query_logger = logging.getLogger("slow_query")
+slow_query_logger.setLevel(logging.INFO)
+slow_query_logger.propagate = False
+
+if not slow_query_logger.hasHandlers():
+    slow_query_file_handler = get_file_handler(SLOW_QUERY_LOG_FILE, backup_count=5)
+    slow_query_logger.addHandler(slow_query_file_handler)
+
+
+# 4. Root Logger Configuration
 # Configure root logger to capture logs from libraries, but prevent hijacking by others
 root_logger = logging.getLogger()
 if not root_logger.hasHandlers():
@@ -77,7 +88,7 @@ if not root_logger.hasHandlers():
     root_logger.addHandler(get_console_handler())
 
 
-# 4. External Library Log Suppression
+# 5. External Library Log Suppression
 # Suppress noisy loggers from external libraries
 NOISY_LOGGERS = ["mcp", "fastmcp", "livekit.agents.mcp", "httpcore", "httpx"]
 for logger_name in NOISY_LOGGERS:
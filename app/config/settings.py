@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from functools import lru_cache
 
 from dotenv import load_dotenv
@@ -23,6 +23,109 @@ class Settings(BaseSettings):
     # Capture DATABASE_URL from environment (e.g. Render)
     DATABASE_URL_ENV: Optional[str] = Field(None, validation_alias="DATABASE_URL")
 
+    # Connection pool (sizes are per worker process, e.g. per gunicorn UvicornWorker)
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_CHECKOUT_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    DB_POOL_MAX_IDLE: float = 300.0  # idle connections above min size are closed after this
+    DB_POOL_MAX_LIFETIME: float = 3600.0  # connections are recycled after this
+    DB_POOL_HEALTH_CHECK_AFTER: float = 30.0  # ping connections idle longer than this on checkout
+    DB_POOL_REAP_INTERVAL: float = 60.0
+    DB_ASYNC_POOL_SIZE: int = 5  # asyncpg engine used by the async read routes
+
+    # Read replicas (comma-separated DSNs); read-only service methods are routed to them
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    DB_REPLICA_POOL_MIN_SIZE: int = 1
+    DB_REPLICA_POOL_MAX_SIZE: int = 10
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas lagging more than this are skipped
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0  # users read from the primary this long after writing
+
+    # Query instrumentation
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # statements slower than this go to logs/slow_query.log
+    N_PLUS_ONE_THRESHOLD: int = 10  # warn when one statement shape runs more often than this per request
+
+    # Statement timeouts in ms (0 disables). Per-route budgets are keyed by
+    # "METHOD /path-prefix"; the longest matching prefix wins. Override with JSON,
+    # e.g. DB_ROUTE_STATEMENT_TIMEOUTS='{"GET /knowledge": 3000}'
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_ROUTE_STATEMENT_TIMEOUTS: Dict[str, int] = {
+        "GET /knowledge": 5000,
+        "GET /stakeholders": 5000,
+        "GET /organisations": 5000,
+        "GET /users": 5000,
+    }
+
+    # Rows per round trip for streamed (server-side cursor) list endpoints
+    DB_STREAM_FETCH_SIZE: int = 500
+
+    # Build response DTOs from DB rows without re-validating them (see app/db/mapping.py)
+    DB_VALIDATE_ROWS: bool = False
+
+    # Rows per COPY batch for bulk loads (see app/db/bulk.py); also the ids reserved per batch
+    DB_COPY_CHUNK_SIZE: int = 10000
+
+    # POST /knowledge/bulk: rows per transaction, and the largest accepted JSON record in bytes
+    KNOWLEDGE_BULK_BATCH_ROWS: int = 5000
+    KNOWLEDGE_BULK_MAX_RECORD_BYTES: int = 1048576
+
+    # Server-side prepared statements (disable behind transaction-pooling PgBouncer)
+    DB_PREPARED_STATEMENTS: bool = True
+    DB_PREPARED_STATEMENTS_PER_CONNECTION: int = 128
+
+    # List endpoints with count=capped stop counting here and report "COUNT_CAP+"
+    COUNT_CAP: int = 1000
+
+    # Knowledge search: minimum pg_trgm word_similarity() for fuzzy=true matches (0-1)
+    KNOWLEDGE_FUZZY_THRESHOLD: float = 0.3
+
+    # Per-worker cache of knowledge search pages (see app/db/result_cache.py)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+    SEARCH_CACHE_TTL_SECONDS: float = 30.0  # writes invalidate in every worker at commit (migration 0009)
+
+    # Knowledge search projection=snippet: excerpt length (characters) and ts_headline options;
+    # StartSel/StopSel are always the non-HTML markers of KnowledgeSnippet.snippet
+    KNOWLEDGE_SNIPPET_CHARS: int = 300
+    KNOWLEDGE_HEADLINE_OPTIONS: str = "MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter=\" ... \""
+
+    # GET /knowledge/facets: tags and stakeholders returned per facet (default `top`), and whether
+    # unfiltered requests read the trigger-maintained knowledge_facet_counts (migration 0007)
+    KNOWLEDGE_FACET_TOP_N: int = 20
+    KNOWLEDGE_FACET_COUNTERS: bool = True
+
+    # Knowledge search mode=hybrid: weighted reciprocal rank fusion of full-text and vector hits
+    HYBRID_CANDIDATES: int = 100  # hits taken from each ranking before fusing (and the max total)
+    HYBRID_RRF_K: int = 60  # rank damping; higher flattens the gap between top and lower ranks
+    HYBRID_LEXICAL_WEIGHT: float = 1.0
+    HYBRID_VECTOR_WEIGHT: float = 1.0
+
+    # Semantic search: per-worker cache of client embedding matrices (see app/vector/matrix_cache.py)
+    EMBEDDING_CACHE_MAX_CLIENTS: int = 32
+    EMBEDDING_CACHE_TTL_SECONDS: float = 300.0  # idle matrices are rebuilt after this; writes rebuild on the next search
+    EMBEDDING_SEARCH_BLOCK_ROWS: int = 65536  # rows scored per matrix multiplication
+
+    # Embedding backfill (see app/vector/backfill.py and backfill_embeddings.py). With
+    # KNOWLEDGE_EMBED_ON_WRITE off, new entries are stored without an embedding and left to it.
+    KNOWLEDGE_EMBED_ON_WRITE: bool = True
+    EMBEDDING_BACKFILL_BATCH_ROWS: int = 1000  # rows claimed, embedded and written per transaction
+    EMBEDDING_BACKFILL_PROCESSES: int = 0  # embedding processes for the CLI; 0 = one per CPU
+    EMBEDDING_BACKFILL_MAX_ROWS_PER_SECOND: float = 0  # 0 = unlimited
+    EMBEDDING_BACKFILL_IDLE_SECONDS: float = 5.0  # poll interval once caught up
+    EMBEDDING_BACKFILL_IN_PROCESS: bool = False  # also run the backfill as a task in each API worker
+
+    # Per-client HNSW indexes for large tenants (see app/vector/hnsw.py and build_vector_index.py)
+    HNSW_INDEX_DIR: str = "data/hnsw"  # must be shared by all workers on the host
+    HNSW_M: int = 16  # links per node; higher = better recall, more memory
+    HNSW_EF_CONSTRUCTION: int = 200  # candidate list size while inserting
+    HNSW_EF_SEARCH: int = 64  # candidate list size while searching; raise for recall, lower for QPS
+
+    # pgvector backend, used when knowledge_entries.embedding is vector(384) (migration 0005)
+    PGVECTOR_ENABLED: bool = True  # read by migration 0005; the app follows the column type
+    PGVECTOR_INDEX: str = "hnsw"  # "hnsw" (uses HNSW_M / HNSW_EF_*) or "ivfflat"; read by the migration
+    PGVECTOR_IVFFLAT_LISTS: int = 1000  # ~ rows / 1000 up to 1M rows, sqrt(rows) above
+    PGVECTOR_IVFFLAT_PROBES: int = 10
+
     # Auth
     SECRET_KEY: str = "change_this_to_a_secure_secret_key"
     ALGORITHM: str = "HS256"
@@ -34,6 +137,12 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
+    @property
+    def DATABASE_REPLICA_URL_LIST(self) -> List[str]:
+        if not self.DATABASE_REPLICA_URLS:
+            return []
+        return [url.strip().strip('"').strip("'") for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
     @property
     def DATABASE_URL(self) -> str:
         import os
@@ -1,3 +1,2 @@
-
-# Database utilities can be added here if needed.
-# Currently, connections are handled within services/repos using psycopg2 directly.
+# Database utilities.
+# Services borrow psycopg2 connections from the shared pool in app/db/pool.py.
@@ -0,0 +1,40 @@
+from typing import Any, List, Optional, Sequence
+
+
+class StatementBatch:
+    """
+    Sends several independent statements to Postgres in a single round trip.
+
+    psycopg2 has no pipeline mode, so the statements are bound client-side
+    with `mogrify` and sent as one multi-statement query. They run in order
+    inside the connection's current transaction; the first failure aborts
+    the rest (and the transaction). Only the last statement's result can be
+    fetched, so put a `RETURNING` or `SELECT` you need at the end.
+
+    Use it for statements that do not depend on each other's results; for
+    dependent writes combine them into one statement with data-modifying
+    CTEs instead.
+
+        batch = StatementBatch(cur)
+        batch.add("INSERT INTO a (x) VALUES (%s)", (1,))
+        batch.add("UPDATE b SET y = %s WHERE id = %s", (2, 3))
+        batch.execute()
+    """
+
+    def __init__(self, cur):
+        self.cur = cur
+        self._statements: List[bytes] = []
+
+    def add(self, sql: str, params: Optional[Sequence[Any]] = None) -> "StatementBatch":
+        self._statements.append(self.cur.mogrify(sql, params).strip().rstrip(b";"))
+        return self
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def execute(self):
+        """Run all queued statements and return the cursor."""
+        if self._statements:
+            statements, self._statements = self._statements, []
+            self.cur.execute(b";\n".join(statements))
+        return self.cur
@@ -0,0 +1,307 @@
+import itertools
+import json
+import struct
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from psycopg2 import sql
+
+from app.config.settings import settings
+
+Row = Union[Sequence[Any], Mapping[str, Any]]
+
+COPY_FORMATS = ("binary", "csv")
+
+_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_BINARY_TRAILER = struct.pack("!h", -1)
+_NULL_FIELD = struct.pack("!i", -1)
+_PG_EPOCH = datetime(2000, 1, 1)
+_PG_EPOCH_DATE = date(2000, 1, 1)
+
+# Columns that make up a knowledge entry / stakeholder row for bulk loads.
+# Omitted columns (created_at, updated_at, ...) take their defaults.
+KNOWLEDGE_COPY_COLUMNS = (
+    "client_id", "content", "entry_type", "source", "daaeg_phase",
+    "tags", "stakeholder_ids", "metadata", "created_by", "embedding", "embedding_version",
+)
+STAKEHOLDER_COPY_COLUMNS = (
+    "client_id", "name", "role", "email", "tone", "tone_analysis", "last_interaction", "metadata",
+)
+
+
+class _ChunkReader:
+    """File-like object that `copy_expert` reads from, fed lazily by a byte iterator."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+# -------- Binary format encoders (one per element type) --------
+
+def _encode_int2(value) -> bytes:
+    return struct.pack("!h", value)
+
+
+def _encode_int4(value) -> bytes:
+    return struct.pack("!i", value)
+
+
+def _encode_int8(value) -> bytes:
+    return struct.pack("!q", value)
+
+
+def _encode_float4(value) -> bytes:
+    return struct.pack("!f", value)
+
+
+def _encode_float8(value) -> bytes:
+    return struct.pack("!d", value)
+
+
+def _encode_bool(value) -> bytes:
+    return b"\x01" if value else b"\x00"
+
+
+def _encode_text(value) -> bytes:
+    return str(value).encode("utf-8")
+
+
+def _encode_json(value) -> bytes:
+    return (value if isinstance(value, str) else json.dumps(value)).encode("utf-8")
+
+
+def _encode_jsonb(value) -> bytes:
+    return b"\x01" + _encode_json(value)  # jsonb binary format version 1
+
+
+def _encode_timestamp(value: datetime) -> bytes:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _PG_EPOCH
+    return struct.pack("!q", (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def _encode_timestamptz(value: datetime) -> bytes:
+    # Naive datetimes are taken as UTC.
+    return _encode_timestamp(value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc))
+
+
+def _encode_date(value: date) -> bytes:
+    return struct.pack("!i", (value - _PG_EPOCH_DATE).days)
+
+
+def _encode_vector(value) -> bytes:
+    # pgvector: int16 dimensions, int16 unused, float4 values
+    values = list(value)
+    return struct.pack(f"!hh{len(values)}f", len(values), 0, *values)
+
+
+_BINARY_ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "int2": _encode_int2,
+    "int4": _encode_int4,
+    "int8": _encode_int8,
+    "float4": _encode_float4,
+    "float8": _encode_float8,
+    "bool": _encode_bool,
+    "text": _encode_text,
+    "varchar": _encode_text,
+    "bpchar": _encode_text,
+    "json": _encode_json,
+    "jsonb": _encode_jsonb,
+    "timestamp": _encode_timestamp,
+    "timestamptz": _encode_timestamptz,
+    "date": _encode_date,
+    "vector": _encode_vector,
+}
+
+
+def _binary_array_encoder(element_oid: int, encode_element: Callable[[Any], bytes]) -> Callable[[Any], bytes]:
+    def encode(values) -> bytes:
+        values = list(values)
+        if not values:
+            return struct.pack("!iii", 0, 0, element_oid)
+        parts = []
+        has_null = 0
+        for value in values:
+            if value is None:
+                has_null = 1
+                parts.append(_NULL_FIELD)
+            else:
+                data = encode_element(value)
+                parts.append(struct.pack("!i", len(data)) + data)
+        return struct.pack("!iiiii", 1, has_null, element_oid, len(values), 1) + b"".join(parts)
+    return encode
+
+
+# -------- CSV format encoders --------
+
+def _csv_array_element(value) -> str:
+    if value is None:
+        return "NULL"
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _csv_array(values) -> str:
+    return "{" + ",".join(_csv_array_element(v) for v in values) + "}"
+
+
+def _csv_value(typname: str, value) -> str:
+    if typname.startswith("_"):
+        return _csv_array(value)
+    if typname in ("json", "jsonb"):
+        return value if isinstance(value, str) else json.dumps(value)
+    if typname == "vector":
+        return "[" + ",".join(f"{float(v):.7g}" for v in value) + "]"
+    if typname == "bool":
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_field(typname: str, value) -> str:
+    # Unquoted empty field is NULL; a quoted one is the empty string.
+    if value is None:
+        return ""
+    return '"' + _csv_value(typname, value).replace('"', '""') + '"'
+
+
+# -------- Loader --------
+
+def _column_types(cur, table: str, columns: Sequence[str]) -> List[Tuple[str, int, Optional[str]]]:
+    """(type name, element type oid, element type name) for each column, in order."""
+    cur.execute("""
+        SELECT a.attname, t.typname, t.typelem, e.typname
+        FROM pg_attribute a
+        JOIN pg_type t ON t.oid = a.atttypid
+        LEFT JOIN pg_type e ON e.oid = t.typelem
+        WHERE a.attrelid = %s::regclass AND a.attname = ANY(%s) AND NOT a.attisdropped
+    """, (table, list(columns)))
+    found = {name: (typname, elem_oid, elem_name) for name, typname, elem_oid, elem_name in cur.fetchall()}
+    missing = [c for c in columns if c not in found]
+    if missing:
+        raise ValueError(f"Unknown columns for {table}: {', '.join(missing)}")
+    return [found[c] for c in columns]
+
+
+def _binary_encoders(table: str, columns: Sequence[str], types) -> List[Callable[[Any], bytes]]:
+    encoders = []
+    for column, (typname, elem_oid, elem_name) in zip(columns, types):
+        if typname.startswith("_") and elem_name in _BINARY_ENCODERS:
+            encoders.append(_binary_array_encoder(elem_oid, _BINARY_ENCODERS[elem_name]))
+        elif typname in _BINARY_ENCODERS:
+            encoders.append(_BINARY_ENCODERS[typname])
+        else:
+            raise ValueError(f"No binary COPY encoder for {table}.{column} ({typname}); use fmt='csv'")
+    return encoders
+
+
+def _binary_chunks(rows: Iterable[Sequence[Any]], encoders) -> Iterator[bytes]:
+    yield _BINARY_HEADER
+    field_count = struct.pack("!h", len(encoders))
+    for row in rows:
+        parts = [field_count]
+        for value, encode in zip(row, encoders):
+            if value is None:
+                parts.append(_NULL_FIELD)
+            else:
+                data = encode(value)
+                parts.append(struct.pack("!i", len(data)))
+                parts.append(data)
+        yield b"".join(parts)
+    yield _BINARY_TRAILER
+
+
+def _csv_chunks(rows: Iterable[Sequence[Any]], types) -> Iterator[bytes]:
+    typnames = [typname for typname, _, _ in types]
+    for row in rows:
+        yield (",".join(_csv_field(t, v) for t, v in zip(typnames, row)) + "\n").encode("utf-8")
+
+
+def _as_tuple(row: Row, columns: Sequence[str]) -> tuple:
+    if isinstance(row, Mapping):
+        return tuple(row.get(column) for column in columns)
+    return tuple(row)
+
+
+def copy_rows(
+    cur,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Row],
+    id_column: Optional[str] = None,
+    fmt: str = "binary",
+    chunk_size: Optional[int] = None,
+) -> List[int]:
+    """
+    Load `rows` into `table` with `COPY ... FROM STDIN`, `chunk_size` rows
+    per COPY, so memory stays bounded however long the iterable is.
+
+    Rows are sequences ordered like `columns` or mappings keyed by column
+    name. Values are the Python types psycopg2 would accept: lists for
+    `TEXT[]`/`INTEGER[]`, dicts (or JSON strings) for JSONB, datetimes for
+    timestamps. Columns not listed take their defaults.
+
+    When `id_column` (a serial column) is given, each chunk first reserves
+    its ids from the column's sequence and copies them in explicitly, so the
+    generated ids are returned in input order. Otherwise an empty list is
+    returned. Runs in the cursor's transaction; the caller commits.
+
+        ids = copy_rows(cur, "knowledge_entries", KNOWLEDGE_COPY_COLUMNS, rows, id_column="entry_id")
+    """
+    if fmt not in COPY_FORMATS:
+        raise ValueError(f"Unsupported COPY format {fmt!r}; expected one of {COPY_FORMATS}")
+    chunk_size = chunk_size or settings.DB_COPY_CHUNK_SIZE
+    columns = list(columns)
+    copy_columns = ([id_column] if id_column else []) + columns
+
+    types = _column_types(cur, table, copy_columns)
+    encoders = _binary_encoders(table, copy_columns, types) if fmt == "binary" else None
+    options = sql.SQL("FORMAT binary") if fmt == "binary" else sql.SQL("FORMAT csv, ENCODING 'UTF8'")
+    copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH ({})").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(sql.Identifier(c) for c in copy_columns),
+        options,
+    ).as_string(cur)
+
+    ids: List[int] = []
+    rows = iter(rows)
+    while True:
+        chunk = [_as_tuple(row, columns) for row in itertools.islice(rows, chunk_size)]
+        if not chunk:
+            break
+        if id_column:
+            cur.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+                (table, id_column, len(chunk)),
+            )
+            chunk_ids = [r[0] for r in cur.fetchall()]
+            chunk = [(entry_id,) + row for entry_id, row in zip(chunk_ids, chunk)]
+            ids.extend(chunk_ids)
+        data = _binary_chunks(chunk, encoders) if fmt == "binary" else _csv_chunks(chunk, types)
+        cur.copy_expert(copy_sql, _ChunkReader(data))
+    return ids
+
+
+def copy_knowledge_entries(cur, rows: Iterable[Row], fmt: str = "binary", chunk_size: Optional[int] = None) -> List[int]:
+    """Bulk-load `knowledge_entries` rows (see `KNOWLEDGE_COPY_COLUMNS`); returns the entry ids."""
+    return copy_rows(cur, "knowledge_entries", KNOWLEDGE_COPY_COLUMNS, rows, "entry_id", fmt, chunk_size)
+
+
+def copy_stakeholders(cur, rows: Iterable[Row], fmt: str = "binary", chunk_size: Optional[int] = None) -> List[int]:
+    """Bulk-load `stakeholders` rows (see `STAKEHOLDER_COPY_COLUMNS`); returns the stakeholder ids."""
+    return copy_rows(cur, "stakeholders", STAKEHOLDER_COPY_COLUMNS, rows, "stakeholder_id", fmt, chunk_size)
@@ -0,0 +1,64 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+from app.db.statements import prepared_statements
+from app.dto.api_response import CountMode, Total
+
+# Appended to the select list of a page query in `window` mode; mappers ignore the extra column
+WINDOW_COUNT_COLUMN = "count(*) OVER() AS total_count"
+
+
+def count_statement(mode: CountMode, query: str, params: Sequence[Any]) -> Optional[Tuple[str, List[Any]]]:
+    """
+    Statement giving the total of `query` (a filtered SELECT without ORDER
+    BY / LIMIT) for `mode`, or None when the mode needs no separate query
+    (`window`, `none`). Read its single value with `read_total`.
+    """
+    params = list(params)
+    if mode == "exact":
+        return f"SELECT COUNT(*) FROM ({query}) AS sub", params
+    if mode == "capped":
+        # Stops scanning after one row past the cap
+        return f"SELECT COUNT(*) FROM ({query} LIMIT %s) AS sub", params + [settings.COUNT_CAP + 1]
+    if mode == "estimate":
+        return f"EXPLAIN (FORMAT JSON) {query}", params
+    return None
+
+
+def read_total(mode: CountMode, value: Any) -> Total:
+    """Total from the value returned by `count_statement`."""
+    if mode == "estimate":
+        plan = json.loads(value) if isinstance(value, str) else value
+        return int(plan[0]["Plan"]["Plan Rows"])
+    if mode == "capped" and value > settings.COUNT_CAP:
+        return f"{settings.COUNT_CAP}+"
+    return value
+
+
+def run_count(cur, mode: CountMode, statement: Tuple[str, List[Any]], label: str) -> Total:
+    """Execute a `count_statement` on a psycopg2 cursor and return the total."""
+    if mode == "estimate":
+        # EXPLAIN cannot be PREPAREd
+        cur.execute(*statement)
+    else:
+        prepared_statements.execute(cur, *statement, label=label)
+    return read_total(mode, cur.fetchone()[0])
+
+
+def window_total(rows: Sequence[Sequence[Any]], offset: int) -> Optional[int]:
+    """
+    Total from the trailing `total_count` column of a `window` page. None
+    for an empty page past the first: the window saw no rows, so the
+    caller has to count separately.
+    """
+    if rows:
+        return rows[0][-1]
+    return None if offset else 0
+
+
+def total_pages(total: Total, limit: int) -> Optional[int]:
+    """Page count for a numeric total; None for capped ("N+") and skipped counts."""
+    if not isinstance(total, int):
+        return None
+    return (total + limit - 1) // limit
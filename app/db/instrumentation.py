@@ -0,0 +1,213 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import psycopg2.extensions
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config.settings import settings
+from app.config.logger import logger, slow_query_logger
+from app.db.statements import normalize_sql
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def statement_shape(sql: Any) -> str:
+    """
+    Statement text with whitespace collapsed and inline literals replaced, so
+    that the same query issued with different values counts as one shape.
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    sql = normalize_sql(str(sql))
+    sql = _STRING_LITERAL.sub("?", sql)
+    return _NUMBER_LITERAL.sub("?", sql)
+
+
+class QueryStats:
+    """
+    Database work done while handling one request.
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.duration_ms = 0.0
+        self.rows = 0
+        self.shapes: Counter = Counter()
+        self._reported = set()
+
+    def record(self, shape: str, duration_ms: float, rows: int) -> None:
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.rows += rows
+        self.shapes[shape] += 1
+
+        # Warn once per shape, the first time it crosses the threshold.
+        if self.shapes[shape] > settings.N_PLUS_ONE_THRESHOLD and shape not in self._reported:
+            self._reported.add(shape)
+            logger.warning(
+                f"Possible N+1 on {self.path or '<no request>'}: statement ran more than "
+                f"{settings.N_PLUS_ONE_THRESHOLD} times in one request: {shape[:500]}"
+            )
+
+    def record_fetch(self, duration_ms: float, rows: int) -> None:
+        # Round trips of a statement already counted (named cursor fetches)
+        self.duration_ms += duration_ms
+        self.rows += rows
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.duration_ms:.2f};desc="{self.count} queries", '
+            f'db-rows;desc="{self.rows}"'
+        )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def record_query(sql: Any, duration_ms: float, rows: int, fetch: bool = False) -> None:
+    """
+    Record one statement, or with `fetch` one more round trip of a statement
+    already recorded (adds time and rows without counting it again).
+    """
+    stats = _current_stats.get()
+    slow = duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS
+    if stats is None and not slow:
+        return
+
+    shape = statement_shape(sql)
+    if stats is not None:
+        if fetch:
+            stats.record_fetch(duration_ms, rows)
+        else:
+            stats.record(shape, duration_ms, rows)
+    if slow:
+        path = stats.path if stats is not None else "<no request>"
+        slow_query_logger.warning(f"{duration_ms:.1f} ms | rows={rows} | {path} | {shape}")
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """
+    Cursor used by every pooled connection. Times each statement and records
+    it against the current request (see `QueryStatsMiddleware`).
+
+    COPY runs through `copy_expert` / `copy_from` / `copy_to` and is timed
+    too. On named (server-side) cursors `execute` only declares the cursor,
+    so each fetch is timed as well and added to the statement's time and rows.
+    """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query(query, (time.perf_counter() - started) * 1000, max(self.rowcount, 0))
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_query(query, (time.perf_counter() - started) * 1000, max(self.rowcount, 0))
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            record_query(sql, (time.perf_counter() - started) * 1000, max(self.rowcount, 0))
+
+    def copy_from(self, file, table, sep="\t", null="\\N", size=8192, columns=None):
+        started = time.perf_counter()
+        try:
+            return super().copy_from(file, table, sep, null, size, columns)
+        finally:
+            record_query(f"COPY {table} FROM STDIN", (time.perf_counter() - started) * 1000, max(self.rowcount, 0))
+
+    def copy_to(self, file, table, sep="\t", null="\\N", columns=None):
+        started = time.perf_counter()
+        try:
+            return super().copy_to(file, table, sep, null, columns)
+        finally:
+            record_query(f"COPY {table} TO STDOUT", (time.perf_counter() - started) * 1000, max(self.rowcount, 0))
+
+    def _fetch(self, fetch, *args):
+        if self.name is None:
+            # Client-side cursors already hold every row; nothing to time
+            return fetch(*args)
+        started = time.perf_counter()
+        rows = None
+        try:
+            rows = fetch(*args)
+            return rows
+        finally:
+            count = 0 if rows is None else (1 if not isinstance(rows, list) else len(rows))
+            record_query(self.query, (time.perf_counter() - started) * 1000, count, fetch=True)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record statements run through a SQLAlchemy engine (pass `async_engine.sync_engine`).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        rows = getattr(cursor, "rowcount", -1)
+        record_query(statement, (time.perf_counter() - started) * 1000, max(rows or 0, 0))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+# =========================
+# REQUEST SCOPE
+# =========================
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Collects per-request query statistics and reports them in a
+    `Server-Timing` header (visible in browser dev tools):
+
+        Server-Timing: db;dur=12.41;desc="5 queries", db-rows;desc="120", total;dur=18.02
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats(request.url.path)
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        total_ms = (time.perf_counter() - started) * 1000
+        response.headers.append("Server-Timing", f"{stats.server_timing()}, total;dur={total_ms:.2f}")
+        return response
@@ -0,0 +1,143 @@
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.config.settings import settings
+from app.db.session import parse_json
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+Converter = Callable[[Any], Any]
+
+
+# -------- Converters for values whose DB type differs from the field type --------
+
+def json_object(value: Any) -> Any:
+    """JSONB column that may be NULL or (from asyncpg) a JSON string."""
+    return parse_json(value) or {}
+
+
+def list_or_empty(value: Any) -> list:
+    """Array column that may be NULL."""
+    return value or []
+
+
+def to_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def column_names(description: Sequence[Any]) -> Tuple[str, ...]:
+    """
+    Column names from a psycopg2 `cursor.description`, a SQLAlchemy
+    `Result.keys()` / `Row._fields`, or a plain list of names.
+    """
+    return tuple(col if isinstance(col, str) else col[0] for col in description)
+
+
+class RowMapper(Generic[ModelT]):
+    """
+    Builds response DTOs from database rows by column name.
+
+    Rows come from our own queries against typed columns, so by default the
+    models are created without Pydantic validation. Columns are matched to
+    fields by `rename`, then by field alias (e.g. `entry_id` -> `id`), then by
+    field name; unmatched columns are ignored and unmatched fields get their
+    defaults. `convert` maps a field name to a function that brings the
+    column value to the field's type (e.g. `to_str` for `id: str`), which is
+    required because nothing is coerced.
+
+    Instances are assembled directly (as `model_construct` does, minus its
+    per-field bookkeeping, which costs more than validating). Set
+    `DB_VALIDATE_ROWS=true` to validate every row instead, e.g. when changing
+    a query or a DTO.
+
+        mapper = RowMapper(KnowledgeResponse, convert={"metadata": json_object})
+        entries = mapper.map_all(cur.fetchall(), cur.description)
+    """
+
+    def __init__(
+        self,
+        model: Type[ModelT],
+        rename: Optional[Dict[str, str]] = None,
+        convert: Optional[Dict[str, Converter]] = None,
+        validate: Optional[bool] = None,
+    ):
+        self.model = model
+        self.rename = rename or {}
+        self.convert = convert or {}
+        self.validate = settings.DB_VALIDATE_ROWS if validate is None else validate
+        self._fields = model.model_fields
+        # Models with private attributes or post-init hooks need the full constructor.
+        self._direct = not model.__private_attributes__ and model.__pydantic_post_init__ is None
+
+        self._field_by_column: Dict[str, str] = {}
+        for name in self._fields:
+            self._field_by_column[name] = name
+        for name, field in self._fields.items():
+            if field.alias:
+                self._field_by_column[field.alias] = name
+        self._field_by_column.update(self.rename)
+
+        # Column layout -> ([(row index, field name, converter)], fields left to defaults)
+        self._plans: Dict[Tuple[str, ...], Tuple[List[Tuple[int, str, Optional[Converter]]], Tuple[str, ...]]] = {}
+
+    def _plan(self, columns: Tuple[str, ...]):
+        plan = self._plans.get(columns)
+        if plan is None:
+            pairs = []
+            for index, column in enumerate(columns):
+                field = self._field_by_column.get(column)
+                if field is not None:
+                    pairs.append((index, field, self.convert.get(field)))
+            mapped = {field for _, field, _ in pairs}
+            missing = tuple(name for name in self._fields if name not in mapped)
+            plan = self._plans[columns] = (pairs, missing)
+        return plan
+
+    def _build(self, values: Dict[str, Any], missing: Tuple[str, ...]) -> ModelT:
+        if self.validate:
+            return self.model.model_validate(values)
+        if not self._direct:
+            return self.model.model_construct(**values)
+
+        fields_set = set(values)
+        fields = self._fields
+        for name in missing:
+            if name not in values and not fields[name].is_required():
+                values[name] = fields[name].get_default(call_default_factory=True)
+        instance = self.model.__new__(self.model)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+
+    def map_one(self, row: Sequence[Any], columns: Optional[Sequence[Any]] = None, **extra: Any) -> ModelT:
+        """
+        Map a single row. `extra` sets fields that are not read from the row
+        (already converted to the field type).
+        """
+        if columns is None:
+            columns = row._fields  # SQLAlchemy Row
+        pairs, missing = self._plan(column_names(columns))
+        values = {
+            field: (conv(row[index]) if conv is not None else row[index])
+            for index, field, conv in pairs
+        }
+        values.update(extra)
+        return self._build(values, missing)
+
+    def map_all(self, rows: Sequence[Sequence[Any]], columns: Optional[Sequence[Any]] = None) -> List[ModelT]:
+        if not rows:
+            return []
+        if columns is None:
+            columns = rows[0]._fields
+        pairs, missing = self._plan(column_names(columns))
+        build = self._build
+        return [
+            build({
+                field: (conv(row[index]) if conv is not None else row[index])
+                for index, field, conv in pairs
+            }, missing)
+            for row in rows
+        ]
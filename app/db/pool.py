@@ -0,0 +1,397 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from app.config.settings import settings
+from app.config.logger import logger
+from app.db.instrumentation import InstrumentedCursor
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class PoolConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection created by the pool. Carries per-session state that
+    must live exactly as long as the server session, such as the names of
+    server-side prepared statements (see app/db/statements.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: "OrderedDict[str, None]" = OrderedDict()
+        self.pool: Optional["ConnectionPool"] = None  # owning pool (primary or a replica)
+
+
+class _PooledConnection:
+    """Bookkeeping for a single physical connection owned by the pool."""
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    One pool lives in each worker process. Sync routes run in Starlette's
+    threadpool, so checkouts block (up to `timeout`) instead of failing when
+    all `max_size` connections are busy. Connections that sat idle for a while
+    are pinged before being handed out, and a background reaper closes idle
+    connections above `min_size` as well as connections past `max_lifetime`.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        max_idle: float = 300.0,
+        max_lifetime: float = 3600.0,
+        health_check_after: float = 30.0,
+        reap_interval: float = 60.0,
+        name: str = "primary",
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool sizing: min_size={min_size}, max_size={max_size}")
+
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.reap_interval = reap_interval
+        self.name = name
+
+        self._idle: Deque[_PooledConnection] = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._pending = 0  # connections being created outside the lock
+        self._cond = threading.Condition()
+        self._opened = False
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "checkout_wait_ms": 0.0,
+            "checkout_timeouts": 0,
+            "health_check_failures": 0,
+            "reaped_idle": 0,
+            "reaped_expired": 0,
+        }
+
+    # -------- Lifecycle --------
+
+    def open(self) -> None:
+        with self._cond:
+            if self._opened:
+                return
+            self._opened = True
+            self._stop.clear()
+
+        for _ in range(self.min_size):
+            try:
+                pooled = self._connect()
+            except Exception as e:
+                # Do not fail startup if the database is briefly unavailable;
+                # connections are created on demand later.
+                logger.error(f"Pool '{self.name}': failed to pre-open connection: {e}")
+                break
+            with self._cond:
+                self._idle.append(pooled)
+
+        self._reaper = threading.Thread(
+            target=self._reap_loop, name=f"db-pool-reaper-{self.name}", daemon=True
+        )
+        self._reaper.start()
+        logger.info(f"Pool '{self.name}' opened (min={self.min_size}, max={self.max_size})")
+
+    def close(self) -> None:
+        with self._cond:
+            if not self._opened:
+                return
+            self._opened = False
+            self._stop.set()
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+        for pooled in idle:
+            self._disconnect(pooled)
+
+        if self._reaper and self._reaper is not threading.current_thread():
+            self._reaper.join(timeout=5)
+        self._reaper = None
+        logger.info(f"Pool '{self.name}' closed")
+
+    # -------- Checkout / Return --------
+
+    def getconn(self):
+        """
+        Check out a connection, blocking until one is free or the timeout expires.
+        """
+        if not self._opened:
+            # Scripts and tests may use services without the app lifespan.
+            self.open()
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            pooled = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._idle:
+                        pooled = self._idle.pop()  # LIFO keeps the hot set small
+                        break
+                    if len(self._in_use) + self._pending < self.max_size:
+                        self._pending += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["checkout_timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Pool '{self.name}' exhausted: no connection available within {self.timeout}s"
+                        )
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    pooled = self._connect()
+                finally:
+                    with self._cond:
+                        self._pending -= 1
+                        self._cond.notify()
+            elif not self._is_usable(pooled):
+                self._disconnect(pooled)
+                with self._cond:
+                    self._cond.notify()
+                continue
+
+            with self._cond:
+                self._in_use[id(pooled.conn)] = pooled
+                self._stats["checkouts"] += 1
+                self._stats["checkout_wait_ms"] += (time.monotonic() - started) * 1000
+            return pooled.conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """
+        Return a connection to the pool. Open transactions are rolled back so
+        the next borrower always starts from a clean state.
+        """
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            logger.warning(f"Pool '{self.name}': returned connection does not belong to this pool")
+            if not conn.closed:
+                conn.close()
+            return
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception as e:
+                logger.warning(f"Pool '{self.name}': discarding connection after failed reset: {e}")
+                discard = True
+
+        expired = time.monotonic() - pooled.created_at > self.max_lifetime
+        if discard or conn.closed or expired or not self._opened:
+            self._disconnect(pooled)
+            with self._cond:
+                self._cond.notify()
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        """
+        Context manager that checks a connection out and always returns it.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    # -------- Statistics --------
+
+    def stats(self) -> Dict:
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": len(self._idle) + len(self._in_use),
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                **self._stats,
+                "avg_checkout_wait_ms": round(self._stats["checkout_wait_ms"] / checkouts, 3) if checkouts else 0.0,
+                "checkout_wait_ms": round(self._stats["checkout_wait_ms"], 3),
+            }
+
+    # -------- Internals --------
+
+    def _connect(self) -> _PooledConnection:
+        conn = psycopg2.connect(self.dsn, connection_factory=PoolConnection, cursor_factory=InstrumentedCursor)
+        conn.pool = self
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return _PooledConnection(conn)
+
+    def _disconnect(self, pooled: _PooledConnection) -> None:
+        try:
+            if not pooled.conn.closed:
+                pooled.conn.close()
+        except Exception as e:
+            logger.warning(f"Pool '{self.name}': error closing connection: {e}")
+        with self._cond:
+            self._stats["connections_closed"] += 1
+
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        conn = pooled.conn
+        if conn.closed:
+            return False
+
+        now = time.monotonic()
+        if now - pooled.created_at > self.max_lifetime:
+            return False
+
+        if now - pooled.last_used < self.health_check_after:
+            return True
+
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Pool '{self.name}': health check failed, dropping connection: {e}")
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(self.reap_interval):
+            try:
+                self._reap()
+            except Exception as e:
+                logger.error(f"Pool '{self.name}': reaper error: {e}")
+
+    def _reap(self) -> None:
+        now = time.monotonic()
+        to_close = []
+        with self._cond:
+            keep: Deque[_PooledConnection] = deque()
+            total = len(self._idle) + len(self._in_use)
+            # Oldest-used connections sit at the left end of the deque.
+            for pooled in self._idle:
+                if now - pooled.created_at > self.max_lifetime:
+                    to_close.append(pooled)
+                    self._stats["reaped_expired"] += 1
+                    total -= 1
+                elif now - pooled.last_used > self.max_idle and total > self.min_size:
+                    to_close.append(pooled)
+                    self._stats["reaped_idle"] += 1
+                    total -= 1
+                else:
+                    keep.append(pooled)
+            self._idle = keep
+
+        for pooled in to_close:
+            self._disconnect(pooled)
+
+        # Top back up to min_size so bursts after a quiet period stay fast.
+        while True:
+            with self._cond:
+                if not self._opened or len(self._idle) + len(self._in_use) + self._pending >= self.min_size:
+                    break
+                self._pending += 1
+            try:
+                pooled = self._connect()
+            except Exception as e:
+                logger.error(f"Pool '{self.name}': failed to refill connection: {e}")
+                with self._cond:
+                    self._pending -= 1
+                break
+            with self._cond:
+                self._pending -= 1
+                self._idle.append(pooled)
+                self._cond.notify()
+
+
+db_pool = ConnectionPool(
+    dsn=settings.DATABASE_URL,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+    max_idle=settings.DB_POOL_MAX_IDLE,
+    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+    health_check_after=settings.DB_POOL_HEALTH_CHECK_AFTER,
+    reap_interval=settings.DB_POOL_REAP_INTERVAL,
+)
+
+
+def get_connection():
+    """
+    Borrow a connection from the shared pool. Pair every call with
+    `release_connection` (usually in a `finally` block).
+
+    Inside a request (see app/db/unit_of_work.py) every call returns the same
+    connection, and `commit()` on it is deferred to the end of the request.
+    Calls made from `@read_only` service methods may be served by a replica
+    instead (see app/db/routing.py). Connections carry the request's statement
+    timeout (see app/db/timeouts.py).
+    """
+    from app.db.unit_of_work import current_unit_of_work
+    from app.db.routing import in_read_only_scope, replica_router
+    from app.db.timeouts import attach_connection
+
+    uow = current_unit_of_work()
+    # Once the request has touched the primary, keep reading from it so the
+    # request sees its own uncommitted writes.
+    if in_read_only_scope() and not (uow is not None and uow.active):
+        conn = replica_router.getconn(user_id=uow.user_id if uow is not None else None)
+        if conn is not None:
+            return attach_connection(conn)
+    if uow is not None:
+        return uow.connection()
+    return attach_connection(db_pool.getconn())
+
+
+def release_connection(conn) -> None:
+    """
+    Return a connection obtained from `get_connection` to the shared pool.
+    Unit-of-work connections are released by their unit of work instead.
+    """
+    from app.db.unit_of_work import UnitOfWorkConnection
+    from app.db.timeouts import detach_connection
+
+    if conn is None or isinstance(conn, UnitOfWorkConnection):
+        return
+    detach_connection(conn)
+    (getattr(conn, "pool", None) or db_pool).putconn(conn)
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.config.settings import settings
+
+
+class ClientResultCache:
+    """
+    Per-worker LRU of query results, keyed by client id and a normalized
+    request key, with a TTL.
+
+    Freshness is decided by a per-client generation that the caller reads
+    from shared state (for knowledge entries, the trigger-maintained
+    `knowledge_cache_generations` row, see migration 0009) before running the
+    query, on the same connection. Writes bump it in their own transaction,
+    so a generation is never seen before the data it stands for, in any
+    worker; a query on another connection (e.g. a lagging replica) could
+    still return older rows. An entry is returned
+    only while its generation is still the current one; a result computed
+    while a write landed is stored under the older generation and never
+    served. `invalidate` additionally drops the client's local entries once a
+    write has committed (see `on_commit`), which frees memory sooner.
+
+    Cached values are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        # (client id, key) -> (value, stored at, generation)
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, client_id: int, key: Hashable, generation: Optional[int]) -> Optional[Any]:
+        """Cached value stored under `generation`, or None (always None when `generation` is None)."""
+        with self._lock:
+            if not self.enabled or generation is None:
+                return None
+            entry = self._entries.get((client_id, key))
+            if entry is not None:
+                value, stored_at, stored_generation = entry
+                if stored_generation != generation:
+                    self._stats["stale"] += 1
+                elif time.monotonic() - stored_at >= self.ttl:
+                    self._stats["expired"] += 1
+                else:
+                    self._entries.move_to_end((client_id, key))
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[(client_id, key)]
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, client_id: int, key: Hashable, value: Any, generation: Optional[int]) -> None:
+        """Store `value` computed after `generation` was read (not stored when it is None)."""
+        with self._lock:
+            if not self.enabled or generation is None:
+                return
+            current = self._entries.get((client_id, key))
+            if current is not None and current[2] > generation:
+                return
+            self._entries[(client_id, key)] = (value, time.monotonic(), generation)
+            self._entries.move_to_end((client_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, client_id: int) -> None:
+        """Drop every local entry of the client; call it after the write has committed."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == client_id]:
+                del self._entries[entry_key]
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Knowledge search pages (see KnowledgeService.search_entries)
+search_cache = ClientResultCache(
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+    enabled=settings.SEARCH_CACHE_ENABLED,
+)
@@ -0,0 +1,263 @@
+import functools
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app.config.settings import settings
+from app.config.logger import logger
+from app.db.pool import ConnectionPool
+from app.db.instrumentation import instrument_engine
+from app.db.session import engine, async_database_url
+from app.db.timeouts import apply_statement_timeout_async
+
+# Lag of a streaming replica: zero when it has replayed everything it received,
+# otherwise the age of the last replayed transaction.
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+_read_only_scope: ContextVar[bool] = ContextVar("read_only_scope", default=False)
+
+
+def in_read_only_scope() -> bool:
+    return _read_only_scope.get()
+
+
+def read_only(func):
+    """
+    Mark a sync service method as read-only so `get_connection` may serve it
+    from a replica. Place it below `@staticmethod`. Async methods pick their
+    engine explicitly with `read_engine()`.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _read_only_scope.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _read_only_scope.reset(token)
+    return wrapper
+
+
+class _Replica:
+    def __init__(self, index: int, url: str):
+        self.index = index
+        self.pool = ConnectionPool(
+            dsn=url,
+            min_size=settings.DB_REPLICA_POOL_MIN_SIZE,
+            max_size=settings.DB_REPLICA_POOL_MAX_SIZE,
+            timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+            max_idle=settings.DB_POOL_MAX_IDLE,
+            max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+            health_check_after=settings.DB_POOL_HEALTH_CHECK_AFTER,
+            reap_interval=settings.DB_POOL_REAP_INTERVAL,
+            name=f"replica-{index}",
+        )
+        self.async_engine: AsyncEngine = create_async_engine(
+            async_database_url(url),
+            pool_size=settings.DB_ASYNC_POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+            pool_recycle=settings.DB_POOL_MAX_LIFETIME,
+            pool_pre_ping=True,
+        )
+        instrument_engine(self.async_engine.sync_engine)
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and (self.lag_seconds or 0) <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaRouter:
+    """
+    Routes read-only work to streaming replicas.
+
+    - Healthy replicas are picked round-robin.
+    - A background thread probes each replica's health and replication lag;
+      replicas that fail the probe or lag more than `DB_REPLICA_MAX_LAG_SECONDS`
+      are skipped until they recover.
+    - Users who wrote within `DB_READ_YOUR_WRITES_SECONDS` read from the primary
+      so they always see their own changes. Writes are tracked per worker
+      process; pick a window that covers typical replica lag.
+    - With no replicas configured (or none available) reads use the primary.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [_Replica(i, url) for i, url in enumerate(urls)]
+        self._rr = itertools.count()
+        self._lock = threading.Lock()
+        self._recent_writes: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._stats = {"replica_reads": 0, "primary_fallbacks": 0, "read_your_writes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    # -------- Lifecycle --------
+
+    def open(self) -> None:
+        if not self.enabled:
+            return
+        for replica in self.replicas:
+            replica.pool.open()
+        self._stop.clear()
+        self._check_replicas()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="db-replica-monitor", daemon=True)
+        self._monitor.start()
+
+    async def close(self) -> None:
+        if not self.enabled:
+            return
+        self._stop.set()
+        if self._monitor:
+            self._monitor.join(timeout=5)
+            self._monitor = None
+        for replica in self.replicas:
+            replica.pool.close()
+            await replica.async_engine.dispose()
+
+    # -------- Routing --------
+
+    def record_write(self, user_id: Optional[int]) -> None:
+        if user_id is None or not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[user_id] = now
+            # Keep the map bounded by dropping expired entries opportunistically.
+            if len(self._recent_writes) > 10_000:
+                cutoff = now - settings.DB_READ_YOUR_WRITES_SECONDS
+                self._recent_writes = {u: t for u, t in self._recent_writes.items() if t >= cutoff}
+
+    def _choose(self, user_id: Optional[int]) -> Optional[_Replica]:
+        if not self.enabled:
+            return None
+
+        if user_id is not None:
+            with self._lock:
+                wrote_at = self._recent_writes.get(user_id)
+            if wrote_at is not None and time.monotonic() - wrote_at < settings.DB_READ_YOUR_WRITES_SECONDS:
+                self._count("read_your_writes")
+                return None
+
+        start = next(self._rr)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.available:
+                self._count("replica_reads")
+                return replica
+
+        self._count("primary_fallbacks")
+        return None
+
+    def getconn(self, user_id: Optional[int] = None):
+        """
+        Check out a replica connection, or return None to use the primary.
+        """
+        replica = self._choose(user_id)
+        if replica is None:
+            return None
+        try:
+            return replica.pool.getconn()
+        except Exception as e:
+            logger.warning(f"Replica {replica.index} unavailable, reading from primary: {e}")
+            replica.healthy = False
+            replica.last_error = str(e)
+            self._count("primary_fallbacks")
+            return None
+
+    def read_engine(self, user_id: Optional[int] = None) -> AsyncEngine:
+        """
+        Async engine to use for a read-only query.
+        """
+        replica = self._choose(user_id)
+        return replica.async_engine if replica is not None else engine
+
+    # -------- Health --------
+
+    def _monitor_loop(self) -> None:
+        while not self._stop.wait(settings.DB_REPLICA_CHECK_INTERVAL):
+            self._check_replicas()
+
+    def _check_replicas(self) -> None:
+        for replica in self.replicas:
+            try:
+                with replica.pool.connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(REPLICA_LAG_QUERY)
+                    replica.lag_seconds = float(cur.fetchone()[0])
+                    cur.close()
+                if not replica.healthy:
+                    logger.info(f"Replica {replica.index} is healthy again")
+                replica.healthy = True
+                replica.last_error = None
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning(f"Replica {replica.index} failed health check: {e}")
+                replica.healthy = False
+                replica.last_error = str(e)
+
+    # -------- Statistics --------
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._stats)
+        return {
+            "enabled": self.enabled,
+            **counters,
+            "replicas": [
+                {
+                    "index": r.index,
+                    "healthy": r.healthy,
+                    "available": r.available,
+                    "lag_seconds": r.lag_seconds,
+                    "last_error": r.last_error,
+                    "pool": r.pool.stats(),
+                }
+                for r in self.replicas
+            ],
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URL_LIST)
+
+
+def read_engine() -> AsyncEngine:
+    """
+    Engine for the current read-only async query, honouring read-your-writes
+    for the authenticated user of the current request.
+    """
+    from app.db.unit_of_work import current_unit_of_work
+
+    uow = current_unit_of_work()
+    return replica_router.read_engine(user_id=uow.user_id if uow is not None else None)
+
+
+@asynccontextmanager
+async def read_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    Connection from `read_engine()` with the request's statement timeout
+    applied for the duration of its transaction.
+    """
+    async with read_engine().connect() as conn:
+        await apply_statement_timeout_async(conn)
+        yield conn
@@ -1,6 +1,8 @@
 -- ============================================================================
 -- JMA Knowledge Base - Database Schema (FastAPI + Psycopg2)
 -- ============================================================================
+-- Baseline revision (migrations/versions/0001_baseline.py). Do not edit this
+-- file for schema changes; add an Alembic migration instead.
 
 -- Extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
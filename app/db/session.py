@@ -1,10 +1,68 @@
+import json
+import re
+from typing import Any, Dict, Sequence, Tuple
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.sql.elements import TextClause
 from app.config.settings import settings
+from app.db.instrumentation import instrument_engine
+
+
+def async_database_url(url: str) -> str:
+    url = url.replace("postgresql://", "postgresql+asyncpg://", 1).replace("postgres://", "postgresql+asyncpg://", 1)
+    # asyncpg does not understand libpq's `sslmode`; it takes `ssl` instead.
+    return re.sub(r"([?&])sslmode=", r"\1ssl=", url)
+
 
 # Create Async Engine
 # We use echo=True only in debug mode to see queries in logs
 engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+    async_database_url(settings.DATABASE_URL),
     echo=False,
     future=True,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+    pool_recycle=settings.DB_POOL_MAX_LIFETIME,
+    pool_pre_ping=True,
 )
+instrument_engine(engine.sync_engine)
+
+
+def bind_params(query: str, params: Sequence[Any] = ()) -> Tuple[TextClause, Dict[str, Any]]:
+    """
+    Convert a psycopg2-style query (`%s` placeholders) into a SQLAlchemy
+    text clause with named binds so sync and async services can share the
+    same query builders. `%%` (a literal `%`, e.g. in pg_trgm's `<%`
+    operator) is unescaped.
+    """
+    pieces = re.split(r"(%%|%s)", query)
+    expected = pieces.count("%s")
+    if expected != len(params):
+        raise ValueError(f"Expected {expected} parameters, got {len(params)}")
+
+    sql = ""
+    bound = {}
+    for piece in pieces:
+        if piece == "%s":
+            index = len(bound)
+            sql += f":p{index}"
+            bound[f"p{index}"] = params[index]
+        elif piece == "%%":
+            sql += "%"
+        else:
+            sql += piece
+    return text(sql), bound
+
+
+def parse_json(value: Any) -> Any:
+    """
+    asyncpg returns JSON/JSONB columns of raw text queries as strings.
+    """
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return {}
+    return value
@@ -0,0 +1,108 @@
+import hashlib
+import re
+import threading
+from typing import Any, Dict, Sequence
+
+from app.config.settings import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse whitespace so that the same statement shape built by different
+    code paths (or with different indentation) maps to one cache entry.
+    """
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _to_positional(sql: str) -> str:
+    # psycopg2 `%s` placeholders -> PostgreSQL `$n` parameters for PREPARE,
+    # and `%%` -> `%` (PREPARE runs without parameters, so psycopg2 keeps it).
+    out = ""
+    n = 0
+    for piece in re.split(r"(%%|%s)", sql):
+        if piece == "%s":
+            n += 1
+            out += f"${n}"
+        elif piece == "%%":
+            out += "%"
+        else:
+            out += piece
+    return out
+
+
+class PreparedStatementCache:
+    """
+    Prepares hot SQL shapes once per pooled connection and executes them by
+    name afterwards, so Postgres skips parsing and (after a few executions)
+    planning.
+
+    Statements are identified by a digest of their normalized text. The set
+    of prepared statements on each connection is a bounded LRU; the least
+    recently used statement is DEALLOCATEd when the limit is reached. Dynamic
+    queries built from optional filters (e.g. `search_entries`, `list_users`)
+    only produce a small, fixed number of distinct shapes because each filter
+    contributes a fixed clause and values are always bound parameters.
+
+    Connections not created by the pool (e.g. in scripts) fall back to a
+    plain `execute`.
+    """
+
+    def __init__(self, enabled: bool = True, max_per_connection: int = 128):
+        self.enabled = enabled
+        self.max_per_connection = max_per_connection
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "unprepared": 0}
+
+    def execute(self, cur, sql: str, params: Sequence[Any] = (), label: str = "stmt") -> None:
+        """
+        Execute `sql` (psycopg2 `%s` style) on `cur` through a prepared statement.
+        """
+        statements = getattr(cur.connection, "prepared_statements", None)
+        if not self.enabled or statements is None:
+            self._count("unprepared")
+            cur.execute(sql, tuple(params))
+            return
+
+        normalized = normalize_sql(sql)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+        name = f"{label}_{digest}"
+
+        if name in statements:
+            statements.move_to_end(name)
+            self._count("hits")
+        else:
+            if len(statements) >= self.max_per_connection:
+                evicted, _ = statements.popitem(last=False)
+                cur.execute(f"DEALLOCATE {evicted}")
+                self._count("evictions")
+            cur.execute(f"PREPARE {name} AS {_to_positional(normalized)}")
+            statements[name] = None
+            self._count("misses")
+
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cur.execute(f"EXECUTE {name} ({placeholders})", tuple(params))
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            prepared = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "max_per_connection": self.max_per_connection,
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / prepared, 4) if prepared else 0.0,
+            }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+
+prepared_statements = PreparedStatementCache(
+    enabled=settings.DB_PREPARED_STATEMENTS,
+    max_per_connection=settings.DB_PREPARED_STATEMENTS_PER_CONNECTION,
+)
@@ -0,0 +1,98 @@
+import itertools
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+from app.db.instrumentation import InstrumentedCursor
+from app.db.mapping import RowMapper
+from app.db.pool import db_pool
+from app.db.timeouts import attach_connection, detach_connection
+
+_cursor_names = itertools.count()
+
+
+def _borrow(read_only: bool):
+    # Streams outlive the request's unit of work (it commits before the body
+    # is sent), so they always use a connection of their own.
+    from app.db.routing import replica_router
+    from app.db.unit_of_work import current_unit_of_work
+
+    conn = None
+    if read_only:
+        uow = current_unit_of_work()
+        conn = replica_router.getconn(user_id=uow.user_id if uow is not None else None)
+    if conn is None:
+        conn = db_pool.getconn()
+    return attach_connection(conn)
+
+
+def stream_rows(
+    query: str,
+    params: Sequence[Any] = (),
+    fetch_size: Optional[int] = None,
+    read_only: bool = True,
+) -> Iterator[Tuple[Sequence[Any], List[tuple]]]:
+    """
+    Run `query` on a named (server-side) cursor and yield
+    `(cursor.description, rows)` batches of at most `fetch_size` rows, so
+    only one batch is held in memory at a time.
+
+    The connection is held until the generator is exhausted or closed;
+    always iterate it to the end or call `.close()`.
+    """
+    fetch_size = fetch_size or settings.DB_STREAM_FETCH_SIZE
+    conn = _borrow(read_only)
+    try:
+        # Instrumented explicitly: each fetchmany is a round trip and is timed as part of the query
+        cur = conn.cursor(name=f"stream_{next(_cursor_names)}", cursor_factory=InstrumentedCursor)
+        cur.itersize = fetch_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield cur.description, rows
+        cur.close()
+    finally:
+        detach_connection(conn)
+        # Rolling back on return also closes the cursor if we stopped early.
+        conn.pool.putconn(conn)
+
+
+def stream_models(
+    mapper: RowMapper,
+    query: str,
+    params: Sequence[Any] = (),
+    fetch_size: Optional[int] = None,
+) -> Iterator[list]:
+    """
+    Like `stream_rows`, but yields each batch mapped to response DTOs.
+    """
+    batches = stream_rows(query, params, fetch_size)
+    try:
+        for description, rows in batches:
+            yield mapper.map_all(rows, description)
+    finally:
+        batches.close()
+
+
+async def stream_models_async(
+    mapper: RowMapper,
+    query: str,
+    params: Sequence[Any] = (),
+    fetch_size: Optional[int] = None,
+) -> AsyncIterator[list]:
+    """
+    Like `stream_models`, but on the async read engine: the rows come from a
+    server-side cursor of `AsyncConnection.stream`, so no threadpool worker
+    is held while waiting on Postgres. Always iterate it to the end or call
+    `.aclose()`.
+    """
+    from app.db.routing import read_connection
+    from app.db.session import bind_params
+
+    fetch_size = fetch_size or settings.DB_STREAM_FETCH_SIZE
+    stmt, bound = bind_params(query, params)
+    async with read_connection() as conn:
+        async with conn.stream(stmt, bound) as result:
+            async for rows in result.partitions(fetch_size):
+                yield mapper.map_all(rows)
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config.settings import settings
+from app.config.logger import logger
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def statement_timeout_for(method: str, path: str) -> int:
+    """
+    Statement timeout budget (ms) for a route: the longest matching
+    "METHOD /path-prefix" in `DB_ROUTE_STATEMENT_TIMEOUTS`, otherwise
+    `DB_STATEMENT_TIMEOUT_MS`.
+    """
+    route = f"{method.upper()} {path}"
+    best, budget = -1, settings.DB_STATEMENT_TIMEOUT_MS
+    for prefix, timeout_ms in settings.DB_ROUTE_STATEMENT_TIMEOUTS.items():
+        if route.startswith(prefix) and len(prefix) > best:
+            best, budget = len(prefix), timeout_ms
+    return budget
+
+
+class RequestQueryScope:
+    """
+    Statement timeout budget of the current request plus the psycopg2
+    connections it is using, so their running queries can be cancelled when
+    the client disconnects.
+    """
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self.disconnected = False
+        self._connections: Set = set()
+        self._lock = threading.Lock()
+
+    def register(self, conn) -> None:
+        with self._lock:
+            self._connections.add(conn)
+
+    def unregister(self, conn) -> None:
+        with self._lock:
+            self._connections.discard(conn)
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                # Sends a cancel request on a separate socket; safe from any thread.
+                conn.cancel()
+            except Exception as e:
+                logger.warning(f"Could not cancel query: {e}")
+
+
+_current_scope: ContextVar[Optional[RequestQueryScope]] = ContextVar("request_query_scope", default=None)
+
+
+def current_query_scope() -> Optional[RequestQueryScope]:
+    return _current_scope.get()
+
+
+def _raw(conn):
+    # Unit-of-work proxies expose the underlying connection as `raw`.
+    return getattr(conn, "raw", conn)
+
+
+def attach_connection(conn):
+    """
+    Apply the request's statement timeout to a freshly borrowed psycopg2
+    connection and make it cancellable. `SET LOCAL` lasts until the
+    connection's transaction ends, i.e. until it goes back to the pool.
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return conn
+    raw = _raw(conn)
+    if scope.timeout_ms:
+        cur = raw.cursor()
+        cur.execute(f"SET LOCAL statement_timeout = {int(scope.timeout_ms)}")
+        cur.close()
+    scope.register(raw)
+    return conn
+
+
+def detach_connection(conn) -> None:
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.unregister(_raw(conn))
+
+
+async def apply_statement_timeout_async(conn: AsyncConnection) -> None:
+    scope = _current_scope.get()
+    if scope is not None and scope.timeout_ms:
+        await conn.execute(text(f"SET LOCAL statement_timeout = {int(scope.timeout_ms)}"))
+
+
+# =========================
+# REQUEST SCOPE
+# =========================
+
+class QueryTimeoutMiddleware:
+    """
+    Applies the per-route statement timeout budget and cancels the request's
+    queries when the client disconnects.
+
+    Disconnects are only watched for safe (bodiless) methods: the request
+    body must be consumed before `http.disconnect` can be observed, and
+    buffering uploads here would defeat streaming. On disconnect, running
+    psycopg2 queries are cancelled server-side and the handler task is
+    cancelled, which makes asyncpg cancel its query too.
+
+    This is a plain ASGI middleware so it can see the raw `receive` channel.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        query_scope = RequestQueryScope(statement_timeout_for(scope["method"], scope["path"]))
+        token = _current_scope.set(query_scope)
+        try:
+            if scope["method"] in SAFE_METHODS:
+                await self._call_watching_disconnect(query_scope, scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+    async def _call_watching_disconnect(self, query_scope, scope, receive, send):
+        first = await receive()
+        if first["type"] == "http.disconnect":
+            return
+
+        disconnected = asyncio.Event()
+        pending = [first]
+
+        async def replay_receive():
+            if pending:
+                return pending.pop()
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        handler = asyncio.ensure_future(self.app(scope, replay_receive, send))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await asyncio.wait({handler, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            handler.cancel()
+            watcher.cancel()
+            raise
+
+        if handler.done():
+            watcher.cancel()
+            handler.result()
+            return
+
+        logger.info(f"Client disconnected, cancelling queries for {scope['path']}")
+        query_scope.disconnected = True
+        disconnected.set()
+        query_scope.cancel_all()
+        handler.cancel()
+        try:
+            await handler
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Nobody is listening for the response any more.
+            logger.info(f"Request {scope['path']} ended after client disconnect: {e}")
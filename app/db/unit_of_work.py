@@ -0,0 +1,273 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+import anyio
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config.logger import logger
+from app.db.pool import ConnectionPool, db_pool
+from app.db.routing import replica_router
+from app.db.timeouts import SAFE_METHODS, attach_connection, detach_connection
+
+
+class UnitOfWork:
+    """
+    One connection and one transaction shared by every service call made
+    while handling a single HTTP request.
+
+    The connection is checked out lazily on first use, so requests that never
+    touch the database never hold a pooled connection.
+
+    Side effects that must only happen once the writes are durable (emails,
+    cache invalidation, vector index updates) are registered with `on_commit`
+    and run after the real commit; a rollback discards them.
+    """
+
+    def __init__(self, pool: ConnectionPool = db_pool):
+        self._pool = pool
+        self._conn = None
+        self._proxy: Optional["UnitOfWorkConnection"] = None
+        self._lock = threading.Lock()
+        self.rollback_only = False
+        # Set when a service rolled back after an error, as opposed to a route asking for rollback_only
+        self.failed = False
+        self.user_id: Optional[int] = None  # set once the request is authenticated
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def active(self) -> bool:
+        return self._conn is not None
+
+    def connection(self) -> "UnitOfWorkConnection":
+        with self._lock:
+            if self._conn is None:
+                self._conn = attach_connection(self._pool.getconn())
+                self._proxy = UnitOfWorkConnection(self, self._conn)
+            return self._proxy
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Run `callback` after this unit of work commits (never if it rolls back)."""
+        self._callbacks.append(callback)
+
+    def commit(self) -> None:
+        if self.rollback_only:
+            self.rollback()
+            return
+        if self._conn is not None:
+            try:
+                self._conn.commit()
+            except Exception:
+                self._callbacks.clear()
+                self._conn.rollback()
+                raise
+            finally:
+                self._release()
+        self._run_callbacks()
+
+    def rollback(self) -> None:
+        self._callbacks.clear()
+        if self._conn is None:
+            return
+        try:
+            self._conn.rollback()
+        finally:
+            self._release()
+
+    def _run_callbacks(self) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            # The data is committed: a failing side effect is logged, not surfaced
+            try:
+                callback()
+            except Exception as e:
+                logger.exception(f"on_commit callback failed: {e}")
+
+    def _release(self) -> None:
+        conn, self._conn, self._proxy = self._conn, None, None
+        detach_connection(conn)
+        self._pool.putconn(conn)
+
+
+class UnitOfWorkConnection:
+    """
+    Connection handed to services while a unit of work is active.
+
+    `commit()` and `close()` are deferred to the unit of work so nested service
+    calls cannot end the request's transaction early. `rollback()` still rolls
+    back immediately and marks the whole unit of work as failed; reads whose
+    failure is tolerated belong in a `savepoint()` instead.
+    """
+
+    def __init__(self, uow: UnitOfWork, conn):
+        self._uow = uow
+        self._conn = conn
+
+    @property
+    def raw(self):
+        return self._conn
+
+    @property
+    def uow(self) -> UnitOfWork:
+        return self._uow
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self) -> None:
+        # Committed once by the unit of work at the end of the request.
+        pass
+
+    def rollback(self) -> None:
+        self._uow.rollback_only = True
+        self._uow.failed = True
+        self._conn.rollback()
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+_current_uow: ContextVar[Optional[UnitOfWork]] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_uow.get()
+
+
+def on_commit(conn, callback: Callable[[], None]) -> None:
+    """
+    Run `callback` once the writes made on `conn` are committed. Call it after
+    `conn.commit()`: on a unit-of-work connection that commit is deferred, so
+    the callback waits for the unit of work; on any other connection the
+    commit was real and the callback runs now.
+    """
+    if isinstance(conn, UnitOfWorkConnection):
+        conn.uow.on_commit(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def unit_of_work(pool: ConnectionPool = db_pool) -> Iterator[UnitOfWork]:
+    """
+    Run a block as one unit of work: commit on success, roll back on error.
+    Usable from scripts and background jobs as well as requests.
+    """
+    uow = UnitOfWork(pool)
+    token = _current_uow.set(uow)
+    try:
+        yield uow
+    except Exception:
+        uow.rollback()
+        raise
+    else:
+        uow.commit()
+    finally:
+        _current_uow.reset(token)
+
+
+@contextmanager
+def savepoint(conn, name: str) -> Iterator[None]:
+    """
+    Isolate a best-effort statement (e.g. an audit insert) so that its failure
+    does not abort the surrounding transaction.
+    """
+    cur = conn.cursor()
+    cur.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except Exception:
+        cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        raise
+    else:
+        cur.execute(f"RELEASE SAVEPOINT {name}")
+    finally:
+        cur.close()
+
+
+# =========================
+# REQUEST SCOPE
+# =========================
+
+def _error_response(request: Request) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "status": "error",
+            "success": False,
+            "data": None,
+            "message": "Something went wrong. Please try again later.",
+            "error": {
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "path": str(request.url.path),
+            },
+        },
+    )
+
+
+class UnitOfWorkMiddleware(BaseHTTPMiddleware):
+    """
+    Opens a unit of work per request and commits it before the response is
+    returned, so a failed commit still surfaces as an error to the client.
+    Responses with status >= 400 (and unhandled exceptions) roll back. A
+    success response whose unit of work a service rolled back becomes a 500,
+    since the writes it reports were discarded.
+
+    This is a middleware rather than a yield dependency because FastAPI runs
+    yield-dependency teardown after the response has been sent.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        uow = UnitOfWork()
+        token = _current_uow.set(uow)
+        try:
+            try:
+                response = await call_next(request)
+            except BaseException:
+                # Also covers cancellation after a client disconnect, so
+                # shield the rollback from the cancelled scope.
+                with anyio.CancelScope(shield=True):
+                    await run_in_threadpool(uow.rollback)
+                raise
+
+            if response.status_code >= 400 or uow.rollback_only:
+                await run_in_threadpool(uow.rollback)
+                if uow.failed and response.status_code < 400:
+                    # A service swallowed an error after rolling back: the writes
+                    # the response reports were discarded
+                    logger.error(f"Request rolled back after a service error: {request.url.path}")
+                    return _error_response(request)
+                return response
+
+            wrote = uow.active and request.method not in SAFE_METHODS
+            try:
+                await run_in_threadpool(uow.commit)
+            except Exception as e:
+                logger.exception(f"Commit failed for request: {request.url.path} - Error: {str(e)}")
+                return _error_response(request)
+            if wrote:
+                # Keep this user's reads on the primary until replicas catch up.
+                replica_router.record_write(uow.user_id)
+            return response
+        finally:
+            _current_uow.reset(token)
+
+
+def get_unit_of_work() -> UnitOfWork:
+    """
+    Dependency exposing the request's unit of work to routes that need it
+    (e.g. to mark it rollback-only). Services pick it up implicitly through
+    `app.db.pool.get_connection`.
+    """
+    uow = current_unit_of_work()
+    if uow is None:
+        raise RuntimeError("UnitOfWorkMiddleware is not installed")
+    return uow
@@ -5,6 +5,7 @@ from typing import Dict, Optional, List
 import jwt
 from app.config.settings import settings
 from app.utils.rbac import RBACManager, Permission
+from app.db.unit_of_work import current_unit_of_work
 
 security = HTTPBearer()
 
@@ -30,6 +31,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     payload = rbac_manager.verify_token(token)
     if payload is None:
         raise credentials_exception
+
+    # Lets the DB layer apply per-user routing (read-your-writes)
+    uow = current_unit_of_work()
+    if uow is not None:
+        uow.user_id = payload.get("user_id")
         
     return payload
 
@@ -1,8 +1,16 @@
-from typing import Optional, Generic, TypeVar, Any
+from typing import Literal, Optional, Union, Generic, TypeVar, Any
 from pydantic import BaseModel, Field
 
 T = TypeVar("T")
 
+# How list endpoints compute `total` (see app/db/counting.py):
+# exact: separate COUNT(*) query; window: count(*) OVER() on the page query (one round trip);
+# capped: count up to COUNT_CAP rows, "N+" beyond; estimate: planner row estimate; none: no total
+CountMode = Literal["exact", "window", "capped", "estimate", "none"]
+
+# An exact or estimated row count, "N+" for a capped count, None when not counted
+Total = Optional[Union[int, str]]
+
 class APIResponse(BaseModel, Generic[T]):
     status: str = Field(..., description="Response status: 'success' or 'error'")
     success: bool = Field(..., description="Boolean indicating success or failure")
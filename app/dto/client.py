@@ -1,6 +1,7 @@
 from pydantic import BaseModel, HttpUrl, EmailStr
 from typing import Optional, List
 from datetime import datetime, date
+from app.dto.api_response import Total
 
 # Shared properties
 class ClientBase(BaseModel):
@@ -30,10 +31,10 @@ class ClientResponse(ClientBase):
 
 class ClientListResponse(BaseModel):
     data: List[ClientResponse]
-    total: int
+    total: Total  # int, "N+" for count=capped, None for count=none
     page: int
     limit: int
-    totalPages: int
+    totalPages: Optional[int]  # None unless total is a number
 
 class ClientDropdownItem(BaseModel):
     id: str
@@ -1,8 +1,10 @@
 
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Literal, Optional, Dict, Any, Union
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 
+from app.dto.api_response import CountMode
+
 # --- Stakeholders ---
 
 class StakeholderBase(BaseModel):
@@ -73,12 +75,108 @@ class KnowledgeResponse(KnowledgeBase):
     class Config:
         populate_by_name = True
 
+# POST /knowledge/bulk: one result per input record, in input order
+class BulkRowResult(BaseModel):
+    index: int  # position of the record in the body
+    id: Optional[int] = None  # entry id when inserted
+    error: Optional[str] = None
+
+class BulkIngestResult(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkRowResult]
+    error: Optional[str] = None  # set when the body could not be read to the end
+
+# substring: case-insensitive substring match, newest first
+# fulltext: websearch-style query against search_vector, ranked by relevance
+# hybrid: full-text and semantic results fused by weighted reciprocal rank
+SearchMode = Literal["substring", "fulltext", "hybrid"]
+
+class SemanticSearchRequest(BaseModel):
+    clientId: int
+    query: str
+    limit: int = Field(default=10, ge=1, le=100)
+    entryType: Optional[str] = None
+    daaegPhase: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+class SemanticSearchHit(KnowledgeResponse):
+    score: float  # cosine similarity to the query
+
+# List projection of search results
+# full: every hit carries its whole content
+# snippet: a bounded excerpt (highlighted for text queries) and contentLength instead;
+#          the body is only returned by GET /knowledge/{entry_id}
+Projection = Literal["full", "snippet"]
+
+# Control characters (STX, ETX) around full-text matches in KnowledgeSnippet.snippet
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+class KnowledgeSnippet(BaseModel):
+    id: int = Field(alias='entry_id')
+    clientId: int = Field(alias='client_id')
+    entryType: str = Field(alias='entry_type')
+    source: Optional[str] = None
+    daaegPhase: Optional[str] = Field(default=None, alias='daaeg_phase')
+    tags: Optional[List[str]] = []
+    stakeholderIds: List[int] = Field(alias='stakeholder_ids')
+    metadata: Optional[Dict[str, Any]] = {}
+    createdBy: Optional[int] = Field(alias='created_by')
+    createdAt: datetime = Field(alias='created_at')
+    updatedAt: datetime = Field(alias='updated_at')
+    # Plain text, not HTML-escaped; full-text matches are wrapped in HIGHLIGHT_START/HIGHLIGHT_STOP,
+    # which never occur otherwise: escape the text first, then turn the markers into markup
+    snippet: str
+    contentLength: int = Field(alias='content_length')  # characters
+
+    class Config:
+        populate_by_name = True
+
+class HybridScores(BaseModel):
+    score: float  # weighted reciprocal rank fusion of the two rankings below
+    lexicalRank: Optional[int] = None  # 1-based rank among full-text matches; None if not matched
+    lexicalScore: Optional[float] = None  # ts_rank_cd
+    vectorRank: Optional[int] = None  # 1-based rank among nearest neighbours; None if not retrieved
+    vectorScore: Optional[float] = None  # cosine similarity
+
+class HybridSearchHit(HybridScores, KnowledgeResponse):
+    pass
+
+class HybridSnippetHit(HybridScores, KnowledgeSnippet):
+    pass
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class StakeholderFacetCount(BaseModel):
+    stakeholderId: int
+    name: Optional[str] = None
+    count: int
+
+class KnowledgeFacets(BaseModel):
+    total: int  # entries matching the filters
+    entryType: List[FacetCount]
+    daaegPhase: List[FacetCount]
+    tags: List[FacetCount]  # top N
+    stakeholders: List[StakeholderFacetCount]  # top N
+    source: Literal["query", "counters"]
+
 class KnowledgeSearchRequest(BaseModel):
     clientId: int
     query: Optional[str] = None
+    mode: SearchMode = "substring"
+    fuzzy: bool = False  # substring mode only: typo-tolerant trigram matching
+    # hybrid mode only: weights of the full-text and vector rankings (default from settings)
+    lexicalWeight: Optional[float] = Field(default=None, ge=0)
+    vectorWeight: Optional[float] = Field(default=None, ge=0)
     tags: Optional[List[str]] = None
     entryType: Optional[str] = None
     daaegPhase: Optional[str] = None
     stakeholderId: Optional[int] = None
     limit: int = 20
     offset: int = 0
+    cursor: Optional[str] = None  # keyset position from a previous page's nextCursor (replaces offset)
+    count: CountMode = "exact"  # how `total` is computed
+    projection: Projection = "full"
@@ -2,6 +2,7 @@
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
+from app.dto.api_response import Total
 
 class UserBase(BaseModel):
     fullName: Optional[str] = None
@@ -38,7 +39,7 @@ class UserResponse(BaseModel):
 
 class UserListResponse(BaseModel):
     data: List[UserResponse]
-    total: int
+    total: Total  # int, "N+" for count=capped, None for count=none
     page: int
     limit: int
-    totalPages: int
+    totalPages: Optional[int]  # None unless total is a number
@@ -0,0 +1,78 @@
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as SQLAlchemyPoolTimeout
+from starlette import status
+
+from app.config.logger import logger
+from app.db.pool import PoolTimeoutError
+from app.db.timeouts import current_query_scope
+
+QUERY_CANCELED_SQLSTATE = "57014"  # statement_timeout or pg_cancel_backend
+
+
+def _exception_chain(exc: BaseException):
+    """
+    Walk an exception together with what it wraps: routers re-raise failures
+    as `HTTPException(500)` (the original is `__context__`), and SQLAlchemy
+    keeps the driver error in `.orig`.
+    """
+    seen, stack = set(), [exc]
+    while stack:
+        current = stack.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        stack.extend([getattr(current, "orig", None), current.__cause__, current.__context__])
+
+
+def database_timeout_status(exc: BaseException) -> Optional[int]:
+    """
+    504 when a query hit its statement timeout (or was cancelled), 503 when no
+    database connection could be obtained in time, otherwise None.
+    """
+    for error in _exception_chain(exc):
+        if isinstance(error, (PoolTimeoutError, SQLAlchemyPoolTimeout)):
+            return status.HTTP_503_SERVICE_UNAVAILABLE
+        sqlstate = getattr(error, "pgcode", None) or getattr(error, "sqlstate", None)
+        if sqlstate == QUERY_CANCELED_SQLSTATE:
+            return status.HTTP_504_GATEWAY_TIMEOUT
+    return None
+
+
+def database_timeout_response(request: Request, exc: BaseException) -> Optional[JSONResponse]:
+    """
+    Structured 503/504 response for database timeouts, or None if `exc` is
+    not one. Used by the HTTP and global exception handlers.
+    """
+    status_code = database_timeout_status(exc)
+    if status_code is None:
+        return None
+
+    scope = current_query_scope()
+    if status_code == status.HTTP_504_GATEWAY_TIMEOUT:
+        budget = f" ({scope.timeout_ms} ms budget)" if scope is not None and scope.timeout_ms else ""
+        logger.warning(f"Statement timeout{budget} during request: {request.url.path}")
+        message = "The request took too long to complete. Please narrow your search and try again."
+        headers = None
+    else:
+        logger.warning(f"No database connection available for request: {request.url.path}")
+        message = "The service is temporarily busy. Please try again shortly."
+        headers = {"Retry-After": "1"}
+
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "error",
+            "success": False,
+            "data": None,
+            "message": message,
+            "error": {
+                "code": status_code,
+                "path": str(request.url.path),
+            },
+        },
+        headers=headers,
+    )
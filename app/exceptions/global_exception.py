@@ -4,6 +4,7 @@ from fastapi.responses import JSONResponse
 from starlette import status
 
 from app.config.logger import logger
+from app.exceptions.database_exception import database_timeout_response
 
 
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -11,6 +12,10 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
     Catches any unhandled exceptions globally.
     Logs details and returns a safe JSON response.
     """
+    timeout_response = database_timeout_response(request, exc)
+    if timeout_response is not None:
+        return timeout_response
+
     logger.exception(
         f"Unhandled error during request: {request.url.path} - Error: {str(exc)}"
     )
@@ -2,11 +2,20 @@ from fastapi import Request
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 
+from app.exceptions.database_exception import database_timeout_response
+
 
 async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
     """
     Custom handler for HTTPException that modifies the response format
     """
+    if exc.status_code >= 500:
+        # Routers wrap unexpected errors in HTTPException(500); surface
+        # database timeouts as 503/504 instead.
+        timeout_response = database_timeout_response(request, exc)
+        if timeout_response is not None:
+            return timeout_response
+
     return JSONResponse(
         status_code=exc.status_code,
         content={
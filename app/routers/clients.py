@@ -2,28 +2,30 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query
 from typing import List, Optional
 
-from app.dto.api_response import APIResponse
+from app.dto.api_response import APIResponse, CountMode
 from app.dto.client import (
     ClientCreate, ClientUpdate, ClientResponse, ClientListResponse, ClientDropdownItem
 )
 from app.service.client_service import ClientService
 from app.dependencies import get_current_user, PermissionChecker
 from app.utils.rbac import Permission
+from app.utils.responses import streaming_api_response
 
 router = APIRouter(prefix="/organisations", tags=["Organisations (Clients)"])
 
 @router.get("/", response_model=APIResponse[ClientListResponse])
-def list_organisations(
+async def list_organisations(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     status: Optional[str] = None,
     industry: Optional[str] = None,
+    count: CountMode = Query("exact", description="How total is computed: exact, window, capped, estimate or none"),
     # current_user: dict = Depends(PermissionChecker(Permission.READ_ORGANISATION)) # Assuming permission enum exists, else use get_current_user
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        result = ClientService.list_organisations(page, limit, search, status, industry)
+        result = await ClientService.list_organisations_async(page, limit, search, status, industry, count)
         return APIResponse(
             status="success",
             success=True,
@@ -36,15 +38,13 @@ def list_organisations(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/dropdown", response_model=APIResponse[List[ClientDropdownItem]])
-def get_organisation_dropdown(
+async def get_organisation_dropdown(
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        result = ClientService.get_dropdown()
-        return APIResponse(
-            status="success",
-            success=True,
-            data=result,
+        # Streamed from a server-side cursor: one entry per organisation
+        return await streaming_api_response(
+            ClientService.stream_dropdown_async(),
             message="Organisation dropdown retrieved successfully"
         )
     except Exception as e:
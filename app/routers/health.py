@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Depends
+
+from app.dto.api_response import APIResponse
+from app.db.pool import db_pool
+from app.db.session import engine
+from app.db.routing import replica_router
+from app.db.result_cache import search_cache
+from app.db.statements import prepared_statements
+from app.vector.matrix_cache import embedding_cache
+from app.dependencies import PermissionChecker
+from app.utils.rbac import Permission
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("/db", response_model=APIResponse[dict])
+def database_stats(
+    current_user: dict = Depends(PermissionChecker(Permission.SYSTEM_ADMIN))
+):
+    try:
+        return APIResponse(
+            status="success",
+            success=True,
+            data={
+                "pool": db_pool.stats(),
+                "async_pool": engine.pool.status(),
+                "prepared_statements": prepared_statements.stats(),
+                "replicas": replica_router.stats(),
+            },
+            message="Database statistics retrieved successfully"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/caches", response_model=APIResponse[dict])
+def cache_stats(
+    current_user: dict = Depends(PermissionChecker(Permission.SYSTEM_ADMIN))
+):
+    # Per worker: each process keeps its own caches
+    try:
+        return APIResponse(
+            status="success",
+            success=True,
+            data={
+                "knowledge_search": search_cache.stats(),
+                "embedding_matrices": embedding_cache.stats(),
+            },
+            message="Cache statistics retrieved successfully"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,15 @@
 
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request
 from typing import List, Optional
-from app.dto.core import KnowledgeCreate, KnowledgeResponse, KnowledgeSearchRequest
-from app.dto.api_response import APIResponse
+from app.config.settings import settings
+from app.dto.core import (
+    BulkIngestResult, KnowledgeCreate, KnowledgeFacets, KnowledgeResponse, KnowledgeSearchRequest, Projection, SearchMode,
+    SemanticSearchHit, SemanticSearchRequest
+)
+from app.dto.api_response import APIResponse, CountMode
 from app.service.knowledge_service import KnowledgeService
+from app.utils.cursor import InvalidCursor
+from app.utils.json_stream import iter_json_records
 from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/knowledge", tags=["Knowledge"])
@@ -26,32 +32,77 @@ def create_entry(payload: KnowledgeCreate, current_user: dict = Depends(get_curr
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=APIResponse[BulkIngestResult])
+async def bulk_create_entries(request: Request, current_user: dict = Depends(get_current_user)):
+    """Create many entries from a JSON array or NDJSON body (optionally Content-Encoding: gzip).
+
+    The body is read and validated as it streams in, and inserted in transactions of
+    KNOWLEDGE_BULK_BATCH_ROWS rows that commit independently of each other and of the
+    request; `results` has the id or error of every record.
+    """
+    encoding = request.headers.get("content-encoding", "").lower()
+    if encoding not in ("", "identity", "gzip"):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+    records = iter_json_records(
+        request.stream(), gzip=encoding == "gzip", max_record_bytes=settings.KNOWLEDGE_BULK_MAX_RECORD_BYTES
+    )
+    try:
+        result = await KnowledgeService.ingest_entries_async(records, current_user)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    complete = result["error"] is None and result["failed"] == 0
+    return APIResponse(
+        status="success" if complete else "error",
+        success=complete,
+        data=result,
+        message=f"{result['inserted']} knowledge entries created, {result['failed']} failed",
+        error=result["error"]
+    )
+
 @router.get("/", response_model=APIResponse[dict])
-def search_entries(
+async def search_entries(
     clientId: int = Query(..., description="Client ID to filter by"),
     query: Optional[str] = None,
+    mode: SearchMode = Query("substring", description="substring (ILIKE), fulltext (ranked) or hybrid (full-text + semantic)"),
+    fuzzy: bool = Query(False, description="Typo-tolerant matching by trigram similarity (substring mode)"),
+    lexicalWeight: Optional[float] = Query(None, ge=0, description="Weight of the full-text ranking (hybrid mode)"),
+    vectorWeight: Optional[float] = Query(None, ge=0, description="Weight of the semantic ranking (hybrid mode)"),
     tags: Optional[List[str]] = Query(None),
     entryType: Optional[str] = None,
     daaegPhase: Optional[str] = None,
     stakeholderId: Optional[int] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page; replaces page"),
+    count: CountMode = Query("exact", description="How total is computed: exact, window, capped, estimate or none"),
+    projection: Projection = Query("full", description="full content, or a bounded snippet plus contentLength"),
     current_user: dict = Depends(get_current_user)
 ):
-    offset = (page - 1) * limit
+    offset = 0 if cursor else (page - 1) * limit
+    if fuzzy and mode != "substring":
+        raise HTTPException(status_code=400, detail="fuzzy is only supported with mode=substring")
+    if (lexicalWeight is not None or vectorWeight is not None) and mode != "hybrid":
+        raise HTTPException(status_code=400, detail="lexicalWeight and vectorWeight are only supported with mode=hybrid")
     filters = KnowledgeSearchRequest(
         clientId=clientId,
         query=query,
+        mode=mode,
+        fuzzy=fuzzy,
+        lexicalWeight=lexicalWeight,
+        vectorWeight=vectorWeight,
         tags=tags,
         entryType=entryType,
         daaegPhase=daaegPhase,
         stakeholderId=stakeholderId,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        count=count,
+        projection=projection
     )
     # Pass current_user to service for security check
     try:
-        result = KnowledgeService.search_entries(filters, current_user)
+        result = await KnowledgeService.search_entries_async(filters, current_user)
         return APIResponse(
             status="success",
             success=True,
@@ -60,15 +111,75 @@ def search_entries(
         )
     except HTTPException as he:
         raise he
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        if "Access denied" in str(e):
+             raise HTTPException(status_code=403, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/facets", response_model=APIResponse[KnowledgeFacets])
+async def get_facets(
+    clientId: int = Query(..., description="Client ID to filter by"),
+    query: Optional[str] = None,
+    mode: SearchMode = Query("substring", description="substring (ILIKE), fulltext or hybrid (full-text match)"),
+    fuzzy: bool = Query(False, description="Typo-tolerant matching by trigram similarity (substring mode)"),
+    tags: Optional[List[str]] = Query(None),
+    entryType: Optional[str] = None,
+    daaegPhase: Optional[str] = None,
+    stakeholderId: Optional[int] = None,
+    top: int = Query(settings.KNOWLEDGE_FACET_TOP_N, ge=1, le=100, description="Tags and stakeholders returned"),
+    current_user: dict = Depends(get_current_user)
+):
+    if fuzzy and mode != "substring":
+        raise HTTPException(status_code=400, detail="fuzzy is only supported with mode=substring")
+    filters = KnowledgeSearchRequest(
+        clientId=clientId,
+        query=query,
+        mode=mode,
+        fuzzy=fuzzy,
+        tags=tags,
+        entryType=entryType,
+        daaegPhase=daaegPhase,
+        stakeholderId=stakeholderId
+    )
+    try:
+        facets = await KnowledgeService.get_facets_async(filters, current_user, top)
+        return APIResponse(
+            status="success",
+            success=True,
+            data=facets,
+            message="Knowledge facets retrieved successfully"
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        if "Access denied" in str(e):
+             raise HTTPException(status_code=403, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/semantic-search", response_model=APIResponse[List[SemanticSearchHit]])
+def semantic_search(payload: SemanticSearchRequest, current_user: dict = Depends(get_current_user)):
+    # Sync route: the NumPy scoring runs in the threadpool, off the event loop
+    try:
+        hits = KnowledgeService.semantic_search(payload, current_user)
+        return APIResponse(
+            status="success",
+            success=True,
+            data=hits,
+            message="Semantic search results retrieved successfully"
+        )
+    except HTTPException as he:
+        raise he
     except Exception as e:
         if "Access denied" in str(e):
              raise HTTPException(status_code=403, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{entry_id}", response_model=APIResponse[KnowledgeResponse])
-def get_entry(entry_id: int, current_user: dict = Depends(get_current_user)):
+async def get_entry(entry_id: int, current_user: dict = Depends(get_current_user)):
     try:
-        entry = KnowledgeService.get_entry_by_id(entry_id)
+        entry = await KnowledgeService.get_entry_by_id_async(entry_id)
         if not entry:
             raise HTTPException(status_code=404, detail="Entry not found")
         return APIResponse(
@@ -5,6 +5,7 @@ from app.dto.core import StakeholderCreate, StakeholderUpdate, StakeholderRespon
 from app.dto.api_response import APIResponse
 from app.service.stakeholder_service import StakeholderService
 from app.dependencies import get_current_user
+from app.utils.responses import streaming_api_response
 
 router = APIRouter(prefix="/stakeholders", tags=["Stakeholders"])
 
@@ -27,14 +28,12 @@ def create_stakeholder(payload: StakeholderCreate, current_user: dict = Depends(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=APIResponse[List[StakeholderResponse]])
-def get_stakeholders(clientId: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+async def get_stakeholders(clientId: Optional[int] = None, current_user: dict = Depends(get_current_user)):
     try:
         # TODO: Enforce that if clientId is None, only SuperAdmin can see all, otherwise filter by user's access
-        result = StakeholderService.get_stakeholders(client_id=clientId)
-        return APIResponse(
-            status="success",
-            success=True,
-            data=result,
+        # Streamed from a server-side cursor: the full list is unbounded without clientId
+        return await streaming_api_response(
+            StakeholderService.stream_stakeholders_async(client_id=clientId),
             message="Stakeholders retrieved successfully"
         )
     except HTTPException as he:
@@ -4,7 +4,7 @@ from typing import List, Optional
 from app.dto.user import (
     UserResponse, CreateUserRequest, UpdateUserRequest, UserListResponse
 )
-from app.dto.api_response import APIResponse
+from app.dto.api_response import APIResponse, CountMode
 from app.service.user_service import (
     list_users, get_user, create_user, update_user, delete_user
 )
@@ -21,11 +21,12 @@ def list_users_route(
     role: str = "",
     status: str = "",
     organisation: Optional[int] = None,
+    count: CountMode = Query("exact", description="How total is computed: exact, window, capped, estimate or none"),
     current_user: dict = Depends(PermissionChecker(Permission.MANAGE_USERS))
 ):
     current_user_id = current_user["user_id"]
     try:
-        result = list_users(page, limit, search, role, status, organisation, current_user_id)
+        result = list_users(page, limit, search, role, status, organisation, current_user_id, count)
         return APIResponse(
             status="success",
             success=True,
@@ -2,8 +2,8 @@
 import json
 import logging
 from typing import Dict, Optional, Any
-import psycopg2
-from app.config.settings import settings
+from app.db.pool import get_connection, release_connection
+from app.db.unit_of_work import savepoint
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +19,12 @@ class AuditService:
     ) -> None:
         """
         Log an action to the audit_log table.
+        Inside a request this joins the request's transaction; the insert runs
+        in a savepoint so an audit failure never aborts the caller's work.
         """
         conn = None
         try:
-            conn = psycopg2.connect(settings.DATABASE_URL)
+            conn = get_connection()
             cur = conn.cursor()
             
             query = """
@@ -30,21 +32,21 @@ class AuditService:
                 (user_id, action, resource_type, resource_id, client_id, details, created_at)
                 VALUES (%s, %s, %s, %s, %s, %s, NOW())
             """
-            cur.execute(query, (
-                user_id,
-                action,
-                resource_type,
-                resource_id,
-                client_id,
-                json.dumps(details or {})
-            ))
+            with savepoint(conn, "audit_log"):
+                cur.execute(query, (
+                    user_id,
+                    action,
+                    resource_type,
+                    resource_id,
+                    client_id,
+                    json.dumps(details or {})
+                ))
             conn.commit()
             logger.info(f"Audit log: {action} by user {user_id}")
             
         except Exception as e:
             logger.error(f"Failed to log audit action: {e}")
         finally:
-            if conn:
-                conn.close()
+            release_connection(conn)
 
 audit_service = AuditService()
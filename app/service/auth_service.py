@@ -1,12 +1,13 @@
 
 import logging
 from typing import Optional, Dict, List
-import psycopg2
 import json
 from datetime import datetime, timedelta
 import secrets
 
 from app.config.settings import settings
+from app.db.pool import get_connection, release_connection
+from app.db.unit_of_work import on_commit, savepoint
 from app.utils.rbac import RBACManager
 from app.dto.auth import LoginResponse, UserDTO, OrganisationDTO
 from app.service.audit_service import audit_service
@@ -21,7 +22,39 @@ rbac_manager = RBACManager(
 )
 
 def _get_db_connection():
-    return psycopg2.connect(settings.DATABASE_URL)
+    return get_connection()
+
+def _rollback(conn) -> None:
+    # Errors are swallowed below, so make sure the request's transaction is not committed half-done
+    if conn:
+        try:
+            conn.rollback()
+        except Exception as e:
+            logger.error(f"Rollback error: {e}")
+
+def _fetch_login_organisations(conn, user_data: Dict) -> List:
+    cur = conn.cursor()
+    try:
+        # Logic to fetch organisations based on role (Super Admin vs others)
+        if user_data.get('role') == 'super_admin':
+            cur.execute("""
+                SELECT client_id, name FROM clients 
+                WHERE is_active = true 
+                  AND (metadata->>'is_deleted' IS NULL OR metadata->>'is_deleted' != 'true')
+                ORDER BY name
+            """)
+            return cur.fetchall()
+        if user_data.get('client_access'):
+            cur.execute("""
+                SELECT client_id, name FROM clients 
+                WHERE client_id = ANY(%s)
+                  AND is_active = true
+                  AND (metadata->>'is_deleted' IS NULL OR metadata->>'is_deleted' != 'true')
+            """, (user_data['client_access'],))
+            return cur.fetchall()
+        return []
+    finally:
+        cur.close()
 
 def login_user(email: str, password: str) -> Optional[LoginResponse]:
     """
@@ -41,27 +74,8 @@ def login_user(email: str, password: str) -> Optional[LoginResponse]:
     conn = None
     try:
         conn = _get_db_connection()
-        cur = conn.cursor()
-        
-        # Logic to fetch organisations based on role (Super Admin vs others)
-        if user_data.get('role') == 'super_admin':
-            cur.execute("""
-                SELECT client_id, name FROM clients 
-                WHERE is_active = true 
-                  AND (metadata->>'is_deleted' IS NULL OR metadata->>'is_deleted' != 'true')
-                ORDER BY name
-            """)
-            organisations_data = cur.fetchall()
-        elif user_data.get('client_access'):
-            cur.execute("""
-                SELECT client_id, name FROM clients 
-                WHERE client_id = ANY(%s)
-                  AND is_active = true
-                  AND (metadata->>'is_deleted' IS NULL OR metadata->>'is_deleted' != 'true')
-            """, (user_data['client_access'],))
-            organisations_data = cur.fetchall()
-        else:
-            organisations_data = []
+        with savepoint(conn, "login_organisations"):
+            organisations_data = _fetch_login_organisations(conn, user_data)
 
         organisations = [OrganisationDTO(id=str(row[0]), name=row[1]) for row in organisations_data]
         
@@ -72,13 +86,12 @@ def login_user(email: str, password: str) -> Optional[LoginResponse]:
         # Default to first org if no last selected
         if not last_selected_org_id and organisations:
             last_selected_org_id = organisations[0].id
-            
-        cur.close()
     except Exception as e:
+        # Best effort: the savepoint keeps the login's audit write committable
         logger.error(f"Error fetching organisations: {e}")
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
     # Audit Log
     audit_service.log_action(
@@ -133,8 +146,8 @@ def forgot_password(email: str) -> bool:
         
         conn.commit()
         
-        # Send Email
-        email_service.send_password_reset_email(email, reset_token, full_name or "User")
+        # Send Email once the token is committed (deferred to the end of the request)
+        on_commit(conn, lambda: email_service.send_password_reset_email(email, reset_token, full_name or "User"))
         
         # Audit Log
         audit_service.log_action(
@@ -147,29 +160,29 @@ def forgot_password(email: str) -> bool:
         
     except Exception as e:
         logger.error(f"Forgot password error: {e}")
+        _rollback(conn)
         return False
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def verify_reset_token(token: str) -> bool:
     conn = None
     try:
         conn = _get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT user_id FROM user_sessions 
-            WHERE token_hash = %s AND expires_at > NOW()
-        """, (f"reset_{token}",))
-        
-        return cur.fetchone() is not None
+        with savepoint(conn, "verify_reset_token"):
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT user_id FROM user_sessions 
+                WHERE token_hash = %s AND expires_at > NOW()
+            """, (f"reset_{token}",))
+            return cur.fetchone() is not None
     except Exception as e:
         logger.error(f"Verify token error: {e}")
         return False
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def reset_password(token: str, password: str) -> bool:
     conn = None
@@ -212,33 +225,34 @@ def reset_password(token: str, password: str) -> bool:
         return True
     except Exception as e:
         logger.error(f"Reset password error: {e}")
+        _rollback(conn)
         return False
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def get_current_user_profile(user_id: int) -> Optional[Dict]:
     conn = None
     try:
         conn = _get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT id, username, email, role, client_access, full_name, last_login
-            FROM users WHERE id = %s
-        """, (user_id,))
-        
-        row = cur.fetchone()
-        if not row:
-            return None
+        with savepoint(conn, "current_user_profile"):
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT id, username, email, role, client_access, full_name, last_login
+                FROM users WHERE id = %s
+            """, (user_id,))
             
-        uid, uname, email, role, client_access, full_name, last_login = row
-        
-        # Get organisations
-        organisations = []
-        if client_access:
-            cur.execute("SELECT client_id, name FROM clients WHERE client_id = ANY(%s)", (client_access,))
-            organisations = [{'id': str(r[0]), 'name': r[1]} for r in cur.fetchall()]
+            row = cur.fetchone()
+            if not row:
+                return None
+                
+            uid, uname, email, role, client_access, full_name, last_login = row
+            
+            # Get organisations
+            organisations = []
+            if client_access:
+                cur.execute("SELECT client_id, name FROM clients WHERE client_id = ANY(%s)", (client_access,))
+                organisations = [{'id': str(r[0]), 'name': r[1]} for r in cur.fetchall()]
             
         return {
             'id': str(uid),
@@ -254,7 +268,7 @@ def get_current_user_profile(user_id: int) -> Optional[Dict]:
         return None
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def logout_user(user_id: int):
     conn = None
@@ -271,6 +285,7 @@ def logout_user(user_id: int):
         )
     except Exception as e:
         logger.error(f"Logout error: {e}")
+        _rollback(conn)
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
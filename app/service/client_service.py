@@ -1,11 +1,22 @@
 
 import logging
 import json
-import psycopg2
-from typing import List, Optional, Dict, Any
+from functools import partial
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
+from sqlalchemy import text
+
 from app.config.settings import settings
+from app.db.counting import WINDOW_COUNT_COLUMN, count_statement, read_total, run_count, total_pages, window_total
+from app.db.pool import get_connection, release_connection
+from app.db.result_cache import search_cache
+from app.db.routing import read_only, read_connection
+from app.db.mapping import RowMapper, json_object, to_str
+from app.db.session import bind_params
+from app.db.streaming import stream_models_async
+from app.db.unit_of_work import on_commit, savepoint
+from app.dto.api_response import CountMode
 from app.dto.client import (
     ClientCreate, ClientUpdate, ClientResponse, ClientListResponse, ClientDropdownItem
 )
@@ -13,10 +24,27 @@ from app.service.audit_service import audit_service
 
 logger = logging.getLogger(__name__)
 
+DROPDOWN_QUERY = """
+    SELECT client_id, name FROM clients 
+    WHERE is_active = true 
+    ORDER BY name
+"""
+
+def _status_label(is_active) -> str:
+    return 'Enabled' if is_active else 'Disabled'
+
+CLIENT_MAPPER = RowMapper(
+    ClientResponse,
+    rename={"client_id": "id", "relationship_start_date": "relationshipStartDate", "is_active": "status"},
+    convert={"id": to_str, "status": _status_label, "metadata": json_object},
+)
+
+DROPDOWN_MAPPER = RowMapper(ClientDropdownItem, rename={"client_id": "id"}, convert={"id": to_str})
+
 class ClientService:
     @staticmethod
     def _get_connection():
-        return psycopg2.connect(settings.DATABASE_URL)
+        return get_connection()
 
     @staticmethod
     def _parse_json_field(value):
@@ -30,129 +58,144 @@ class ClientService:
             return {}
 
     @staticmethod
+    def _build_list_query(
+        search: str, status: str, industry: str, count: CountMode = "exact"
+    ) -> Tuple[str, Optional[Tuple[str, List[Any]]], List[Any]]:
+        """
+        (page query, count statement, params). For count=window the page
+        query carries the total and the count statement is the exact one,
+        only needed past the last page.
+        """
+        where = " WHERE 1=1"
+        params = []
+        
+        # Search
+        if search:
+            where += " AND (c.name ILIKE %s OR c.industry ILIKE %s)"
+            search_param = f'%{search}%'
+            params.extend([search_param, search_param])
+            
+        # Status
+        if status:
+            is_active = status.lower() in ['enabled', 'active', 'true']
+            where += " AND c.is_active = %s"
+            params.append(is_active)
+            
+        # Industry
+        if industry:
+            where += " AND c.industry = %s"
+            params.append(industry)
+        
+        columns = """c.client_id, c.name, c.industry, c.relationship_start_date, c.is_active, 
+                   c.metadata, c.created_at, c.updated_at"""
+        if count == "window":
+            columns += f", {WINDOW_COUNT_COLUMN}"
+        # Pagination placeholders (values are appended by the caller)
+        base_query = f"""
+            SELECT {columns}
+            FROM clients c{where}
+            ORDER BY c.created_at DESC LIMIT %s OFFSET %s
+        """
+        count_stmt = count_statement("exact" if count == "window" else count, f"SELECT 1 FROM clients c{where}", params)
+        return base_query, count_stmt, params
+
+    @staticmethod
+    @read_only
     def list_organisations(
-        page: int, limit: int, search: str, status: str, industry: str
+        page: int, limit: int, search: str, status: str, industry: str, count: CountMode = "exact"
     ) -> ClientListResponse:
         conn = None
         try:
             conn = ClientService._get_connection()
             cur = conn.cursor()
             
-            # Base query
-            base_query = """
-                SELECT c.client_id, c.name, c.industry, c.relationship_start_date, c.is_active, 
-                       c.metadata, c.created_at, c.updated_at
-                FROM clients c
-                WHERE 1=1
-            """
-            count_query = "SELECT COUNT(*) FROM clients c WHERE 1=1"
-            params = []
-            count_params = []
-            
-            # Search
-            if search:
-                search_clause = " AND (c.name ILIKE %s OR c.industry ILIKE %s)"
-                base_query += search_clause
-                count_query += search_clause
-                search_param = f'%{search}%'
-                params.extend([search_param, search_param])
-                count_params.extend([search_param, search_param])
-                
-            # Status
-            if status:
-                is_active = status.lower() in ['enabled', 'active', 'true']
-                status_clause = " AND c.is_active = %s"
-                base_query += status_clause
-                count_query += status_clause
-                params.append(is_active)
-                count_params.append(is_active)
-                
-            # Industry
-            if industry:
-                ind_clause = " AND c.industry = %s"
-                base_query += ind_clause
-                count_query += ind_clause
-                params.append(industry)
-                count_params.append(industry)
+            base_query, count_stmt, params = ClientService._build_list_query(search, status, industry, count)
+            offset = (page - 1) * limit
                 
             # Count
-            cur.execute(count_query, tuple(count_params))
-            total = cur.fetchone()[0]
+            total = None
+            if count_stmt and count != "window":
+                total = run_count(cur, count, count_stmt, label="client_count")
             
             # Pagination
-            base_query += " ORDER BY c.created_at DESC LIMIT %s OFFSET %s"
-            params.extend([limit, (page - 1) * limit])
-            
-            cur.execute(base_query, tuple(params))
+            cur.execute(base_query, tuple(params + [limit, offset]))
             rows = cur.fetchall()
+            if count == "window":
+                total = window_total(rows, offset)
+                if total is None:
+                    total = run_count(cur, "exact", count_stmt, label="client_count")
             
-            data = []
-            for row in rows:
-                cid, name, ind, rel_start, active, meta_json, created, updated = row
-                meta = ClientService._parse_json_field(meta_json)
-                
-                data.append(ClientResponse(
-                    id=str(cid),
-                    name=name,
-                    industry=ind,
-                    relationshipStartDate=rel_start,
-                    status='Enabled' if active else 'Disabled',
-                    metadata=meta,
-                    created_at=created,
-                    updated_at=updated
-                ))
+            data = CLIENT_MAPPER.map_all(rows, cur.description)
                 
             return ClientListResponse(
                 data=data,
                 total=total,
                 page=page,
                 limit=limit,
-                totalPages=(total + limit - 1) // limit
+                totalPages=total_pages(total, limit)
             )
         except Exception as e:
             logger.error(f"List organisations error: {e}")
             raise e
         finally:
             if conn:
-                conn.close()
+                release_connection(conn)
+
+    @staticmethod
+    async def list_organisations_async(
+        page: int, limit: int, search: str, status: str, industry: str, count: CountMode = "exact"
+    ) -> ClientListResponse:
+        try:
+            base_query, count_stmt, params = ClientService._build_list_query(search, status, industry, count)
+            offset = (page - 1) * limit
+            page_stmt, page_params = bind_params(base_query, params + [limit, offset])
+            
+            async with read_connection() as conn:
+                total = None
+                if count_stmt and count != "window":
+                    total = read_total(count, (await conn.execute(*bind_params(*count_stmt))).scalar_one())
+                rows = (await conn.execute(page_stmt, page_params)).fetchall()
+                if count == "window":
+                    total = window_total(rows, offset)
+                    if total is None:
+                        total = (await conn.execute(*bind_params(*count_stmt))).scalar_one()
+            
+            return ClientListResponse(
+                data=CLIENT_MAPPER.map_all(rows),
+                total=total,
+                page=page,
+                limit=limit,
+                totalPages=total_pages(total, limit)
+            )
+        except Exception as e:
+            logger.error(f"List organisations error: {e}")
+            raise e
 
     @staticmethod
     def get_organisation(client_id: int) -> Optional[ClientResponse]:
         conn = None
         try:
             conn = ClientService._get_connection()
-            cur = conn.cursor()
-            
-            cur.execute("""
-                SELECT client_id, name, industry, relationship_start_date, is_active, metadata, 
-                       created_at, updated_at
-                FROM clients 
-                WHERE client_id = %s
-            """, (client_id,))
+            with savepoint(conn, "get_organisation"):
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT client_id, name, industry, relationship_start_date, is_active, metadata, 
+                           created_at, updated_at
+                    FROM clients 
+                    WHERE client_id = %s
+                """, (client_id,))
             
-            row = cur.fetchone()
-            if not row:
-                return None
+                row = cur.fetchone()
+                if not row:
+                    return None
                 
-            cid, name, ind, rel_start, active, meta_json, created, updated = row
-            meta = ClientService._parse_json_field(meta_json)
-            
-            return ClientResponse(
-                id=str(cid),
-                name=name,
-                industry=ind,
-                relationshipStartDate=rel_start,
-                status='Enabled' if active else 'Disabled',
-                metadata=meta,
-                created_at=created,
-                updated_at=updated
-            )
+                return CLIENT_MAPPER.map_one(row, cur.description)
         except Exception as e:
             logger.error(f"Get organisation error: {e}")
             return None
         finally:
             if conn:
-                conn.close()
+                release_connection(conn)
 
     @staticmethod
     def create_organisation(payload: ClientCreate, user_id: int) -> ClientResponse:
@@ -200,7 +243,7 @@ class ClientService:
             raise e
         finally:
             if conn:
-                conn.close()
+                release_connection(conn)
 
     @staticmethod
     def update_organisation(client_id: int, payload: ClientUpdate, user_id: int) -> Optional[ClientResponse]:
@@ -270,7 +313,7 @@ class ClientService:
             raise e
         finally:
             if conn:
-                conn.close()
+                release_connection(conn)
 
     @staticmethod
     def delete_organisation(client_id: int, user_id: int) -> bool:
@@ -299,6 +342,7 @@ class ClientService:
                 return False
                 
             conn.commit()
+            on_commit(conn, partial(search_cache.invalidate, client_id))
             
             audit_service.log_action(
                 user_id=user_id,
@@ -313,25 +357,36 @@ class ClientService:
             raise e
         finally:
             if conn:
-                conn.close()
+                release_connection(conn)
 
     @staticmethod
+    @read_only
     def get_dropdown() -> List[ClientDropdownItem]:
         conn = None
         try:
             conn = ClientService._get_connection()
             cur = conn.cursor()
             
-            cur.execute("""
-                SELECT client_id, name FROM clients 
-                WHERE is_active = true 
-                ORDER BY name
-            """)
+            cur.execute(DROPDOWN_QUERY)
             
-            return [ClientDropdownItem(id=str(r[0]), name=r[1]) for r in cur.fetchall()]
+            return DROPDOWN_MAPPER.map_all(cur.fetchall(), cur.description)
         except Exception as e:
             logger.error(f"Get dropdown error: {e}")
             raise e
         finally:
             if conn:
-                conn.close()
+                release_connection(conn)
+
+    @staticmethod
+    def stream_dropdown_async() -> AsyncIterator[List[ClientDropdownItem]]:
+        return stream_models_async(DROPDOWN_MAPPER, DROPDOWN_QUERY)
+
+    @staticmethod
+    async def get_dropdown_async() -> List[ClientDropdownItem]:
+        try:
+            async with read_connection() as conn:
+                rows = (await conn.execute(text(DROPDOWN_QUERY))).fetchall()
+            return DROPDOWN_MAPPER.map_all(rows)
+        except Exception as e:
+            logger.error(f"Get dropdown error: {e}")
+            raise e
@@ -1,16 +1,24 @@
 import json
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-import psycopg2
 from app.config.settings import settings
+from app.db.pool import get_connection, release_connection
 from app.config.logger import logger
+from app.db.batch import StatementBatch
+from app.db.mapping import RowMapper, json_object
 from app.dto.deliverable import DeliverableCreate, DeliverableResponse, ReviewSubmit
 
+DELIVERABLE_MAPPER = RowMapper(
+    DeliverableResponse,
+    rename={"created_by": "submittedBy", "created_at": "submittedAt"},
+    convert={"generationMetadata": json_object},
+)
+
 class DeliverableService:
     
     @staticmethod
     def _get_connection():
-        return psycopg2.connect(settings.DATABASE_URL)
+        return get_connection()
 
     @staticmethod
     def submit_deliverable(payload: DeliverableCreate, created_by: int, file_path: str = None) -> DeliverableResponse:
@@ -36,28 +44,27 @@ class DeliverableService:
 
             # Trigger assignment logic here (omitted for brevity, assume manual or auto-assign later)
             
-            return DeliverableResponse(
-                workflow_id=row[0], client_id=row[1], deliverable_type=row[2], status=row[3],
-                submitted_by=row[4], submitted_at=row[5], generation_metadata=row[6], updated_at=row[7]
-            )
+            return DELIVERABLE_MAPPER.map_one(row, cur.description)
         except Exception as e:
             conn.rollback()
             logger.error(f"Error submitting deliverable: {e}")
             raise e
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
     def submit_review(workflow_id: int, reviewer_id: int, payload: ReviewSubmit) -> bool:
         conn = DeliverableService._get_connection()
         try:
             cur = conn.cursor()
+            # The review, enrichment and status writes are independent: send them in one round trip
+            batch = StatementBatch(cur)
             
             # Record review
             feedback = payload.comments or ""
             if payload.qualityScore: feedback += f" Score: {payload.qualityScore}"
             
-            cur.execute("""
+            batch.add("""
                 INSERT INTO deliverable_reviews (workflow_id, reviewer_id, review_status, feedback, reviewed_at)
                 VALUES (%s, %s, %s, %s, NOW())
             """, (workflow_id, reviewer_id, payload.action, feedback))
@@ -67,16 +74,17 @@ class DeliverableService:
             if payload.action == 'approve':
                 new_status = 'approved'
                 # Trigger enrichment
-                DeliverableService._schedule_enrichment(cur, workflow_id)
+                DeliverableService._schedule_enrichment(batch, workflow_id)
             elif payload.action == 'reject':
                 new_status = 'rejected'
             elif payload.action == 'request_changes':
                 new_status = 'draft'
             
-            cur.execute("""
+            batch.add("""
                 UPDATE deliverable_workflows SET status = %s, updated_at = NOW() WHERE workflow_id = %s
             """, (new_status, workflow_id))
             
+            batch.execute()
             conn.commit()
             return True
         except Exception as e:
@@ -84,12 +92,12 @@ class DeliverableService:
             logger.error(f"Error submitting review: {e}")
             raise e
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
-    def _schedule_enrichment(cur, workflow_id: int):
+    def _schedule_enrichment(batch: StatementBatch, workflow_id: int):
         # Insert into queue
-        cur.execute("""
+        batch.add("""
             INSERT INTO enrichment_queue (workflow_id, status, created_at) VALUES (%s, 'pending', NOW())
         """, (workflow_id,))
 
@@ -104,9 +112,6 @@ class DeliverableService:
             """, (workflow_id,))
             row = cur.fetchone()
             if not row: return None
-            return DeliverableResponse(
-                workflow_id=row[0], client_id=row[1], deliverable_type=row[2], status=row[3],
-                submitted_by=row[4], submitted_at=row[5], generation_metadata=row[6], updated_at=row[7]
-            )
+            return DELIVERABLE_MAPPER.map_one(row, cur.description)
         finally:
-            conn.close()
+            release_connection(conn)
@@ -1,33 +1,419 @@
-
-import psycopg2
+import asyncio
 import json
-from typing import List, Optional, Dict, Any
+from functools import partial
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Any, Sequence, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
 from app.config.settings import settings
-from app.dto.core import KnowledgeCreate, KnowledgeResponse, KnowledgeSearchRequest
+from app.db.bulk import copy_knowledge_entries
+from app.db.counting import WINDOW_COUNT_COLUMN, count_statement, read_total, run_count, window_total
+from app.db.pool import get_connection, release_connection
+from app.db.result_cache import search_cache
+from app.db.routing import read_only, read_connection, replica_router
+from app.db.mapping import RowMapper, json_object, list_or_empty
+from app.db.session import bind_params
+from app.db.statements import prepared_statements
+from app.db.unit_of_work import on_commit, unit_of_work
+from app.dto.api_response import CountMode, Total
+from app.dto.core import (
+    HIGHLIGHT_START, HIGHLIGHT_STOP, BulkIngestResult, BulkRowResult, FacetCount, HybridSearchHit, HybridSnippetHit, KnowledgeCreate, KnowledgeFacets,
+    KnowledgeResponse, KnowledgeSearchRequest, KnowledgeSnippet, SemanticSearchHit, SemanticSearchRequest,
+    StakeholderFacetCount
+)
+from app.utils.cursor import InvalidCursor, decode_cursor, encode_cursor, filter_hash
+from app.utils.json_stream import JSONStreamError
+from app.vector.embedder import EMBEDDING_VERSION, embedder, entry_text
+from app.vector.backends import Hit, vector_store
+
+ENTRY_COLUMNS = "entry_id, client_id, content, entry_type, source, daaeg_phase, tags, stakeholder_ids, metadata, created_by, created_at, updated_at"
+
+# Shared cache generation of a client, bumped by every write to its entries (see migration 0009)
+CACHE_GENERATION_QUERY = """
+    SELECT COALESCE((SELECT generation FROM knowledge_cache_generations WHERE client_id = %s), 0),
+           txid_current_if_assigned() IS NOT NULL
+"""
+
+# Text search configuration of knowledge_entries.search_vector (see migration 0003)
+TEXT_SEARCH_CONFIG = "english"
+
+# Scopes the word-similarity cutoff used by `<%` to the search transaction
+FUZZY_THRESHOLD_QUERY = "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)"
+
+ENTRY_MAPPER = RowMapper(
+    KnowledgeResponse,
+    convert={"metadata": json_object, "tags": list_or_empty, "stakeholderIds": list_or_empty},
+)
+
+HIT_MAPPER = RowMapper(SemanticSearchHit, convert=ENTRY_MAPPER.convert)
+
+# Facet counts of the entries selected by `{matched}` (see migration 0007 for knowledge_facet_values)
+FACET_COLUMNS = "entry_type, daaeg_phase, tags, stakeholder_ids"
+FACET_COUNTS_QUERY = """
+    SELECT f.facet, f.value, count(*) AS entries
+    FROM ({matched}) e,
+         LATERAL knowledge_facet_values(e.entry_type, e.daaeg_phase, e.tags, e.stakeholder_ids) f
+    GROUP BY f.facet, f.value
+"""
+# Same counts for a whole client, maintained by triggers
+FACET_COUNTERS_QUERY = "SELECT facet, value, entries FROM knowledge_facet_counts WHERE client_id = %s AND entries > 0"
+# Keeps the top N tags and stakeholders; entry types and phases are few
+FACET_TOP_QUERY = """
+    SELECT facet, value, entries FROM (
+        SELECT counts.*, row_number() OVER (PARTITION BY facet ORDER BY entries DESC, value) AS facet_rank
+        FROM ({counts}) counts
+    ) ranked
+    WHERE facet NOT IN ('tag', 'stakeholder') OR facet_rank <= %s
+    ORDER BY facet, facet_rank
+"""
+FACET_STAKEHOLDERS_QUERY = "SELECT stakeholder_id, name FROM stakeholders WHERE client_id = %s AND stakeholder_id = ANY(%s)"
+
+# Search filters a cursor is bound to; paging a different search with it is rejected
+CURSOR_FILTER_FIELDS = {"clientId", "query", "mode", "fuzzy", "tags", "entryType", "daaegPhase", "stakeholderId"}
+
+HYBRID_HIT_MAPPER = RowMapper(HybridSearchHit, convert=ENTRY_MAPPER.convert)
+
+# Result rows of projection=snippet: the content is replaced by `{snippet}` and its length
+SNIPPET_COLUMNS = (
+    "entry_id, client_id, entry_type, source, daaeg_phase, tags, stakeholder_ids, metadata, created_by, "
+    "created_at, updated_at, length(content) AS content_length, {snippet} AS snippet"
+)
+
+# Snippet text: the content without the highlight markers, so only ts_headline's are left
+SNIPPET_SOURCE = "translate(content, %s, '')"
+# Appended to settings.KNOWLEDGE_HEADLINE_OPTIONS; the last StartSel/StopSel wins
+HEADLINE_MARKERS = f', StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}"'
+
+SNIPPET_MAPPER = RowMapper(KnowledgeSnippet, convert=ENTRY_MAPPER.convert)
+
+HYBRID_SNIPPET_MAPPER = RowMapper(HybridSnippetHit, convert=ENTRY_MAPPER.convert)
+
+# Lexical ranking of mode=hybrid (the query parameter comes first)
+HYBRID_LEXICAL_COLUMNS = f"entry_id, ts_rank_cd(search_vector, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s)) AS rank"
 
 class KnowledgeService:
     @staticmethod
     def get_connection():
-        return psycopg2.connect(settings.DATABASE_URL)
+        return get_connection()
+
+    @staticmethod
+    def _has_client_access(client_id: int, current_user: dict) -> bool:
+        from app.utils.rbac import RBACManager
+        return RBACManager().has_client_access(current_user.get("client_access", []), client_id, current_user.get("role"))
+
+    @staticmethod
+    def _check_client_access(filters: KnowledgeSearchRequest, current_user: dict) -> None:
+        # Security Check: Ensure user has access to the requested client
+        if not KnowledgeService._has_client_access(filters.clientId, current_user):
+             # We return empty results instead of 403 to avoid leaking existence, or we could raise exception
+             # Raising exception is safer for API clarity
+             raise Exception(f"Access denied: User does not have permission for client {filters.clientId}")
+
+    @staticmethod
+    def _build_search_query(
+        filters: KnowledgeSearchRequest, columns: str = ENTRY_COLUMNS, column_params: Sequence[Any] = ()
+    ) -> Tuple[str, List[Any]]:
+        # Base Query
+        query = f"""
+            SELECT {columns}
+            FROM knowledge_entries
+            WHERE client_id = %s
+        """
+        params = list(column_params) + [filters.clientId]
+
+        # Text Search
+        if filters.query and filters.mode in ("fulltext", "hybrid"):
+            query += f" AND search_vector @@ websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s)"
+            params.append(filters.query)
+        elif filters.query and filters.fuzzy:
+            # Operator form (rather than word_similarity() >= x) so the trigram index is used
+            query += " AND %s <%% content"
+            params.append(filters.query)
+        elif filters.query:
+            query += " AND content ILIKE %s"
+            params.append(f"%{filters.query}%")
+
+        # Filters
+        if filters.entryType:
+            query += " AND entry_type = %s"
+            params.append(filters.entryType)
+
+        if filters.daaegPhase:
+            query += " AND daaeg_phase = %s"
+            params.append(filters.daaegPhase)
+
+        if filters.stakeholderId:
+            # Containment (rather than `= ANY`) can use the GIN index on stakeholder_ids
+            query += " AND stakeholder_ids @> ARRAY[%s]::integer[]"
+            params.append(filters.stakeholderId)
+
+        if filters.tags and len(filters.tags) > 0:
+            # Array intersection: entries where tags && [search_tags] matches
+            query += " AND tags && %s"
+            params.append(filters.tags)
+
+        return query, params
+
+    @staticmethod
+    def _search_setup(filters: KnowledgeSearchRequest) -> Optional[Tuple[str, List[Any]]]:
+        # Statement to run in the search transaction before the count and page queries
+        if filters.query and filters.mode == "substring" and filters.fuzzy:
+            return FUZZY_THRESHOLD_QUERY, [str(settings.KNOWLEDGE_FUZZY_THRESHOLD)]
+        return None
+
+    @staticmethod
+    def _chronological(filters: KnowledgeSearchRequest) -> bool:
+        # Newest-first searches page by keyset; ranked ones (full-text, fuzzy, hybrid) only by offset
+        return not filters.query or (filters.mode == "substring" and not filters.fuzzy)
+
+    @staticmethod
+    def _filter_hash(filters: KnowledgeSearchRequest) -> str:
+        return filter_hash(filters.model_dump(include=CURSOR_FILTER_FIELDS))
+
+    @staticmethod
+    def _build_page_query(filters: KnowledgeSearchRequest, query: str, params: List[Any]) -> Tuple[str, List[Any]]:
+        if filters.cursor and not KnowledgeService._chronological(filters):
+            raise InvalidCursor("cursor is only supported for newest-first searches (mode=substring without fuzzy)")
+
+        # Full-text matches are ranked by cover density; everything else is newest first
+        if filters.query and filters.mode == "fulltext":
+            query += f"""
+                ORDER BY ts_rank_cd(search_vector, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s)) DESC,
+                         created_at DESC
+            """
+            params = params + [filters.query]
+        elif filters.query and filters.fuzzy:
+            # Closest matches first
+            query += " ORDER BY word_similarity(%s, content) DESC, created_at DESC"
+            params = params + [filters.query]
+        else:
+            # entry_id breaks created_at ties so the keyset position is exact
+            if filters.cursor:
+                created_at, entry_id = decode_cursor(filters.cursor, KnowledgeService._filter_hash(filters))
+                query += " AND (created_at, entry_id) < (%s, %s)"
+                params = params + [created_at, entry_id]
+            query += " ORDER BY created_at DESC, entry_id DESC"
+            # One extra row tells whether there is a next page
+            return query + " LIMIT %s OFFSET %s", params + [filters.limit + 1, 0 if filters.cursor else filters.offset]
+        query += " LIMIT %s OFFSET %s"
+        return query, params + [filters.limit, filters.offset]
+
+    @staticmethod
+    def _read_generation(cur, client_id: int) -> Optional[int]:
+        """
+        Search cache generation of the client (see migration 0009), or None when
+        the result must not be cached: the cache is off, or this transaction has
+        uncommitted writes that the search would see.
+
+        Read it on the connection that then runs the search, before the search:
+        with replicas, another connection may lag behind this one, and its
+        older rows would be cached under this newer generation.
+        """
+        if not search_cache.enabled:
+            return None
+        prepared_statements.execute(cur, CACHE_GENERATION_QUERY, (client_id,), label="knowledge_cache_generation")
+        generation, own_writes = cur.fetchone()
+        return None if own_writes else generation
+
+    @staticmethod
+    async def _read_generation_async(conn, client_id: int) -> Optional[int]:
+        if not search_cache.enabled:
+            return None
+        generation, own_writes = (await conn.execute(*bind_params(CACHE_GENERATION_QUERY, [client_id]))).one()
+        return None if own_writes else generation
+
+    @staticmethod
+    def _oldest_generation(*generations: Optional[int]) -> Optional[int]:
+        # A result read on several connections is only as fresh as the oldest of them
+        return None if None in generations else min(generations)
+
+    @staticmethod
+    def _cache_key(filters: KnowledgeSearchRequest) -> str:
+        # Tag order does not change the result (`tags && ...`)
+        request = filters.model_dump(mode="json")
+        if request["tags"]:
+            request["tags"] = sorted(set(request["tags"]))
+        return json.dumps(request, sort_keys=True, separators=(",", ":"))
+
+    @staticmethod
+    def _search_statements(filters: KnowledgeSearchRequest) -> Tuple[Optional[Tuple[str, List[Any]]], Tuple[str, List[Any]], CountMode]:
+        """(count statement or None, page statement, effective count mode) of a non-hybrid search."""
+        # count(*) OVER() would only see the rows after a cursor
+        mode = "exact" if filters.count == "window" and filters.cursor else filters.count
+        count = count_statement(mode, *KnowledgeService._build_search_query(filters))
+        columns, column_params = KnowledgeService._projection(filters)
+        if mode == "window":
+            columns = f"{columns}, {WINDOW_COUNT_COLUMN}"
+        query, params = KnowledgeService._build_search_query(filters, columns, column_params)
+        return count, KnowledgeService._build_page_query(filters, query, params), mode
+
+    @staticmethod
+    def _projection(filters: KnowledgeSearchRequest) -> Tuple[str, List[Any]]:
+        """Select list of result rows for `filters.projection`, and its parameters."""
+        if filters.projection == "full":
+            return ENTRY_COLUMNS, []
+        chars = settings.KNOWLEDGE_SNIPPET_CHARS
+        source, params = SNIPPET_SOURCE, [HIGHLIGHT_START + HIGHLIGHT_STOP]
+        if filters.query and filters.mode in ("fulltext", "hybrid"):
+            snippet = f"ts_headline('{TEXT_SEARCH_CONFIG}', {source}, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s), %s)"
+            params += [filters.query, settings.KNOWLEDGE_HEADLINE_OPTIONS + HEADLINE_MARKERS]
+        elif filters.query:
+            # Starts a little before the first occurrence (at the beginning when a fuzzy match differs)
+            snippet = f"substr({source}, greatest(strpos(lower(content), lower(%s)) - %s, 1), %s)"
+            params += [filters.query, chars // 4, chars]
+        else:
+            snippet = f"left({source}, %s)"
+            params += [chars]
+        return SNIPPET_COLUMNS.format(snippet=snippet), params
+
+    @staticmethod
+    def _mapper(filters: KnowledgeSearchRequest, hybrid: bool = False) -> RowMapper:
+        if filters.projection == "snippet":
+            return HYBRID_SNIPPET_MAPPER if hybrid else SNIPPET_MAPPER
+        return HYBRID_HIT_MAPPER if hybrid else ENTRY_MAPPER
+
+    @staticmethod
+    def _exact_count(filters: KnowledgeSearchRequest) -> Tuple[str, List[Any]]:
+        return count_statement("exact", *KnowledgeService._build_search_query(filters))
+
+    @staticmethod
+    def _search_result(filters: KnowledgeSearchRequest, data: List[Any], total: Total) -> Dict[str, Any]:
+        next_cursor = None
+        if len(data) > filters.limit:
+            data = data[:filters.limit]
+            last = data[-1]
+            next_cursor = encode_cursor(last.createdAt, last.id, KnowledgeService._filter_hash(filters))
+        return {
+            "data": data,
+            "total": total,
+            # Cursor pages have no page number
+            "page": None if filters.cursor else int(filters.offset / filters.limit) + 1,
+            "limit": filters.limit,
+            "nextCursor": next_cursor
+        }
+
+    @staticmethod
+    def _hybrid_depth(filters: KnowledgeSearchRequest) -> int:
+        # Hits taken from each ranking; enough to fill the requested page
+        return max(settings.HYBRID_CANDIDATES, filters.offset + filters.limit)
+
+    @staticmethod
+    def _build_lexical_query(filters: KnowledgeSearchRequest) -> Tuple[str, List[Any]]:
+        """Top full-text matches of a hybrid search as `(entry_id, ts_rank_cd)`, all filters applied."""
+        query, params = KnowledgeService._build_search_query(
+            filters, columns=HYBRID_LEXICAL_COLUMNS, column_params=[filters.query]
+        )
+        query += " ORDER BY rank DESC, created_at DESC LIMIT %s"
+        return query, params + [KnowledgeService._hybrid_depth(filters)]
+
+    @staticmethod
+    @read_only
+    def _vector_ranking(filters: KnowledgeSearchRequest, cached: bool = False) -> Tuple[List[Hit], Optional[int]]:
+        """
+        Nearest neighbours of the query as `(entry_id, cosine similarity)`, all
+        filters applied, and the cache generation read first on the same
+        connection when the result is to be `cached` (None otherwise).
+        """
+        vector = embedder.embed(filters.query)
+        conn = KnowledgeService.get_connection()
+        try:
+            cur = conn.cursor()
+            generation = KnowledgeService._read_generation(cur, filters.clientId) if cached else None
+            return vector_store.backend.search(cur, filters, vector, KnowledgeService._hybrid_depth(filters)), generation
+        finally:
+            release_connection(conn)
+
+    @staticmethod
+    def _fuse(filters: KnowledgeSearchRequest, lexical: List[Hit], vector: List[Hit]) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Weighted reciprocal rank fusion: an entry scores
+        `sum(weight / (HYBRID_RRF_K + rank))` over the rankings it appears
+        in. Returns `(entry_id, score breakdown)`, best first.
+        """
+        weights = {
+            "lexical": settings.HYBRID_LEXICAL_WEIGHT if filters.lexicalWeight is None else filters.lexicalWeight,
+            "vector": settings.HYBRID_VECTOR_WEIGHT if filters.vectorWeight is None else filters.vectorWeight,
+        }
+        fused: Dict[int, Dict[str, Any]] = {}
+        for leg, hits in (("lexical", lexical), ("vector", vector)):
+            for rank, (entry_id, score) in enumerate(hits, start=1):
+                breakdown = fused.setdefault(entry_id, {"score": 0.0})
+                breakdown["score"] += weights[leg] / (settings.HYBRID_RRF_K + rank)
+                breakdown[f"{leg}Rank"] = rank
+                breakdown[f"{leg}Score"] = float(score)
+        return sorted(fused.items(), key=lambda item: item[1]["score"], reverse=True)
+
+    @staticmethod
+    def _hybrid_page_query(filters: KnowledgeSearchRequest, page: List[Tuple[int, Dict[str, Any]]]) -> Tuple[str, List[Any]]:
+        columns, column_params = KnowledgeService._projection(filters)
+        return f"""
+            SELECT {columns}
+            FROM knowledge_entries
+            WHERE client_id = %s AND entry_id = ANY(%s)
+        """, column_params + [filters.clientId, [entry_id for entry_id, _ in page]]
+
+    @staticmethod
+    def _hybrid_result(filters: KnowledgeSearchRequest, fused, rows) -> Dict[str, Any]:
+        # Rows come back in any order; `total` counts the fused candidates (at most two rankings deep)
+        breakdown = dict(fused)
+        mapper = KnowledgeService._mapper(filters, hybrid=True)
+        hits = [mapper.map_one(row, **breakdown[row[0]]) for row in rows]
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return KnowledgeService._search_result(filters, hits, len(fused))
+
+    @staticmethod
+    async def _hybrid_search_async(
+        conn, filters: KnowledgeSearchRequest, generation: Optional[int]
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        """
+        Hybrid result and the generation to cache it under. `generation` was
+        read on `conn`; the vector ranking runs on a connection of its own and
+        reads its own, and the result is cached under the older of the two.
+        """
+        lexical_stmt, lexical_params = bind_params(*KnowledgeService._build_lexical_query(filters))
+
+        async def lexical_ranking():
+            return (await conn.execute(lexical_stmt, lexical_params)).fetchall()
+
+        # The vector ranking (embedding + NumPy or pgvector search) runs in the threadpool meanwhile
+        lexical, (vector, vector_generation) = await asyncio.gather(
+            lexical_ranking(), run_in_threadpool(KnowledgeService._vector_ranking, filters, generation is not None)
+        )
+        generation = KnowledgeService._oldest_generation(generation, vector_generation)
+        fused = KnowledgeService._fuse(filters, lexical, vector)
+        page = fused[filters.offset:filters.offset + filters.limit]
+        if not page:
+            return KnowledgeService._search_result(filters, [], len(fused)), generation
+
+        stmt, params = bind_params(*KnowledgeService._hybrid_page_query(filters, page))
+        rows = (await conn.execute(stmt, params)).fetchall()
+        return KnowledgeService._hybrid_result(filters, fused, rows), generation
+
+    @staticmethod
+    def _entry_vector(payload: KnowledgeCreate) -> Optional[np.ndarray]:
+        # Without embed-on-write the entry is stored unembedded and picked up by the backfill
+        if not settings.KNOWLEDGE_EMBED_ON_WRITE:
+            return None
+        return embedder.embed(entry_text(payload.content, payload.tags))
 
     @staticmethod
     def create_entry(payload: KnowledgeCreate, created_by: int) -> Optional[KnowledgeResponse]:
         conn = KnowledgeService.get_connection()
         try:
             cur = conn.cursor()
-            
-            # Note: We are putting a dummy embedding array [0.0] * 384 just to satisfy the schema if needed
-            # or NULL if the schema allows it. The schema has no NOT NULL constraint on embedding.
-            # But since type is float8[], we can pass None safely.
-            
-            cur.execute("""
+
+            vector = KnowledgeService._entry_vector(payload)
+
+            cur.execute(f"""
                 INSERT INTO knowledge_entries (
-                    client_id, content, entry_type, source, 
-                    daaeg_phase, tags, stakeholder_ids, 
-                    metadata, created_by, created_at, updated_at, embedding
+                    client_id, content, entry_type, source,
+                    daaeg_phase, tags, stakeholder_ids,
+                    metadata, created_by, created_at, updated_at, embedding, embedding_version
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW(), %s)
-                RETURNING entry_id, client_id, content, entry_type, source, daaeg_phase, tags, stakeholder_ids, metadata, created_by, created_at, updated_at
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW(), %s, %s)
+                RETURNING {ENTRY_COLUMNS}
             """, (
                 payload.clientId,
                 payload.content,
@@ -38,160 +424,393 @@ class KnowledgeService:
                 payload.stakeholderIds,
                 json.dumps(payload.metadata or {}),
                 created_by,
-                None # Embedding (None for now)
+                None if vector is None else vector.tolist(),
+                None if vector is None else EMBEDDING_VERSION
             ))
             row = cur.fetchone()
             conn.commit()
-            
             if row:
-                return KnowledgeResponse(
-                    entry_id=row[0],
-                    client_id=row[1],
-                    content=row[2],
-                    entry_type=row[3],
-                    source=row[4],
-                    daaeg_phase=row[5],
-                    tags=row[6] or [],
-                    stakeholder_ids=row[7] or [],
-                    metadata=row[8] or {},
-                    created_by=row[9],
-                    created_at=row[10],
-                    updated_at=row[11]
-                )
+                on_commit(conn, partial(search_cache.invalidate, payload.clientId))
+                on_commit(conn, partial(vector_store.backend.added, payload.clientId, [row[0]], vector))
+
+            if row:
+                return ENTRY_MAPPER.map_one(row, cur.description)
             return None
         except Exception as e:
             conn.rollback()
             print(f"Error creating knowledge entry: {e}")
             raise e
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
+    def bulk_create_entries(payloads: Iterable[KnowledgeCreate], created_by: int) -> List[int]:
+        """Insert many entries with COPY in one transaction; returns their ids in input order."""
+        backend = vector_store.backend
+        # Row positions per client, and their vectors if the backend wants them
+        positions: Dict[int, List[int]] = {}
+        vectors: Dict[int, Optional[List[Any]]] = {}
+
+        def rows():
+            for position, payload in enumerate(payloads):
+                vector = KnowledgeService._entry_vector(payload)
+                if payload.clientId not in positions:
+                    positions[payload.clientId] = []
+                    wanted = vector is not None and backend.wants_vectors(payload.clientId)
+                    vectors[payload.clientId] = [] if wanted else None
+                positions[payload.clientId].append(position)
+                if vectors[payload.clientId] is not None:
+                    vectors[payload.clientId].append(vector)
+                yield (
+                    payload.clientId,
+                    payload.content,
+                    payload.entryType,
+                    payload.source,
+                    payload.daaegPhase,
+                    payload.tags or [],
+                    payload.stakeholderIds or [],
+                    payload.metadata or {},
+                    created_by,
+                    None if vector is None else vector.tolist(),
+                    None if vector is None else EMBEDDING_VERSION,
+                )
+
+        conn = KnowledgeService.get_connection()
+        try:
+            cur = conn.cursor()
+            ids = copy_knowledge_entries(cur, rows())
+            conn.commit()
+            for client_id, client_positions in positions.items():
+                on_commit(conn, partial(search_cache.invalidate, client_id))
+                client_vectors = vectors[client_id]
+                on_commit(conn, partial(
+                    backend.added,
+                    client_id,
+                    [ids[position] for position in client_positions],
+                    np.vstack(client_vectors) if client_vectors else None,
+                ))
+            return ids
+        except Exception as e:
+            conn.rollback()
+            print(f"Error bulk creating knowledge entries: {e}")
+            raise e
+        finally:
+            release_connection(conn)
+
+    @staticmethod
+    async def ingest_entries_async(records: AsyncIterator[Any], current_user: dict) -> Dict[str, Any]:
+        """Validate streamed records and insert them in bounded batches (see POST /knowledge/bulk).
+
+        Each batch commits in a transaction of its own (see `_insert_batch`),
+        not in the request's unit of work; the next batch is parsed while the
+        previous one is being written. A record that fails validation or the
+        client access check, or whose batch fails to insert, gets an error in
+        its result without affecting the others. Batches committed before a
+        fatal body error (JSONStreamError) stay committed and are reported.
+        """
+        created_by = int(current_user["user_id"])
+        results: List[BulkRowResult] = []
+        access: Dict[int, bool] = {}
+        batch: List[Tuple[int, KnowledgeCreate]] = []
+        in_flight: Optional[asyncio.Future] = None
+
+        async def finish(pending: Optional[asyncio.Future]) -> None:
+            if pending is None:
+                return
+            rows, outcome = await pending
+            for position, (index, _) in enumerate(rows):
+                if isinstance(outcome, Exception):
+                    results[index].error = f"Insert failed: {outcome}"
+                else:
+                    results[index].id = outcome[position]
+
+        async def insert(rows: List[Tuple[int, KnowledgeCreate]]):
+            try:
+                ids = await run_in_threadpool(
+                    KnowledgeService._insert_batch, [payload for _, payload in rows], created_by
+                )
+                return rows, ids
+            except Exception as e:
+                return rows, e
+
+        error = None
+        try:
+            async for record in records:
+                index = len(results)
+                results.append(BulkRowResult(index=index))
+                payload, results[index].error = KnowledgeService._bulk_payload(record)
+                if payload is None:
+                    continue
+                if payload.clientId not in access:
+                    access[payload.clientId] = KnowledgeService._has_client_access(payload.clientId, current_user)
+                if not access[payload.clientId]:
+                    results[index].error = f"Access denied: User does not have permission for client {payload.clientId}"
+                    continue
+                batch.append((index, payload))
+                if len(batch) >= settings.KNOWLEDGE_BULK_BATCH_ROWS:
+                    await finish(in_flight)
+                    in_flight, batch = asyncio.ensure_future(insert(batch)), []
+        except JSONStreamError as e:
+            # Rows parsed before the unreadable part are still inserted
+            error = str(e)
+        await finish(in_flight)
+        if batch:
+            await finish(asyncio.ensure_future(insert(batch)))
+
+        inserted = sum(1 for row in results if row.id is not None)
+        return BulkIngestResult(
+            inserted=inserted, failed=len(results) - inserted, results=results, error=error
+        ).model_dump()
+
+    @staticmethod
+    def _insert_batch(payloads: List[KnowledgeCreate], created_by: int) -> List[int]:
+        """
+        bulk_create_entries in a nested unit of work: the batch is committed
+        (or rolled back) before this returns, whatever happens to the request.
+        """
+        with unit_of_work():
+            ids = KnowledgeService.bulk_create_entries(payloads, created_by)
+        # Committed outside the request's unit of work, which would otherwise record it
+        replica_router.record_write(created_by)
+        return ids
+
+    @staticmethod
+    def _bulk_payload(record: Any) -> Tuple[Optional[KnowledgeCreate], Optional[str]]:
+        if isinstance(record, ValueError):
+            return None, str(record)
+        try:
+            return KnowledgeCreate.model_validate(record), None
+        except ValidationError as e:
+            return None, "; ".join(
+                f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()
+            )
+
+    @staticmethod
+    @read_only
     def search_entries(filters: KnowledgeSearchRequest, current_user: dict) -> Dict[str, Any]:
-        
-        # Security Check: Ensure user has access to the requested client
-        from app.utils.rbac import RBACManager, Role
-        rbac = RBACManager()
-        if not rbac.has_client_access(current_user.get("client_access", []), filters.clientId, current_user.get("role")):
-             # We return empty results instead of 403 to avoid leaking existence, or we could raise exception
-             # Raising exception is safer for API clarity
-             raise Exception(f"Access denied: User does not have permission for client {filters.clientId}")
+        """Threadpool twin of `search_entries_async`, used by the benchmarks; not for mode=hybrid."""
+        KnowledgeService._check_client_access(filters, current_user)
+        if filters.query and filters.mode == "hybrid":
+            # Only GET /knowledge serves hybrid search, through search_entries_async
+            raise ValueError("mode=hybrid is only supported by search_entries_async")
 
+        key = KnowledgeService._cache_key(filters)
         conn = KnowledgeService.get_connection()
         try:
             cur = conn.cursor()
-            
-            # Base Query
-            query = """
-                SELECT entry_id, client_id, content, entry_type, source, daaeg_phase, tags, stakeholder_ids, metadata, created_by, created_at, updated_at
+            generation = KnowledgeService._read_generation(cur, filters.clientId)
+            result = search_cache.get(filters.clientId, key, generation)
+            if result is None:
+                result = KnowledgeService._search_entries(cur, filters)
+                search_cache.put(filters.clientId, key, result, generation)
+            return result
+        finally:
+            release_connection(conn)
+
+    @staticmethod
+    def _search_entries(cur, filters: KnowledgeSearchRequest) -> Dict[str, Any]:
+        count, page, mode = KnowledgeService._search_statements(filters)
+        setup = KnowledgeService._search_setup(filters)
+        if setup:
+            cur.execute(*setup)
+
+        total = None
+        if count:
+            total = run_count(cur, mode, count, label="knowledge_count")
+
+        prepared_statements.execute(cur, *page, label="knowledge_search")
+        rows = cur.fetchall()
+        data = KnowledgeService._mapper(filters).map_all(rows, cur.description)
+
+        if mode == "window":
+            total = window_total(rows, filters.offset)
+            if total is None:
+                # Past the last page the window sees no rows; count separately
+                total = run_count(cur, "exact", KnowledgeService._exact_count(filters), label="knowledge_count")
+        return KnowledgeService._search_result(filters, data, total)
+
+    @staticmethod
+    async def search_entries_async(filters: KnowledgeSearchRequest, current_user: dict) -> Dict[str, Any]:
+        """
+        Same as `search_entries`, but runs on the asyncpg engine so the
+        request never occupies a threadpool worker while waiting on Postgres.
+        """
+        KnowledgeService._check_client_access(filters, current_user)
+
+        key = KnowledgeService._cache_key(filters)
+        async with read_connection() as conn:
+            # Generation first, then the search, on one connection (see `_read_generation`)
+            generation = await KnowledgeService._read_generation_async(conn, filters.clientId)
+            result = search_cache.get(filters.clientId, key, generation)
+            if result is not None:
+                return result
+            if filters.query and filters.mode == "hybrid":
+                result, generation = await KnowledgeService._hybrid_search_async(conn, filters, generation)
+            else:
+                result = await KnowledgeService._search_entries_async(conn, filters)
+        search_cache.put(filters.clientId, key, result, generation)
+        return result
+
+    @staticmethod
+    async def _search_entries_async(conn, filters: KnowledgeSearchRequest) -> Dict[str, Any]:
+        count, page, mode = KnowledgeService._search_statements(filters)
+        page_stmt, page_params = bind_params(*page)
+
+        setup = KnowledgeService._search_setup(filters)
+        if setup:
+            await conn.execute(*bind_params(*setup))
+        total = None
+        if count:
+            total = read_total(mode, (await conn.execute(*bind_params(*count))).scalar_one())
+        rows = (await conn.execute(page_stmt, page_params)).fetchall()
+
+        if mode == "window":
+            total = window_total(rows, filters.offset)
+            if total is None:
+                # Past the last page the window sees no rows; count separately
+                total = (await conn.execute(*bind_params(*KnowledgeService._exact_count(filters)))).scalar_one()
+
+        data = KnowledgeService._mapper(filters).map_all(rows)
+        return KnowledgeService._search_result(filters, data, total)
+
+    @staticmethod
+    def _facet_statement(filters: KnowledgeSearchRequest, top: int) -> Tuple[str, List[Any], str]:
+        """(statement, params, source) computing the facets of `filters` in one pass."""
+        unfiltered = not (filters.query or filters.entryType or filters.daaegPhase or filters.stakeholderId or filters.tags)
+        if unfiltered and settings.KNOWLEDGE_FACET_COUNTERS:
+            return FACET_TOP_QUERY.format(counts=FACET_COUNTERS_QUERY), [filters.clientId, top], "counters"
+        matched, params = KnowledgeService._build_search_query(filters, columns=FACET_COLUMNS)
+        return FACET_TOP_QUERY.format(counts=FACET_COUNTS_QUERY.format(matched=matched)), params + [top], "query"
+
+    @staticmethod
+    def _facets_result(rows, stakeholder_names: Dict[int, str], source: str) -> KnowledgeFacets:
+        facets: Dict[str, List[Tuple[str, int]]] = {"total": [], "entry_type": [], "daaeg_phase": [], "tag": [], "stakeholder": []}
+        for facet, value, entries in rows:
+            facets[facet].append((value, entries))
+        return KnowledgeFacets(
+            total=facets["total"][0][1] if facets["total"] else 0,
+            entryType=[FacetCount(value=value, count=n) for value, n in facets["entry_type"]],
+            daaegPhase=[FacetCount(value=value, count=n) for value, n in facets["daaeg_phase"]],
+            tags=[FacetCount(value=value, count=n) for value, n in facets["tag"]],
+            stakeholders=[
+                StakeholderFacetCount(stakeholderId=int(value), name=stakeholder_names.get(int(value)), count=n)
+                for value, n in facets["stakeholder"]
+            ],
+            source=source,
+        )
+
+    @staticmethod
+    async def get_facets_async(filters: KnowledgeSearchRequest, current_user: dict, top: int) -> KnowledgeFacets:
+        """
+        Entry counts per entry_type, daaeg_phase, tag (top `top`) and
+        stakeholder (top `top`) over the entries matching `filters`. Requests
+        with no filter besides the client read the trigger-maintained
+        counters instead of scanning the client's entries.
+        """
+        KnowledgeService._check_client_access(filters, current_user)
+
+        key = f"facets:{top}:{KnowledgeService._filter_hash(filters)}"
+        statement, params, source = KnowledgeService._facet_statement(filters, top)
+        setup = KnowledgeService._search_setup(filters) if source == "query" else None
+
+        async with read_connection() as conn:
+            # Generation first, then the facets, on one connection (see `_read_generation`)
+            generation = await KnowledgeService._read_generation_async(conn, filters.clientId)
+            cached = search_cache.get(filters.clientId, key, generation)
+            if cached is not None:
+                return cached
+            if setup:
+                await conn.execute(*bind_params(*setup))
+            rows = (await conn.execute(*bind_params(statement, params))).fetchall()
+            stakeholder_ids = [int(value) for facet, value, _ in rows if facet == "stakeholder"]
+            names: Dict[int, str] = {}
+            if stakeholder_ids:
+                names = dict((await conn.execute(
+                    *bind_params(FACET_STAKEHOLDERS_QUERY, [filters.clientId, stakeholder_ids])
+                )).fetchall())
+
+        result = KnowledgeService._facets_result(rows, names, source)
+        search_cache.put(filters.clientId, key, result, generation)
+        return result
+
+    @staticmethod
+    @read_only
+    def semantic_search(filters: SemanticSearchRequest, current_user: dict) -> List[SemanticSearchHit]:
+        """
+        Top `limit` entries of the client by cosine similarity between the
+        query embedding and the stored entry embeddings. Entries without an
+        embedding are not searched.
+        """
+        KnowledgeService._check_client_access(filters, current_user)
+
+        vector = embedder.embed(filters.query)
+
+        conn = KnowledgeService.get_connection()
+        try:
+            cur = conn.cursor()
+            score_by_id = dict(vector_store.backend.search(cur, filters, vector, filters.limit))
+            if not score_by_id:
+                return []
+
+            prepared_statements.execute(cur, f"""
+                SELECT {ENTRY_COLUMNS}
                 FROM knowledge_entries
-                WHERE client_id = %s
-            """
-            params = [filters.clientId]
-            
-            # Text Search (Simple ILIKE)
-            if filters.query:
-                query += " AND content ILIKE %s"
-                params.append(f"%{filters.query}%")
-                
-            # Filters
-            if filters.entryType:
-                query += " AND entry_type = %s"
-                params.append(filters.entryType)
-                
-            if filters.daaegPhase:
-                query += " AND daaeg_phase = %s"
-                params.append(filters.daaegPhase)
-                
-            if filters.stakeholderId:
-                query += " AND %s = ANY(stakeholder_ids)"
-                params.append(filters.stakeholderId)
-                
-            if filters.tags and len(filters.tags) > 0:
-                # Array intersection: entries where tags && [search_tags] matches
-                query += " AND tags && %s"
-                params.append(filters.tags)
-
-            # Pagination
-            # Get Total Count First
-            count_query = f"SELECT COUNT(*) FROM ({query}) AS sub"
-            cur.execute(count_query, tuple(params))
-            total = cur.fetchone()[0]
-
-            # Add Limit/Offset
-            query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            params.append(filters.limit)
-            params.append(filters.offset)
-
-            cur.execute(query, tuple(params))
+                WHERE client_id = %s AND entry_id = ANY(%s)
+            """, [filters.clientId, list(score_by_id)], label="knowledge_semantic")
             rows = cur.fetchall()
-            
-            data = [
-                KnowledgeResponse(
-                    entry_id=row[0],
-                    client_id=row[1],
-                    content=row[2],
-                    entry_type=row[3],
-                    source=row[4],
-                    daaeg_phase=row[5],
-                    tags=row[6] or [],
-                    stakeholder_ids=row[7] or [],
-                    metadata=row[8] or {},
-                    created_by=row[9],
-                    created_at=row[10],
-                    updated_at=row[11]
-                ) for row in rows
-            ]
-            
-            return {
-                "data": data,
-                "total": total,
-                "page": int(filters.offset / filters.limit) + 1,
-                "limit": filters.limit
-            }
-            
+            columns = cur.description
         finally:
-            conn.close()
+            release_connection(conn)
+
+        hits = [HIT_MAPPER.map_one(row, columns, score=score_by_id[row[0]]) for row in rows]
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits[:filters.limit]
 
     @staticmethod
     def delete_entry(entry_id: int) -> bool:
         conn = KnowledgeService.get_connection()
         try:
             cur = conn.cursor()
-            cur.execute("DELETE FROM knowledge_entries WHERE entry_id = %s", (entry_id,))
-            rows_deleted = cur.rowcount
+            cur.execute("DELETE FROM knowledge_entries WHERE entry_id = %s RETURNING client_id", (entry_id,))
+            deleted = cur.fetchone()
             conn.commit()
-            return rows_deleted > 0
+            if deleted:
+                on_commit(conn, partial(search_cache.invalidate, deleted[0]))
+                on_commit(conn, partial(vector_store.backend.removed, deleted[0], [entry_id]))
+            return deleted is not None
         finally:
-            conn.close()
-            
+            release_connection(conn)
+
     @staticmethod
+    @read_only
     def get_entry_by_id(entry_id: int) -> Optional[KnowledgeResponse]:
         conn = KnowledgeService.get_connection()
         try:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT entry_id, client_id, content, entry_type, source, daaeg_phase, tags, stakeholder_ids, metadata, created_by, created_at, updated_at
+            prepared_statements.execute(cur, f"""
+                SELECT {ENTRY_COLUMNS}
                 FROM knowledge_entries
                 WHERE entry_id = %s
-            """, (entry_id,))
+            """, (entry_id,), label="knowledge_entry")
             row = cur.fetchone()
-            
+
             if row:
-                return KnowledgeResponse(
-                    entry_id=row[0],
-                    client_id=row[1],
-                    content=row[2],
-                    entry_type=row[3],
-                    source=row[4],
-                    daaeg_phase=row[5],
-                    tags=row[6] or [],
-                    stakeholder_ids=row[7] or [],
-                    metadata=row[8] or {},
-                    created_by=row[9],
-                    created_at=row[10],
-                    updated_at=row[11]
-                )
+                return ENTRY_MAPPER.map_one(row, cur.description)
             return None
         finally:
-            conn.close()
+            release_connection(conn)
+
+    @staticmethod
+    async def get_entry_by_id_async(entry_id: int) -> Optional[KnowledgeResponse]:
+        stmt, params = bind_params(f"""
+            SELECT {ENTRY_COLUMNS}
+            FROM knowledge_entries
+            WHERE entry_id = %s
+        """, (entry_id,))
+
+        async with read_connection() as conn:
+            row = (await conn.execute(stmt, params)).first()
+
+        if row:
+            return ENTRY_MAPPER.map_one(row)
+        return None
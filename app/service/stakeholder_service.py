@@ -1,14 +1,39 @@
 
-import psycopg2
 import json
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Any, Tuple
 from app.config.settings import settings
+from app.db.bulk import copy_stakeholders
+from app.db.pool import get_connection, release_connection
+from app.db.routing import read_only, read_connection
+from app.db.mapping import RowMapper, json_object
+from app.db.session import bind_params
+from app.db.statements import prepared_statements
+from app.db.streaming import stream_models_async
 from app.dto.core import StakeholderCreate, StakeholderUpdate, StakeholderResponse
 
+STAKEHOLDER_MAPPER = RowMapper(
+    StakeholderResponse,
+    convert={"toneAnalysis": json_object, "metadata": json_object},
+)
+
 class StakeholderService:
     @staticmethod
     def get_connection():
-        return psycopg2.connect(settings.DATABASE_URL)
+        return get_connection()
+
+    @staticmethod
+    def _build_list_query(client_id: Optional[int] = None) -> Tuple[str, List[Any]]:
+        query = """
+            SELECT stakeholder_id, client_id, name, role, email, tone, tone_analysis, last_interaction, metadata, created_at, updated_at
+            FROM stakeholders
+        """
+        params = []
+        if client_id:
+            query += " WHERE client_id = %s"
+            params.append(client_id)
+        
+        query += " ORDER BY name ASC"
+        return query, params
 
     @staticmethod
     def create_stakeholder(payload: StakeholderCreate) -> Optional[StakeholderResponse]:
@@ -33,93 +58,92 @@ class StakeholderService:
             conn.commit()
             
             if row:
-                return StakeholderResponse(
-                    stakeholder_id=row[0],
-                    client_id=row[1],
-                    name=row[2],
-                    role=row[3],
-                    email=row[4],
-                    tone=row[5],
-                    tone_analysis=row[6] or {},
-                    last_interaction=row[7],
-                    metadata=row[8] or {},
-                    created_at=row[9],
-                    updated_at=row[10]
-                )
+                return STAKEHOLDER_MAPPER.map_one(row, cur.description)
             return None
         except Exception as e:
             conn.rollback()
             print(f"Error creating stakeholder: {e}")
             raise e
         finally:
-            conn.close()
+            release_connection(conn)
+
+    @staticmethod
+    def bulk_create_stakeholders(payloads: Iterable[StakeholderCreate]) -> List[int]:
+        """Insert many stakeholders with COPY in one transaction; returns their ids in input order."""
+        conn = StakeholderService.get_connection()
+        try:
+            cur = conn.cursor()
+            ids = copy_stakeholders(cur, (
+                (
+                    payload.clientId,
+                    payload.name,
+                    payload.role,
+                    payload.email,
+                    payload.tone or 'neutral',
+                    {},
+                    None,
+                    payload.metadata or {},
+                )
+                for payload in payloads
+            ))
+            conn.commit()
+            return ids
+        except Exception as e:
+            conn.rollback()
+            print(f"Error bulk creating stakeholders: {e}")
+            raise e
+        finally:
+            release_connection(conn)
 
     @staticmethod
+    @read_only
     def get_stakeholders(client_id: Optional[int] = None) -> List[StakeholderResponse]:
         conn = StakeholderService.get_connection()
         try:
             cur = conn.cursor()
-            query = """
-                SELECT stakeholder_id, client_id, name, role, email, tone, tone_analysis, last_interaction, metadata, created_at, updated_at
-                FROM stakeholders
-            """
-            params = []
-            if client_id:
-                query += " WHERE client_id = %s"
-                params.append(client_id)
-            
-            query += " ORDER BY name ASC"
-            
-            cur.execute(query, tuple(params))
+            query, params = StakeholderService._build_list_query(client_id)
+            prepared_statements.execute(cur, query, params, label="stakeholder_list")
             rows = cur.fetchall()
             
-            return [
-                StakeholderResponse(
-                    stakeholder_id=row[0],
-                    client_id=row[1],
-                    name=row[2],
-                    role=row[3],
-                    email=row[4],
-                    tone=row[5],
-                    tone_analysis=row[6] or {},
-                    last_interaction=row[7],
-                    metadata=row[8] or {},
-                    created_at=row[9],
-                    updated_at=row[10]
-                ) for row in rows
-            ]
+            return STAKEHOLDER_MAPPER.map_all(rows, cur.description)
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
+    async def get_stakeholders_async(client_id: Optional[int] = None) -> List[StakeholderResponse]:
+        stmt, params = bind_params(*StakeholderService._build_list_query(client_id))
+        async with read_connection() as conn:
+            rows = (await conn.execute(stmt, params)).fetchall()
+        return STAKEHOLDER_MAPPER.map_all(rows)
+
+    @staticmethod
+    def stream_stakeholders_async(client_id: Optional[int] = None) -> AsyncIterator[List[StakeholderResponse]]:
+        """
+        Batches of stakeholders from a server-side cursor on the async
+        engine; without a client filter this is every stakeholder in the
+        database.
+        """
+        query, params = StakeholderService._build_list_query(client_id)
+        return stream_models_async(STAKEHOLDER_MAPPER, query, params)
+
+    @staticmethod
+    @read_only
     def get_stakeholder_by_id(stakeholder_id: int) -> Optional[StakeholderResponse]:
         conn = StakeholderService.get_connection()
         try:
             cur = conn.cursor()
-            cur.execute("""
+            prepared_statements.execute(cur, """
                 SELECT stakeholder_id, client_id, name, role, email, tone, tone_analysis, last_interaction, metadata, created_at, updated_at
                 FROM stakeholders
                 WHERE stakeholder_id = %s
-            """, (stakeholder_id,))
+            """, (stakeholder_id,), label="stakeholder_by_id")
             row = cur.fetchone()
             
             if row:
-                return StakeholderResponse(
-                    stakeholder_id=row[0],
-                    client_id=row[1],
-                    name=row[2],
-                    role=row[3],
-                    email=row[4],
-                    tone=row[5],
-                    tone_analysis=row[6] or {},
-                    last_interaction=row[7],
-                    metadata=row[8] or {},
-                    created_at=row[9],
-                    updated_at=row[10]
-                )
+                return STAKEHOLDER_MAPPER.map_one(row, cur.description)
             return None
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
     def update_stakeholder(stakeholder_id: int, payload: StakeholderUpdate) -> Optional[StakeholderResponse]:
@@ -163,25 +187,13 @@ class StakeholderService:
             conn.commit()
             
             if row:
-                return StakeholderResponse(
-                    stakeholder_id=row[0],
-                    client_id=row[1],
-                    name=row[2],
-                    role=row[3],
-                    email=row[4],
-                    tone=row[5],
-                    tone_analysis=row[6] or {},
-                    last_interaction=row[7],
-                    metadata=row[8] or {},
-                    created_at=row[9],
-                    updated_at=row[10]
-                )
+                return STAKEHOLDER_MAPPER.map_one(row, cur.description)
             return None
         except Exception as e:
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
     def delete_stakeholder(stakeholder_id: int) -> bool:
@@ -193,4 +205,4 @@ class StakeholderService:
             conn.commit()
             return rows_deleted > 0
         finally:
-            conn.close()
+            release_connection(conn)
@@ -5,18 +5,22 @@ import json
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pathlib import Path
-import psycopg2
 
 from app.config.settings import settings
+from app.db.pool import get_connection, release_connection
 from app.config.logger import logger
+from app.db.mapping import RowMapper, to_str
 from app.dto.template import TemplateCreate, TemplateResponse, TemplateVersionResponse
 
+TEMPLATE_MAPPER = RowMapper(TemplateResponse, rename={"category": "templateType"})
+VERSION_MAPPER = RowMapper(TemplateVersionResponse, convert={"versionNumber": to_str})
+
 class TemplateService:
     STORAGE_PATH = Path("storage") 
 
     @staticmethod
     def _get_connection():
-        return psycopg2.connect(settings.DATABASE_URL)
+        return get_connection()
 
     @staticmethod
     def _init_storage():
@@ -32,17 +36,6 @@ class TemplateService:
                 hash_sha256.update(chunk)
         return hash_sha256.hexdigest()
 
-    @staticmethod
-    def _generate_version_number(template_id: int, cur) -> int:
-        cur.execute("""
-            SELECT MAX(version_number) FROM template_versions 
-            WHERE template_id = %s 
-        """, (template_id,))
-        result = cur.fetchone()
-        if result and result[0] is not None:
-            return int(result[0]) + 1
-        return 1
-
     @staticmethod
     def create_template(payload: TemplateCreate, file_path: str, created_by: int) -> Optional[TemplateResponse]:
         TemplateService._init_storage()
@@ -56,6 +49,7 @@ class TemplateService:
             """, (payload.name, payload.description, payload.templateType, created_by, payload.isActive))
             
             row = cur.fetchone()
+            columns = cur.description
             template_id = row[0]
             
             # Create initial version
@@ -63,22 +57,15 @@ class TemplateService:
             
             conn.commit()
             
-            return TemplateResponse(
-                template_id=row[0],
-                name=row[1],
-                description=row[2],
-                template_type=row[3],
-                created_by=row[4],
-                created_at=row[5],
-                is_active=row[6],
-                versions=[version_response] if version_response else []
+            return TEMPLATE_MAPPER.map_one(
+                row, columns, versions=[version_response] if version_response else []
             )
         except Exception as e:
             conn.rollback()
             logger.error(f"Failed to create template: {e}")
             raise e
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
     def add_template_version(template_id: int, file_path: str, created_by: int, changelog: str = None, external_cur=None) -> TemplateVersionResponse:
@@ -94,56 +81,50 @@ class TemplateService:
                 should_close = True
 
             # Use cur for all operations
-            version_number = TemplateService._generate_version_number(template_id, cur)
             file_hash = TemplateService._calculate_file_hash(file_path)
-            
-            # Check duplicate
-            cur.execute("""
-                SELECT version_id FROM template_versions 
-                WHERE template_id = %s AND (dynamic_fields->>'file_hash') = %s
-            """, (template_id, file_hash))
-            if cur.fetchone():
-               # raise ValueError("Duplicate file version")
-               pass 
 
-            # Storage logic
+            # Storage logic: stored as versions/<template_id>/v<version_number><ext>
             version_dir = TemplateService.STORAGE_PATH / "versions" / str(template_id)
             version_dir.mkdir(parents=True, exist_ok=True)
             file_extension = Path(file_path).suffix
-            stored_filename = f"v{version_number}{file_extension}"
-            stored_path = version_dir / stored_filename
-            shutil.copy2(file_path, stored_path)
-            
+
+            # Next version number, insert and current-version update in one round trip.
             cur.execute("""
-                INSERT INTO template_versions 
-                (template_id, version_number, file_path, dynamic_fields, changelog, created_by, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, NOW())
-                RETURNING version_id, version_number, file_path, created_at, created_by, changelog, true
+                WITH next_version AS (
+                    SELECT COALESCE(MAX(version_number), 0) + 1 AS version_number
+                    FROM template_versions
+                    WHERE template_id = %s
+                ), version AS (
+                    INSERT INTO template_versions
+                    (template_id, version_number, file_path, dynamic_fields, changelog, created_by, created_at)
+                    SELECT %s, version_number, %s || version_number || %s, %s, %s, %s, NOW()
+                    FROM next_version
+                    RETURNING version_id, version_number, file_path, created_at, created_by, changelog
+                ), current_version AS (
+                    UPDATE templates SET current_version_id = version.version_id, updated_at = NOW()
+                    FROM version
+                    WHERE templates.template_id = %s
+                )
+                SELECT version_id, version_number, file_path, created_at, created_by, changelog, true AS is_active
+                FROM version
             """, (
-                template_id, version_number, str(stored_path), 
+                template_id,
+                template_id, str(version_dir / "v"), file_extension,
                 json.dumps({'file_hash': file_hash}),
-                changelog, created_by
+                changelog, created_by,
+                template_id
             ))
             
             v_row = cur.fetchone()
-            version_id = v_row[0]
-            
-            cur.execute("""
-                UPDATE templates SET current_version_id = %s, updated_at = NOW() WHERE template_id = %s
-            """, (version_id, template_id))
+            v_columns = cur.description
+
+            # A failed copy raises and rolls the version back with the transaction.
+            shutil.copy2(file_path, v_row[2])
             
             if should_close:
                 conn.commit()
             
-            return TemplateVersionResponse(
-                version_id=v_row[0],
-                version_number=str(v_row[1]), # Convert int to str for DTO
-                file_path=v_row[2],
-                created_at=v_row[3],
-                created_by=v_row[4],
-                changelog=v_row[5],
-                is_active=v_row[6]
-            )
+            return VERSION_MAPPER.map_one(v_row, v_columns)
         except Exception as e:
             if should_close and conn:
                 conn.rollback()
@@ -151,7 +132,7 @@ class TemplateService:
             raise e
         finally:
             if should_close and conn:
-                conn.close()
+                release_connection(conn)
 
     @staticmethod
     def list_templates(client_id: int = None) -> List[TemplateResponse]:
@@ -171,15 +152,9 @@ class TemplateService:
                 pass 
                 
             cur.execute(query, params)
-            rows = cur.fetchall()
-            return [
-                TemplateResponse(
-                    template_id=r[0], name=r[1], description=r[2], template_type=r[3], 
-                    created_by=r[4], created_at=r[5], is_active=r[6]
-                ) for r in rows
-            ]
+            return TEMPLATE_MAPPER.map_all(cur.fetchall(), cur.description)
         finally:
-            conn.close()
+            release_connection(conn)
 
     @staticmethod
     def get_template(template_id: int) -> Optional[TemplateResponse]:
@@ -194,21 +169,14 @@ class TemplateService:
             if not row: 
                 return None
                 
-            template = TemplateResponse(
-                template_id=row[0], name=row[1], description=row[2], template_type=row[3],
-                created_by=row[4], created_at=row[5], is_active=row[6]
-            )
+            template = TEMPLATE_MAPPER.map_one(row, cur.description)
             
             cur.execute("""
-                SELECT version_id, version_number, file_path, created_at, created_by, changelog, true
+                SELECT version_id, version_number, file_path, created_at, created_by, changelog, true AS is_active
                 FROM template_versions WHERE template_id = %s ORDER BY created_at DESC
             """, (template_id,))
             
-            for v_row in cur.fetchall():
-                template.versions.append(TemplateVersionResponse(
-                    version_id=v_row[0], version_number=v_row[1], file_path=v_row[2],
-                    created_at=v_row[3], created_by=v_row[4], changelog=v_row[5], is_active=v_row[6]
-                ))
+            template.versions.extend(VERSION_MAPPER.map_all(cur.fetchall(), cur.description))
             return template
         finally:
-            conn.close()
+            release_connection(conn)
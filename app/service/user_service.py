@@ -7,12 +7,31 @@ from datetime import datetime
 import json
 
 from app.config.settings import settings
+from app.db.counting import WINDOW_COUNT_COLUMN, count_statement, run_count, total_pages, window_total
+from app.db.pool import get_connection, release_connection
+from app.db.mapping import RowMapper, to_str
+from app.db.routing import read_only
+from app.db.statements import prepared_statements
+from app.db.unit_of_work import savepoint
 from app.utils.rbac import RBACManager, Role
+from app.dto.api_response import CountMode
 from app.dto.user import UserResponse, CreateUserRequest, UpdateUserRequest, UserListResponse
 from app.service.audit_service import audit_service
 
 logger = logging.getLogger(__name__)
 
+# fullName and organisations are derived from several columns and passed in
+# explicitly by the callers.
+USER_MAPPER = RowMapper(
+    UserResponse,
+    rename={"last_login": "lastLoginDate", "created_at": "createdAt", "is_active": "status"},
+    convert={
+        "id": to_str,
+        "role": lambda role: role.upper() if role else 'VIEWER',
+        "status": lambda is_active: 'Enabled' if is_active else 'Disabled',
+    },
+)
+
 # Initialize RBAC (Shared instance logic could be refactored, but instantiated here for now)
 rbac_manager = RBACManager(
     db_connection_params={"dsn": settings.DATABASE_URL},
@@ -20,11 +39,12 @@ rbac_manager = RBACManager(
 )
 
 def _get_db_connection():
-    return psycopg2.connect(settings.DATABASE_URL)
+    return get_connection()
 
+@read_only
 def list_users(
     page: int, limit: int, search: str, role_filter: str, status_filter: str, 
-    organisation_filter: int, current_user_id: int
+    organisation_filter: int, current_user_id: int, count: CountMode = "exact"
 ) -> UserListResponse:
     conn = None
     try:
@@ -58,54 +78,58 @@ def list_users(
             
         where_stmt = " AND ".join(where_clauses)
         
-        # Count total
-        cur.execute(f"SELECT COUNT(*) FROM users u WHERE {where_stmt}", tuple(params))
-        total = cur.fetchone()[0]
+        # Count total (count=window reads it from the page query instead)
+        count_stmt = count_statement("exact" if count == "window" else count, f"SELECT 1 FROM users u WHERE {where_stmt}", params)
+        total = None
+        if count_stmt and count != "window":
+            total = run_count(cur, count, count_stmt, label="user_count")
         
         # Fetch data
+        window_column = f", {WINDOW_COUNT_COLUMN}" if count == "window" else ""
         query = f"""
             SELECT u.id, u.username, u.email, u.role, u.client_access, 
-                   u.full_name, u.is_active, u.last_login, u.created_at
+                   u.full_name, u.is_active, u.last_login, u.created_at{window_column}
             FROM users u
             WHERE {where_stmt}
             ORDER BY u.created_at DESC
             LIMIT %s OFFSET %s
         """
-        params.extend([limit, (page - 1) * limit])
+        offset = (page - 1) * limit
         
-        cur.execute(query, tuple(params))
+        prepared_statements.execute(cur, query, params + [limit, offset], label="user_list")
         rows = cur.fetchall()
+        columns = cur.description
         
-        # Get client names
-        cur.execute("SELECT client_id, name FROM clients")
-        client_map = {row[0]: row[1] for row in cur.fetchall()}
+        if count == "window":
+            total = window_total(rows, offset)
+            if total is None:
+                total = run_count(cur, "exact", count_stmt, label="user_count")
+        
+        # Get client names (only for organisations referenced on this page)
+        client_ids = sorted({cid for row in rows for cid in (row[4] or [])})
+        client_map = {}
+        if client_ids:
+            prepared_statements.execute(
+                cur, "SELECT client_id, name FROM clients WHERE client_id = ANY(%s)", (client_ids,), label="client_names"
+            )
+            client_map = {row[0]: row[1] for row in cur.fetchall()}
         
         users = []
         for row in rows:
-            uid, uname, email, role, client_access, fname, is_active, last_login, created_at = row
+            uid, uname, email, role, client_access, fname, is_active, last_login, created_at = row[:9]
             
             # Get client names
             org_names = [{'id': str(cid), 'name': client_map.get(cid, f'Client {cid}')} 
                          for cid in (client_access or [])]
             
-            users.append(UserResponse(
-                id=str(uid),
-                fullName=fname or uname,
-                username=uname,
-                email=email,
-                role=role.upper() if role else 'VIEWER',
-                organisations=org_names,
-                status='Enabled' if is_active else 'Disabled',
-                lastLoginDate=last_login,
-                createdAt=created_at
-            ))
+            users.append(USER_MAPPER.map_one(row, columns, fullName=fname or uname, organisations=org_names))
             
         return UserListResponse(
             data=users,
             total=total,
             page=page,
             limit=limit,
-            totalPages=(total + limit - 1) // limit
+            totalPages=total_pages(total, limit)
         )
         
     except Exception as e:
@@ -113,52 +137,42 @@ def list_users(
         raise e
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def get_user(user_id: int) -> Optional[UserResponse]:
     conn = None
     try:
         conn = _get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT id, username, email, role, client_access, 
-                   full_name, is_active, last_login, created_at
-            FROM users 
-            WHERE id = %s 
-              AND COALESCE((metadata->>'is_deleted')::boolean, false) = false
-        """, (user_id,))
+        with savepoint(conn, "get_user"):
+            cur = conn.cursor()
+            prepared_statements.execute(cur, """
+                SELECT id, username, email, role, client_access, 
+                       full_name, is_active, last_login, created_at
+                FROM users 
+                WHERE id = %s 
+                  AND COALESCE((metadata->>'is_deleted')::boolean, false) = false
+            """, (user_id,), label="user_by_id")
         
-        row = cur.fetchone()
-        if not row:
-            return None
+            row = cur.fetchone()
+            if not row:
+                return None
+            columns = cur.description
             
-        uid, uname, email, role, client_access, fname, is_active, last_login, created_at = row
+            uid, uname, email, role, client_access, fname, is_active, last_login, created_at = row
         
-        # Get orgs
-        # Get orgs
-        org_names = []
-        if client_access:
-            cur.execute("SELECT client_id, name FROM clients WHERE client_id = ANY(%s)", (client_access,))
-            org_names = [{'id': str(r[0]), 'name': r[1]} for r in cur.fetchall()]
+            # Get orgs
+            org_names = []
+            if client_access:
+                cur.execute("SELECT client_id, name FROM clients WHERE client_id = ANY(%s)", (client_access,))
+                org_names = [{'id': str(r[0]), 'name': r[1]} for r in cur.fetchall()]
         
-        return UserResponse(
-            id=str(uid),
-            fullName=fname or uname,
-            username=uname,
-            email=email,
-            role=role.upper() if role else 'VIEWER',
-            organisations=org_names,
-            status='Enabled' if is_active else 'Disabled',
-            lastLoginDate=last_login,
-            createdAt=created_at
-        )
+            return USER_MAPPER.map_one(row, columns, fullName=fname or uname, organisations=org_names)
     except Exception as e:
         logger.error(f"Get user error: {e}")
         return None
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def create_user(request: CreateUserRequest, created_by: int) -> UserResponse:
     try:
@@ -176,14 +190,16 @@ def create_user(request: CreateUserRequest, created_by: int) -> UserResponse:
         
         # Update extra fields
         conn = _get_db_connection()
-        cur = conn.cursor()
-        
-        is_active = request.status.lower() in ['enabled', 'active', 'true']
-        cur.execute("""
-            UPDATE users SET full_name = %s, is_active = %s WHERE id = %s
-        """, (request.fullName, is_active, user_id))
-        conn.commit()
-        conn.close()
+        try:
+            cur = conn.cursor()
+            
+            is_active = request.status.lower() in ['enabled', 'active', 'true']
+            cur.execute("""
+                UPDATE users SET full_name = %s, is_active = %s WHERE id = %s
+            """, (request.fullName, is_active, user_id))
+            conn.commit()
+        finally:
+            release_connection(conn)
         
         # Audit
         audit_service.log_action(
@@ -253,7 +269,7 @@ def update_user(user_id: int, request: UpdateUserRequest, updated_by: int) -> Op
         raise e
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def delete_user(user_id: int, deleted_by: int, current_role: str) -> bool:
     conn = None
@@ -304,4 +320,4 @@ def delete_user(user_id: int, deleted_by: int, current_role: str) -> bool:
         raise e
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
@@ -0,0 +1,37 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that is malformed or was issued for a different search."""
+
+
+def filter_hash(filters: Dict[str, Any]) -> str:
+    """Short digest of the filters a cursor is bound to."""
+    encoded = json.dumps(filters, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(created_at: datetime, entry_id: int, filters_hash: str) -> str:
+    """
+    Opaque keyset cursor: the `(created_at, entry_id)` of the last row
+    returned, plus the hash of the filters it was issued for.
+    """
+    payload = json.dumps([created_at.isoformat(), entry_id, filters_hash], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, filters_hash: str) -> Tuple[datetime, int]:
+    """`(created_at, entry_id)` of a cursor issued for the same filters."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, entry_id, issued_for = json.loads(payload)
+        position = datetime.fromisoformat(created_at), int(entry_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if issued_for != filters_hash:
+        raise InvalidCursor("Cursor was issued for different search filters; start again without it")
+    return position
@@ -0,0 +1,123 @@
+import codecs
+import json
+import zlib
+from typing import Any, AsyncIterator, Union
+
+# A record is either the decoded JSON value or the ValueError for a line that failed to parse
+Record = Union[Any, ValueError]
+
+
+class JSONStreamError(ValueError):
+    """The body cannot be read past this point (bad gzip, malformed array, oversized record)."""
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes], gzip: bool = False, max_record_bytes: int = 1 << 20
+) -> AsyncIterator[Record]:
+    """Decode a request body incrementally as a JSON array or as NDJSON.
+
+    The format is sniffed from the first non-whitespace byte (`[` means an
+    array). An NDJSON line that is not valid JSON yields a ValueError for
+    that record only; a malformed array raises JSONStreamError since its
+    remaining records cannot be located.
+    """
+    body = _decompressed(chunks, gzip)
+    head = b""
+    async for chunk in body:
+        head += chunk
+        if head.strip():
+            break
+    if not head.strip():
+        return
+
+    async def rest():
+        yield head
+        async for chunk in body:
+            yield chunk
+
+    records = _array_records if head.lstrip()[:1] == b"[" else _ndjson_records
+    async for record in records(rest(), max_record_bytes):
+        yield record
+
+
+async def _decompressed(chunks: AsyncIterator[bytes], gzip: bool) -> AsyncIterator[bytes]:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+    async for chunk in chunks:
+        if decompressor is not None:
+            try:
+                chunk = decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise JSONStreamError(f"Invalid gzip body: {e}") from e
+        if chunk:
+            yield chunk
+    if decompressor is not None:
+        if not decompressor.eof:
+            raise JSONStreamError("Truncated gzip body")
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+async def _ndjson_records(chunks: AsyncIterator[bytes], max_record_bytes: int) -> AsyncIterator[Record]:
+    pending = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line, max_record_bytes)
+        if len(pending) > max_record_bytes:
+            raise JSONStreamError(f"Record larger than {max_record_bytes} bytes")
+    if pending.strip():
+        yield _parse_line(pending, max_record_bytes)
+
+
+def _parse_line(line: bytes, max_record_bytes: int) -> Record:
+    if len(line) > max_record_bytes:
+        return ValueError(f"Record larger than {max_record_bytes} bytes")
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+async def _array_records(chunks: AsyncIterator[bytes], max_record_bytes: int) -> AsyncIterator[Record]:
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    # 0: before "[", 1: expecting a record or "]", 2: expecting "," or "]"
+    buffer, state = "", 0
+    async for chunk in chunks:
+        try:
+            buffer += utf8.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise JSONStreamError(f"Invalid UTF-8 in body: {e}") from e
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if state == 0:
+                buffer, state = buffer[1:], 1
+            elif buffer[0] == "]" and state != 0:
+                if buffer[1:].strip():
+                    raise JSONStreamError("Unexpected data after the JSON array")
+                buffer, state = "", 3
+            elif state == 3:
+                raise JSONStreamError("Unexpected data after the JSON array")
+            elif state == 2:
+                if buffer[0] != ",":
+                    raise JSONStreamError("Expected ',' or ']' between array records")
+                buffer, state = buffer[1:], 1
+            else:
+                try:
+                    record, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    # Most likely a record split across chunks; wait for more unless it is too big to be one
+                    if len(buffer) > max_record_bytes:
+                        raise JSONStreamError(f"Malformed record or record larger than {max_record_bytes} bytes")
+                    break
+                if end == len(buffer):
+                    # A bare number may continue in the next chunk; a valid array always has more after it
+                    break
+                yield record
+                buffer, state = buffer[end:], 2
+    if state != 3:
+        raise JSONStreamError("Malformed or unterminated JSON array")
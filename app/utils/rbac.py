@@ -7,12 +7,13 @@ from datetime import datetime, timedelta
 import jwt
 import hashlib
 import secrets
-import psycopg2
 
 
 
 from app.config.settings import settings
 from app.config.logger import logger
+from app.db.pool import get_connection, release_connection
+from app.db.statements import prepared_statements
 
 
 
@@ -128,7 +129,8 @@ class RBACManager:
         self.token_expiry_hours = 24
 
     def _get_db_connection(self):
-        return psycopg2.connect(**self.db_params)
+        # `db_params` is kept for compatibility; connections come from the shared pool.
+        return get_connection()
 
     # -------- Password Handling --------
 
@@ -153,7 +155,8 @@ class RBACManager:
             conn = self._get_db_connection()
             cur = conn.cursor()
 
-            cur.execute(
+            prepared_statements.execute(
+                cur,
                 """
                 SELECT
                     id,
@@ -172,6 +175,7 @@ class RBACManager:
                     AND COALESCE((metadata->>'is_deleted')::boolean, false) = false
                 """,
                 (email.lower(),),
+                label="auth_user",
             )
 
             row = cur.fetchone()
@@ -202,7 +206,7 @@ class RBACManager:
             if cur:
                 cur.close()
             if conn:
-                conn.close()
+                release_connection(conn)
 
     def create_user(self, username: str, email: str, password: str, role: Role, client_ids: List[int] = None) -> int:
         """
@@ -239,7 +243,7 @@ class RBACManager:
             if cur:
                 cur.close()
             if conn:
-                conn.close()
+                release_connection(conn)
 
     # -------- JWT --------
 
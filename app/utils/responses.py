@@ -0,0 +1,68 @@
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Type, Union
+
+import anyio
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from starlette.concurrency import run_in_threadpool
+
+_list_adapters: Dict[Type[BaseModel], TypeAdapter] = {}
+
+
+def _dump_batch(batch: List[BaseModel]) -> bytes:
+    model = type(batch[0])
+    adapter = _list_adapters.get(model)
+    if adapter is None:
+        adapter = _list_adapters[model] = TypeAdapter(List[model])
+    # Same by-alias output FastAPI produces for `response_model`, minus the brackets.
+    return adapter.dump_json(batch, by_alias=True)[1:-1]
+
+
+Batches = Union[Iterator[List[BaseModel]], AsyncIterator[List[BaseModel]]]
+
+
+async def _next_batch(batches: Batches):
+    if hasattr(batches, "__anext__"):
+        return await anext(batches, None)
+    # Blocking cursor fetch
+    return await run_in_threadpool(next, batches, None)
+
+
+async def _close(batches: Batches) -> None:
+    if hasattr(batches, "aclose"):
+        await batches.aclose()
+        return
+    close = getattr(batches, "close", None)
+    if close is not None:
+        await run_in_threadpool(close)
+
+
+async def streaming_api_response(batches: Batches, message: str) -> StreamingResponse:
+    """
+    Stream an `APIResponse` whose `data` is a list, one batch at a time, e.g.
+    from `app.db.streaming.stream_models` (run in the threadpool) or
+    `stream_models_async` (awaited on the event loop).
+
+    The first batch is fetched before the response starts so that query
+    errors still produce a proper error status. Later failures can only
+    abort the (already 200) response.
+    """
+    first = await _next_batch(batches)
+    head = json.dumps({"status": "success", "success": True, "message": message})[:-1] + ', "data": ['
+
+    async def body():
+        try:
+            yield head.encode()
+            batch, separator = first, b""
+            while batch is not None:
+                if batch:
+                    yield separator + _dump_batch(batch)
+                    separator = b","
+                batch = await _next_batch(batches)
+            yield b'], "error": null}'
+        finally:
+            # Release the cursor's connection even if the client went away.
+            with anyio.CancelScope(shield=True):
+                await _close(batches)
+
+    return StreamingResponse(body(), media_type="application/json")
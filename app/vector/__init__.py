@@ -0,0 +1,4 @@
+# Embeddings and vector search for knowledge entries.
+# Entries are embedded locally on write (app/vector/embedder.py) and searched
+# through the backend chosen at startup (app/vector/backends.py): pgvector in
+# SQL, or the float8[] column with an in-memory matrix / HNSW index.
@@ -0,0 +1,227 @@
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.vector.embedder import EMBEDDING_DIM
+from app.vector.hnsw import vector_indexes
+from app.vector.matrix_cache import embedding_cache, read_generation
+
+# Candidates fetched per requested hit when filters are applied after scoring
+SEMANTIC_OVERFETCH = 4
+# Same without filters, to make up for candidates that no longer exist (see ArrayBackend.search)
+UNFILTERED_OVERFETCH = 2
+
+EMBEDDING_TYPE_QUERY = """
+    SELECT format_type(a.atttypid, a.atttypmod),
+           (SELECT extversion FROM pg_extension WHERE extname = 'vector')
+    FROM pg_attribute a
+    WHERE a.attrelid = 'knowledge_entries'::regclass AND a.attname = 'embedding'
+"""
+
+Hit = Tuple[int, float]
+
+# format_type() of the float8[] embedding column (app/db/schema.sql)
+ARRAY_COLUMN_TYPE = "double precision[]"
+
+
+def filter_clause(filters) -> Tuple[str, List[Any]]:
+    """
+    SQL (`AND ...`) for the non-client filters of a `SemanticSearchRequest`
+    (or `KnowledgeSearchRequest`, which adds `stakeholderId`).
+    """
+    clause, params = "", []
+    if filters.entryType:
+        clause += " AND entry_type = %s"
+        params.append(filters.entryType)
+    if filters.daaegPhase:
+        clause += " AND daaeg_phase = %s"
+        params.append(filters.daaegPhase)
+    if filters.tags:
+        clause += " AND tags && %s"
+        params.append(filters.tags)
+    if getattr(filters, "stakeholderId", None):
+        clause += " AND stakeholder_ids @> ARRAY[%s]::integer[]"
+        params.append(filters.stakeholderId)
+    return clause, params
+
+
+def vector_literal(vector: np.ndarray) -> str:
+    """pgvector text representation, e.g. `[0.1,0.2]`."""
+    return "[" + ",".join(f"{x:.7g}" for x in vector.tolist()) + "]"
+
+
+class VectorBackend:
+    """
+    Storage and nearest-neighbour search for `knowledge_entries.embedding`.
+    `KnowledgeService` only talks to this interface; `vector_store` picks
+    the implementation for the database at startup.
+
+    Embeddings are always written as float lists (the `embedding` column
+    accepts them whether it is `float8[]` or `vector`).
+    """
+
+    name = "abstract"
+
+    def search(self, cur, filters, vector: np.ndarray, k: int) -> List[Hit]:
+        """Up to `k` `(entry_id, cosine similarity)` of the client matching `filters`, best first."""
+        raise NotImplementedError
+
+    def wants_vectors(self, client_id: int) -> bool:
+        """Whether `added` needs the vectors (rather than just the ids) for this client."""
+        return False
+
+    def added(self, client_id: int, entry_ids: Sequence[int], vectors: Optional[np.ndarray] = None) -> None:
+        """Called after entries of the client were committed."""
+
+    def removed(self, client_id: int, entry_ids: Sequence[int]) -> None:
+        """Called after entries of the client were deleted."""
+
+
+class ArrayBackend(VectorBackend):
+    """
+    `float8[]` column searched in the application: through the client's HNSW
+    index when it has one (app/vector/hnsw.py), otherwise exactly over the
+    cached embedding matrix (app/vector/matrix_cache.py). Filters are
+    applied in SQL to an over-fetched candidate set, so fewer than `k`
+    hits can come back when filters are very selective.
+
+    Candidates are always checked against the table: the index and the
+    cached matrices are updated after commit and may briefly (or, after a
+    failed index update, until a rebuild) hold entries that no longer exist.
+    """
+
+    name = "float8[]"
+
+    def search(self, cur, filters, vector: np.ndarray, k: int) -> List[Hit]:
+        searcher = vector_indexes.get(filters.clientId)
+        if searcher is None:
+            # Rebuilt when another worker has written since it was built
+            searcher = embedding_cache.get(filters.clientId, read_generation(cur, filters.clientId))
+        clause, params = filter_clause(filters)
+        ids, scores = searcher.top_k(vector, k * (SEMANTIC_OVERFETCH if clause else UNFILTERED_OVERFETCH))
+        hits = [(entry_id, score) for entry_id, score in zip(ids[0].tolist(), scores[0].tolist()) if entry_id >= 0]
+        if hits:
+            cur.execute(
+                f"SELECT entry_id FROM knowledge_entries WHERE client_id = %s AND entry_id = ANY(%s){clause}",
+                [filters.clientId, [entry_id for entry_id, _ in hits]] + params,
+            )
+            matching = {row[0] for row in cur.fetchall()}
+            hits = [hit for hit in hits if hit[0] in matching]
+        return hits[:k]
+
+    def wants_vectors(self, client_id: int) -> bool:
+        return vector_indexes.get(client_id) is not None
+
+    def added(self, client_id: int, entry_ids: Sequence[int], vectors: Optional[np.ndarray] = None) -> None:
+        embedding_cache.invalidate(client_id)
+        if vectors is not None:
+            vector_indexes.add(client_id, entry_ids, vectors)
+
+    def removed(self, client_id: int, entry_ids: Sequence[int]) -> None:
+        embedding_cache.invalidate(client_id)
+        vector_indexes.remove(client_id, entry_ids)
+
+
+class PgvectorBackend(VectorBackend):
+    """
+    `vector(384)` column searched in SQL with the cosine distance operator,
+    together with the client and other filters, using the pgvector HNSW or
+    IVFFlat index (migration 0005). The index stays current on its own.
+    """
+
+    name = "pgvector"
+
+    def __init__(self, version: str):
+        self.version = version
+        # Iterative index scans (keep scanning until enough rows pass the filters) came in 0.8
+        self.iterative_scan = tuple(int(p) for p in version.split(".")[:2] if p.isdigit()) >= (0, 8)
+
+    def _session_settings(self, cur, k: int) -> None:
+        if settings.PGVECTOR_INDEX == "ivfflat":
+            cur.execute("SELECT set_config('ivfflat.probes', %s, true)", (str(settings.PGVECTOR_IVFFLAT_PROBES),))
+            return
+        cur.execute(
+            "SELECT set_config('hnsw.ef_search', %s, true)", (str(max(settings.HNSW_EF_SEARCH, k)),)
+        )
+        if self.iterative_scan:
+            cur.execute("SELECT set_config('hnsw.iterative_scan', 'relaxed_order', true)")
+
+    def search(self, cur, filters, vector: np.ndarray, k: int) -> List[Hit]:
+        clause, params = filter_clause(filters)
+        literal = vector_literal(vector)
+        self._session_settings(cur, k)
+        cur.execute(f"""
+            SELECT entry_id, 1 - (embedding <=> %s::vector) AS score
+            FROM knowledge_entries
+            WHERE client_id = %s AND embedding IS NOT NULL{clause}
+            ORDER BY embedding <=> %s::vector
+            LIMIT %s
+        """, [literal, filters.clientId] + params + [literal, k])
+        hits = [(entry_id, float(score)) for entry_id, score in cur.fetchall()]
+        # relaxed_order may return neighbours slightly out of order
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits
+
+
+class VectorStore:
+    """
+    Holds the active `VectorBackend`. `detect()` (run at startup, or lazily
+    on first use) checks the type of `knowledge_entries.embedding`: pgvector
+    is used when the column has been migrated to `vector(384)`, the float
+    array path when it is `float8[]`. Any other type is an error.
+    """
+
+    def __init__(self):
+        self._backend: Optional[VectorBackend] = None
+        self._lock = threading.Lock()
+
+    def detect(self) -> VectorBackend:
+        from app.db.pool import db_pool
+
+        backend: VectorBackend = ArrayBackend()
+        try:
+            conn = db_pool.getconn()
+            try:
+                cur = conn.cursor()
+                cur.execute(EMBEDDING_TYPE_QUERY)
+                row = cur.fetchone()
+                conn.rollback()
+            finally:
+                db_pool.putconn(conn)
+        except Exception as e:
+            # Not remembered: the next use detects again (e.g. once the database is up).
+            logger.error(f"Vector backend detection failed, using {backend.name} for now: {e}")
+            return backend
+
+        column_type, version = row if row else (None, None)
+        if column_type == f"vector({EMBEDDING_DIM})":
+            # The float8[] path cannot query a vector column, whatever the setting says
+            if not settings.PGVECTOR_ENABLED:
+                logger.warning(
+                    "PGVECTOR_ENABLED is off but knowledge_entries.embedding is already vector(384); using pgvector. "
+                    "Downgrade migration 0005 to go back to float8[]"
+                )
+            backend = PgvectorBackend(version or "0")
+        elif column_type not in (None, ARRAY_COLUMN_TYPE):
+            raise RuntimeError(
+                f"knowledge_entries.embedding has type {column_type}; expected {ARRAY_COLUMN_TYPE} "
+                f"or vector({EMBEDDING_DIM}) (see migration 0005)"
+            )
+        elif version and settings.PGVECTOR_ENABLED:
+            logger.info("pgvector is installed but knowledge_entries.embedding is not migrated; run `alembic upgrade head`")
+        with self._lock:
+            self._backend = backend
+        logger.info(f"Vector backend: {backend.name}")
+        return backend
+
+    @property
+    def backend(self) -> VectorBackend:
+        if self._backend is None:
+            return self.detect()
+        return self._backend
+
+
+vector_store = VectorStore()
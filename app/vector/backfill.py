@@ -0,0 +1,223 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from psycopg2.extras import execute_values
+from starlette.concurrency import run_in_threadpool
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.db.pool import db_pool
+from app.db.result_cache import search_cache
+from app.vector.backends import PgvectorBackend, vector_literal, vector_store
+from app.vector.embedder import EMBEDDING_VERSION, embedder, entry_text
+
+# Entries without an embedding of the current version, in the order of
+# idx_knowledge_entries_embedding_pending (migration 0008). SKIP LOCKED lets
+# several workers claim disjoint batches.
+CLAIM_QUERY = """
+    SELECT entry_id, client_id, content, tags, embedding IS NOT NULL
+    FROM knowledge_entries
+    WHERE COALESCE(embedding_version, 0) < %s{clients}
+    ORDER BY COALESCE(embedding_version, 0), entry_id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+PENDING_QUERY = "SELECT count(*) FROM knowledge_entries WHERE COALESCE(embedding_version, 0) < %s{clients}"
+
+# One statement per batch; the VALUES list is filled in by execute_values
+UPDATE_QUERY = """
+    UPDATE knowledge_entries AS k
+    SET embedding = v.embedding, embedding_version = v.version
+    FROM (VALUES %s) AS v (entry_id, embedding, version)
+    WHERE k.entry_id = v.entry_id
+"""
+
+
+def _embed_texts(texts: List[str]) -> np.ndarray:
+    # Runs in the pool's worker processes
+    return embedder.embed_batch(texts)
+
+
+@dataclass
+class BackfillStats:
+    rows: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / max(self.seconds, 1e-9)
+
+
+class EmbeddingBackfill:
+    """
+    Fills in `knowledge_entries.embedding` for entries that have none, or one
+    from an older EMBEDDING_VERSION.
+
+    Each batch is one transaction: claim up to `batch_rows` entries with
+    `FOR UPDATE SKIP LOCKED`, embed them with `embed_batch` (split across
+    `processes` worker processes when there is more than one), write them
+    back with a single `UPDATE ... FROM (VALUES ...)` and commit. Progress
+    lives in the rows themselves, so an interrupted run loses at most the
+    uncommitted batch and any number of workers can run side by side.
+
+    After each commit the vector backend is told about the new vectors (the
+    HNSW index of the client, if any, is updated). The UPDATE bumps the
+    clients' shared search cache generation (migration 0009), so cached
+    hybrid results are dropped in every worker, and every worker rebuilds
+    its embedding matrix of the client on its next search.
+    """
+
+    def __init__(
+        self,
+        batch_rows: Optional[int] = None,
+        processes: Optional[int] = None,
+        max_rows_per_second: Optional[float] = None,
+        client_ids: Sequence[int] = (),
+    ):
+        self.batch_rows = batch_rows or settings.EMBEDDING_BACKFILL_BATCH_ROWS
+        self.processes = processes or settings.EMBEDDING_BACKFILL_PROCESSES or os.cpu_count() or 1
+        rate = settings.EMBEDDING_BACKFILL_MAX_ROWS_PER_SECOND if max_rows_per_second is None else max_rows_per_second
+        self.max_rows_per_second = rate or None
+        self.client_ids = list(client_ids)
+        self._executor = None
+        if self.processes > 1:
+            # Spawned, not forked: children must not inherit the pool's open connections
+            self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _client_filter(self):
+        if not self.client_ids:
+            return "", []
+        return " AND client_id = ANY(%s)", [self.client_ids]
+
+    def pending(self) -> int:
+        """Entries still to be (re-)embedded."""
+        clients, params = self._client_filter()
+        conn = db_pool.getconn()
+        try:
+            cur = conn.cursor()
+            cur.execute(PENDING_QUERY.format(clients=clients), [EMBEDDING_VERSION] + params)
+            count = cur.fetchone()[0]
+            conn.rollback()
+            return count
+        finally:
+            db_pool.putconn(conn)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self._executor is None or len(texts) < 2 * self.processes:
+            return embedder.embed_batch(texts)
+        step = -(-len(texts) // self.processes)
+        chunks = [texts[i:i + step] for i in range(0, len(texts), step)]
+        return np.vstack(list(self._executor.map(_embed_texts, chunks)))
+
+    def run_batch(self, max_rows: Optional[int] = None) -> int:
+        """Claim, embed and write back one batch; returns the number of entries embedded (0 when caught up)."""
+        batch_rows = min(self.batch_rows, max_rows) if max_rows else self.batch_rows
+        clients, params = self._client_filter()
+        backend = vector_store.backend
+        conn = db_pool.getconn()
+        try:
+            cur = conn.cursor()
+            cur.execute(CLAIM_QUERY.format(clients=clients), [EMBEDDING_VERSION] + params + [batch_rows])
+            rows = cur.fetchall()
+            if not rows:
+                conn.rollback()
+                return 0
+
+            vectors = self._embed([entry_text(content, tags) for _, _, content, tags, _ in rows])
+            if isinstance(backend, PgvectorBackend):
+                template = "(%s, %s::vector, %s::smallint)"
+                values = [(row[0], vector_literal(vector), EMBEDDING_VERSION) for row, vector in zip(rows, vectors)]
+            else:
+                template = "(%s, %s::float8[], %s::smallint)"
+                values = [(row[0], vector.tolist(), EMBEDDING_VERSION) for row, vector in zip(rows, vectors)]
+            execute_values(cur, UPDATE_QUERY, values, template=template, page_size=len(values))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            db_pool.putconn(conn)
+
+        positions: Dict[int, List[int]] = {}
+        for position, (_, client_id, _, _, _) in enumerate(rows):
+            positions.setdefault(client_id, []).append(position)
+        for client_id, client_positions in positions.items():
+            search_cache.invalidate(client_id)
+            entry_ids = [rows[position][0] for position in client_positions]
+            # Re-embedded entries replace their old vector in the HNSW index
+            replaced = [rows[position][0] for position in client_positions if rows[position][4]]
+            if replaced:
+                backend.removed(client_id, replaced)
+            backend.added(
+                client_id, entry_ids, vectors[client_positions] if backend.wants_vectors(client_id) else None
+            )
+        return len(rows)
+
+    def throttle(self, rows: int, elapsed: float) -> float:
+        """Seconds to wait after a batch of `rows` that took `elapsed` to stay under max_rows_per_second."""
+        if not self.max_rows_per_second:
+            return 0.0
+        return max(0.0, rows / self.max_rows_per_second - elapsed)
+
+    def run(self, limit: Optional[int] = None, follow: bool = False, report_every: float = 10.0) -> BackfillStats:
+        """
+        Embed batches until no entry is pending (or `limit` entries are done);
+        with `follow`, keep polling every EMBEDDING_BACKFILL_IDLE_SECONDS instead
+        of returning. Throughput is logged every `report_every` seconds.
+        """
+        stats = BackfillStats()
+        reported = stats.started
+        while limit is None or stats.rows < limit:
+            batch_started = time.perf_counter()
+            rows = self.run_batch(None if limit is None else limit - stats.rows)
+            if rows:
+                stats.rows += rows
+                stats.batches += 1
+            elif follow:
+                time.sleep(settings.EMBEDDING_BACKFILL_IDLE_SECONDS)
+                continue
+            else:
+                break
+            now = time.perf_counter()
+            if now - reported >= report_every:
+                reported = now
+                logger.info(f"Embedding backfill: {stats.rows:,} rows in {stats.seconds:.0f}s ({stats.rows_per_second:,.0f} rows/s)")
+            time.sleep(self.throttle(rows, now - batch_started))
+        return stats
+
+
+async def run_backfill_task() -> None:
+    """
+    In-process backfill for the app lifespan (EMBEDDING_BACKFILL_IN_PROCESS):
+    batches run one at a time in the threadpool and are embedded in-thread.
+    Errors are logged and retried after the idle interval.
+    """
+    backfill = EmbeddingBackfill(processes=1)
+    while True:
+        started = time.perf_counter()
+        try:
+            rows = await run_in_threadpool(backfill.run_batch)
+        except Exception as e:
+            logger.error(f"Embedding backfill batch failed: {e}")
+            rows = 0
+        if not rows:
+            await asyncio.sleep(settings.EMBEDDING_BACKFILL_IDLE_SECONDS)
+            continue
+        await asyncio.sleep(backfill.throttle(rows, time.perf_counter() - started))
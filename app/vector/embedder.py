@@ -0,0 +1,108 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+# Width of knowledge_entries.embedding
+EMBEDDING_DIM = 384
+
+# Stored in knowledge_entries.embedding_version; bump it whenever `embed()` output
+# changes so the backfill (app/vector/backfill.py) re-embeds older rows
+EMBEDDING_VERSION = 1
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+@lru_cache(maxsize=200_000)
+def _feature_buckets(feature: str, hashes: int) -> bytes:
+    return hashlib.blake2b(feature.encode("utf-8"), digest_size=2 * hashes).digest()
+
+
+class HashingEmbedder:
+    """
+    Local, CPU-only text embedder: feature hashing followed by a sparse
+    random projection to `dim` dimensions, in NumPy. No model files, no
+    network, and the output only depends on the text, so vectors stay
+    comparable across processes and restarts.
+
+    Features are lowercased word unigrams and bigrams, weighted by
+    `1 + log(tf)`. Each feature is hashed to `hashes` (bucket, sign) pairs,
+    which is the same as multiplying the (unbounded) hashed feature vector
+    by a sparse random +-1 matrix. Vectors are L2-normalised, so cosine
+    similarity is a dot product.
+
+    Similarity is lexical (shared words and phrases), not semantic in the
+    language-model sense; the interface (`embed`, `embed_batch`) is what
+    the rest of the code depends on.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, hashes: int = 4):
+        self.dim = dim
+        self.hashes = hashes
+
+    def _features(self, text: str) -> Counter:
+        tokens = _TOKEN.findall(text.lower())
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return features
+
+    def embed(self, text: Optional[str]) -> np.ndarray:
+        """Embedding of `text` as a float32 vector of length `dim` (all zeros for empty text)."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = self._features(text or "")
+        if not features:
+            return vector
+
+        digests = b"".join(_feature_buckets(feature, self.hashes) for feature in features)
+        codes = np.frombuffer(digests, dtype=np.uint16).reshape(len(features), self.hashes)
+        weights = np.array([1.0 + math.log(count) for count in features.values()], dtype=np.float32)
+
+        buckets = (codes >> 1) % self.dim
+        signs = np.where(codes & 1, 1.0, -1.0).astype(np.float32)
+        np.add.at(vector, buckets.ravel(), (signs * weights[:, None]).ravel())
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_batch(self, texts: Iterable[Optional[str]]) -> np.ndarray:
+        """
+        Embeddings of `texts` as a C-contiguous float32 matrix of shape (n, dim),
+        equal to stacking `embed()` of each text. Only feature extraction is
+        per text; hashing buckets, accumulation and normalisation run once
+        over the whole batch.
+        """
+        counters = [self._features(text or "") for text in texts]
+        matrix = np.zeros((len(counters), self.dim), dtype=np.float32)
+        sizes = np.fromiter((len(features) for features in counters), dtype=np.int64, count=len(counters))
+        if not sizes.sum():
+            return matrix
+
+        digests = b"".join(_feature_buckets(f, self.hashes) for features in counters for f in features)
+        codes = np.frombuffer(digests, dtype=np.uint16).reshape(-1, self.hashes)
+        weights = np.fromiter(
+            (1.0 + math.log(count) for features in counters for count in features.values()),
+            dtype=np.float32, count=len(codes),
+        )
+        rows = np.repeat(np.arange(len(counters)), sizes)
+
+        cells = rows[:, None] * self.dim + (codes >> 1) % self.dim
+        signs = np.where(codes & 1, 1.0, -1.0).astype(np.float32)
+        np.add.at(matrix.reshape(-1), cells.ravel(), (signs * weights[:, None]).ravel())
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+def entry_text(content: Optional[str], tags: Optional[Sequence[str]] = None) -> str:
+    """Text of a knowledge entry that goes into its embedding."""
+    return " ".join([content or ""] + list(tags or []))
+
+
+embedder = HashingEmbedder()
@@ -0,0 +1,423 @@
+import fcntl
+import heapq
+import math
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config.logger import logger
+from app.config.settings import settings
+
+# Highest graph layer; level-assignment probability makes anything above it vanishingly rare
+MAX_LEVEL = 8
+
+# header.i64 layout (the one file that is never replaced, so every process sees updates)
+COUNT, ENTRY_POINT, TOP_LEVEL, CAPACITY, UPPER_COUNT, UPPER_CAPACITY, DELETED, DIM, M, EF_CONSTRUCTION = range(10)
+# 1 + highest entry id ever added; 0 until first recorded (also in indexes built before it existed)
+NEXT_ID = 10
+HEADER_SIZE = 16
+
+HEADER_FILE = "header.i64"
+LOCK_FILE = "lock"
+
+
+def _layout(dim: int, m: int):
+    # file name, dtype, row shape, fill value, sized by "capacity" or "upper_capacity"
+    return [
+        ("vectors.f32", np.float32, (dim,), 0, CAPACITY),
+        ("ids.i64", np.int64, (), -1, CAPACITY),
+        ("levels.i8", np.int8, (), 0, CAPACITY),
+        ("deleted.u8", np.uint8, (), 0, CAPACITY),
+        ("upper_slot.i32", np.int32, (), -1, CAPACITY),
+        ("links0.i32", np.int32, (2 * m,), -1, CAPACITY),
+        ("links_upper.i32", np.int32, (MAX_LEVEL, m), -1, UPPER_CAPACITY),
+    ]
+
+
+def _create_array(path: Path, dtype, shape, fill) -> None:
+    array = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+    if fill:
+        array[:] = fill
+    array.flush()
+    del array
+
+
+class HNSWIndex:
+    """
+    Hierarchical Navigable Small World graph over unit vectors (cosine
+    similarity), stored as memory-mapped files in one directory.
+
+    All arrays are mapped shared, so every gunicorn worker that opens the
+    index uses the same page-cache pages, and a restarted worker reopens it
+    without rebuilding. Writes (`add`, `remove`) hold an exclusive `flock`
+    on the directory and go straight to the mapped pages; searches take no
+    lock and read the shared header for the current size and entry point.
+    When an array fills up it is copied into a file twice the size and
+    swapped in with `os.replace`; other processes notice the new capacity
+    in the header and remap.
+
+    Deletes are tombstones: the node stays in the graph for navigation but
+    is never returned. Rebuild the index when many entries are deleted.
+
+    `m` is the number of links per node (2 * m on the bottom layer) and
+    `ef_construction` / `ef` are the candidate list sizes when inserting /
+    searching: higher means better recall and slower operations.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._header = np.memmap(self.path / HEADER_FILE, dtype=np.int64, mode="r+", shape=(HEADER_SIZE,))
+        self.dim = int(self._header[DIM])
+        self.m = int(self._header[M])
+        self.ef_construction = int(self._header[EF_CONSTRUCTION])
+        self._level_mult = 1.0 / math.log(self.m)
+        self._rng = np.random.default_rng()
+        self._mapped: Tuple[int, int] = (-1, -1)
+        self._map()
+
+    @classmethod
+    def create(cls, path: Path, dim: int, m: int, ef_construction: int, capacity: int = 1024) -> "HNSWIndex":
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        header = np.memmap(path / HEADER_FILE, dtype=np.int64, mode="w+", shape=(HEADER_SIZE,))
+        header[:] = 0
+        header[ENTRY_POINT] = -1
+        header[TOP_LEVEL] = -1
+        header[CAPACITY] = capacity
+        header[UPPER_CAPACITY] = max(16, capacity // m)
+        header[DIM] = dim
+        header[M] = m
+        header[EF_CONSTRUCTION] = ef_construction
+        for name, dtype, row_shape, fill, size_field in _layout(dim, m):
+            _create_array(path / name, dtype, (int(header[size_field]),) + row_shape, fill)
+        header.flush()
+        del header
+        return cls(path)
+
+    # -------- Storage --------
+
+    def _map(self) -> None:
+        capacity, upper_capacity = int(self._header[CAPACITY]), int(self._header[UPPER_CAPACITY])
+        sizes = {CAPACITY: capacity, UPPER_CAPACITY: upper_capacity}
+        self._maps = {}
+        arrays = {}
+        for name, dtype, row_shape, _, size_field in _layout(self.dim, self.m):
+            mapped = np.memmap(self.path / name, dtype=dtype, mode="r+", shape=(sizes[size_field],) + row_shape)
+            self._maps[name] = mapped
+            # Plain ndarray views of the same pages: memmap's indexing overhead dominates graph walks.
+            arrays[name] = mapped.view(np.ndarray)
+        self._vectors = arrays["vectors.f32"]
+        self._ids = arrays["ids.i64"]
+        self._levels = arrays["levels.i8"]
+        self._deleted = arrays["deleted.u8"]
+        self._upper_slot = arrays["upper_slot.i32"]
+        self._links0 = arrays["links0.i32"]
+        self._links_upper = arrays["links_upper.i32"]
+        self._mapped = (capacity, upper_capacity)
+
+    def _refresh(self) -> None:
+        # Another process may have grown the files since we mapped them.
+        if (int(self._header[CAPACITY]), int(self._header[UPPER_CAPACITY])) != self._mapped:
+            with self._lock:
+                self._map()
+
+    def _grow(self, size_field: int, needed: int) -> None:
+        old_size = int(self._header[size_field])
+        if needed <= old_size:
+            return
+        new_size = max(needed, old_size * 2)
+        for name, dtype, row_shape, fill, field in _layout(self.dim, self.m):
+            if field != size_field:
+                continue
+            old = np.memmap(self.path / name, dtype=dtype, mode="r", shape=(old_size,) + row_shape)
+            tmp = self.path / (name + ".tmp")
+            new = np.memmap(tmp, dtype=dtype, mode="w+", shape=(new_size,) + row_shape)
+            new[:old_size] = old
+            if fill:
+                new[old_size:] = fill
+            new.flush()
+            del new, old
+            os.replace(tmp, self.path / name)
+        self._header[size_field] = new_size
+        self._map()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._lock, open(self.path / LOCK_FILE, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return int(self._header[COUNT] - self._header[DELETED])
+
+    @property
+    def deleted(self) -> int:
+        return int(self._header[DELETED])
+
+    def flush(self) -> None:
+        self._header.flush()
+        for mapped in self._maps.values():
+            mapped.flush()
+
+    # -------- Graph --------
+
+    def _links(self, node: int, level: int) -> np.ndarray:
+        if level == 0:
+            return self._links0[node]
+        return self._links_upper[self._upper_slot[node], level - 1]
+
+    def _search_layer(self, query: np.ndarray, entry_points: Sequence[int], ef: int, level: int) -> List[Tuple[float, int]]:
+        """Greedy best-first search of one layer; returns up to `ef` (distance, node), closest first."""
+        entry_points = list(entry_points)
+        distances = (1.0 - self._vectors[entry_points] @ query).tolist()
+        visited = set(entry_points)
+        candidates = list(zip(distances, entry_points))
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if distance > -results[0][0]:
+                break
+            links = self._links(node, level)
+            # Nodes beyond our mapping were added after the search started
+            links = links[(links >= 0) & (links < len(self._vectors))]
+            neighbours = [n for n in links.tolist() if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for neighbour, d in zip(neighbours, (1.0 - self._vectors[neighbours] @ query).tolist()):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, neighbour))
+                    heapq.heappush(results, (-d, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted((-d, n) for d, n in results)
+
+    def _select_neighbours(self, candidates: List[Tuple[float, int]], m: int) -> List[int]:
+        """
+        Neighbour-selection heuristic: skip a candidate that is closer to an
+        already selected neighbour than to the base node (keeps links spread
+        out), then top up with the closest skipped ones.
+        """
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+        nodes = [node for _, node in candidates]
+        vectors = self._vectors[nodes]
+        between = (1.0 - vectors @ vectors.T).tolist()
+
+        selected: List[int] = []
+        skipped: List[int] = []
+        for i, (distance, _) in enumerate(candidates):
+            if len(selected) >= m:
+                break
+            row = between[i]
+            if any(row[j] < distance for j in selected):
+                skipped.append(i)
+            else:
+                selected.append(i)
+        return [nodes[i] for i in selected + skipped[:m - len(selected)]]
+
+    def _connect(self, node: int, new: int, level: int) -> None:
+        links = self._links(node, level)
+        current = links[links >= 0]
+        if len(current) < len(links):
+            links[len(current)] = new
+            return
+        candidates = np.append(current, new)
+        distances = 1.0 - self._vectors[candidates] @ self._vectors[node]
+        order = np.argsort(distances)
+        keep = self._select_neighbours(list(zip(distances[order].tolist(), candidates[order].tolist())), len(links))
+        # Searches read these links without a lock: write the new list in one go
+        # rather than clearing it first
+        new_links = np.full_like(links, -1)
+        new_links[:len(keep)] = keep
+        links[:] = new_links
+
+    def _insert(self, entry_id: int, vector: np.ndarray) -> None:
+        node = int(self._header[COUNT])
+        self._grow(CAPACITY, node + 1)
+        level = min(int(-math.log(1.0 - self._rng.random()) * self._level_mult), MAX_LEVEL)
+
+        self._vectors[node] = vector
+        self._ids[node] = entry_id
+        self._levels[node] = level
+        self._deleted[node] = 0
+        self._links0[node] = -1
+        if level > 0:
+            slot = int(self._header[UPPER_COUNT])
+            self._grow(UPPER_CAPACITY, slot + 1)
+            self._links_upper[slot] = -1
+            self._upper_slot[node] = slot
+            self._header[UPPER_COUNT] = slot + 1
+        else:
+            self._upper_slot[node] = -1
+
+        entry_point, top_level = int(self._header[ENTRY_POINT]), int(self._header[TOP_LEVEL])
+        if entry_point >= 0:
+            entry_points = [entry_point]
+            for lc in range(top_level, level, -1):
+                entry_points = [self._search_layer(vector, entry_points, 1, lc)[0][1]]
+            for lc in range(min(level, top_level), -1, -1):
+                found = self._search_layer(vector, entry_points, self.ef_construction, lc)
+                neighbours = self._select_neighbours(found, self.m)
+                links = self._links(node, lc)
+                links[:len(neighbours)] = neighbours
+                for neighbour in neighbours:
+                    self._connect(neighbour, node, lc)
+                entry_points = [n for _, n in found]
+
+        # Publish the node only once it is linked in.
+        self._header[COUNT] = node + 1
+        if level > top_level:
+            self._header[ENTRY_POINT] = node
+            self._header[TOP_LEVEL] = level
+
+    def add(self, entry_ids: Sequence[int], vectors: np.ndarray) -> int:
+        """Insert unit `vectors` for `entry_ids` (ids already indexed are skipped); returns the number added."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        entry_ids = np.asarray(entry_ids, dtype=np.int64)
+        if not len(entry_ids):
+            return 0
+        with self._writing():
+            count = int(self._header[COUNT])
+            next_id = int(self._header[NEXT_ID])
+            if next_id == 0 and count:
+                next_id = int(self._ids[:count].max()) + 1
+            if entry_ids.min() >= next_id:
+                # Entry ids only grow, so newly inserted entries need no lookup
+                new = np.ones(len(entry_ids), dtype=bool)
+            else:
+                live = self._ids[:count][self._deleted[:count] == 0]
+                new = ~np.isin(entry_ids, live)
+            for entry_id, vector in zip(entry_ids[new].tolist(), vectors[new]):
+                self._insert(entry_id, vector)
+            self._header[NEXT_ID] = max(next_id, int(entry_ids.max()) + 1)
+            return int(new.sum())
+
+    def remove(self, entry_ids: Sequence[int]) -> int:
+        """Tombstone `entry_ids`; returns the number removed."""
+        with self._writing():
+            count = int(self._header[COUNT])
+            nodes = np.flatnonzero(np.isin(self._ids[:count], entry_ids) & (self._deleted[:count] == 0))
+            self._deleted[nodes] = 1
+            self._header[DELETED] += len(nodes)
+            return len(nodes)
+
+    def top_k(self, queries: np.ndarray, k: int, ef: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate cosine top-`k` for each row of `queries`; same shapes as
+        `ClientMatrix.top_k` (rows padded with id -1 / score -inf when fewer
+        than `k` live entries are found).
+        """
+        self._refresh()
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self))
+        ef = max(ef or settings.HNSW_EF_SEARCH, k)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        entry_point, top_level = int(self._header[ENTRY_POINT]), int(self._header[TOP_LEVEL])
+        if entry_point >= self._mapped[0]:
+            # The files grew after the refresh above and the entry point is one of the new nodes
+            self._refresh()
+        if k == 0 or entry_point < 0:
+            return ids, scores
+
+        for row, query in enumerate(queries):
+            entry_points = [entry_point]
+            for lc in range(top_level, 0, -1):
+                entry_points = [self._search_layer(query, entry_points, 1, lc)[0][1]]
+            found = [(d, n) for d, n in self._search_layer(query, entry_points, ef, 0) if not self._deleted[n]][:k]
+            if found:
+                distances, nodes = zip(*found)
+                ids[row, :len(nodes)] = self._ids[list(nodes)]
+                scores[row, :len(nodes)] = 1.0 - np.asarray(distances)
+        return ids, scores
+
+
+class VectorIndexRegistry:
+    """
+    HNSW indexes of the clients that have one, under
+    `root/client_<id>/`. Indexes are opt-in per client (built with
+    `build_vector_index.py`); clients without one use exact search.
+
+    Each worker opens an index lazily and reopens it when the directory was
+    replaced by a rebuild (detected by the header file's inode).
+    """
+
+    def __init__(self, root: Path, m: int, ef_construction: int):
+        self.root = Path(root)
+        self.m = m
+        self.ef_construction = ef_construction
+        self._indexes: Dict[int, Tuple[int, HNSWIndex]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, client_id: int) -> Path:
+        return self.root / f"client_{client_id}"
+
+    def get(self, client_id: int) -> Optional[HNSWIndex]:
+        try:
+            inode = os.stat(self.path(client_id) / HEADER_FILE).st_ino
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            opened = self._indexes.get(client_id)
+            if opened is None or opened[0] != inode:
+                opened = self._indexes[client_id] = (inode, HNSWIndex(self.path(client_id)))
+            return opened[1]
+
+    def build(self, client_id: int, entry_ids: np.ndarray, vectors: np.ndarray) -> HNSWIndex:
+        """Build a fresh index next to the current one and swap it in."""
+        final = self.path(client_id)
+        staging = final.with_name(final.name + ".building")
+        shutil.rmtree(staging, ignore_errors=True)
+        index = HNSWIndex.create(staging, vectors.shape[1], self.m, self.ef_construction, capacity=max(1024, len(entry_ids)))
+        index.add(entry_ids, vectors)
+        index.flush()
+
+        retired = final.with_name(final.name + ".old")
+        shutil.rmtree(retired, ignore_errors=True)
+        if final.exists():
+            os.replace(final, retired)
+        os.replace(staging, final)
+        shutil.rmtree(retired, ignore_errors=True)  # open mappings keep the old files alive
+        return self.get(client_id)
+
+    def add(self, client_id: int, entry_ids: Sequence[int], vectors: np.ndarray) -> None:
+        # The database is the source of truth: a failed index update is logged, not raised.
+        index = self.get(client_id)
+        if index is None:
+            return
+        try:
+            index.add(entry_ids, vectors)
+        except Exception as e:
+            logger.error(f"HNSW index update failed for client {client_id}: {e}; rebuild it with build_vector_index.py")
+
+    def remove(self, client_id: int, entry_ids: Sequence[int]) -> None:
+        index = self.get(client_id)
+        if index is None:
+            return
+        try:
+            index.remove(entry_ids)
+        except Exception as e:
+            logger.error(f"HNSW index delete failed for client {client_id}: {e}; rebuild it with build_vector_index.py")
+
+
+vector_indexes = VectorIndexRegistry(
+    root=Path(settings.HNSW_INDEX_DIR),
+    m=settings.HNSW_M,
+    ef_construction=settings.HNSW_EF_CONSTRUCTION,
+)
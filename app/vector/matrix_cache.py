@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config.settings import settings
+from app.db.pool import db_pool
+from app.db.streaming import stream_rows
+from app.vector.embedder import EMBEDDING_DIM
+
+EMBEDDINGS_QUERY = """
+    SELECT entry_id, embedding
+    FROM knowledge_entries
+    WHERE client_id = %s AND embedding IS NOT NULL AND array_length(embedding, 1) = %s
+    ORDER BY entry_id
+"""
+
+# Shared per-client generation, bumped by every write to the client's entries (see migration 0009)
+GENERATION_QUERY = "SELECT COALESCE((SELECT generation FROM knowledge_cache_generations WHERE client_id = %s), 0)"
+
+
+def read_generation(cur, client_id: int) -> int:
+    cur.execute(GENERATION_QUERY, (client_id,))
+    return cur.fetchone()[0]
+
+
+class ClientMatrix:
+    """
+    All embeddings of one client: `ids[i]` is the entry whose unit vector is
+    row `i` of `matrix`, a C-contiguous float32 array of shape (n, dim).
+    It holds at least every write up to the client's `generation`.
+    """
+
+    __slots__ = ("ids", "matrix", "generation", "built_at")
+
+    def __init__(self, ids: np.ndarray, matrix: np.ndarray, generation: int = 0):
+        self.ids = ids
+        self.matrix = matrix
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.matrix.nbytes
+
+    def top_k(self, queries: np.ndarray, k: int, block_rows: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact cosine top-`k` for each row of `queries` (unit vectors, shape
+        (q, dim)). Returns `(ids, scores)`, both shaped (q, min(k, n)) and
+        sorted by descending score.
+
+        Scores are computed `block_rows` entries at a time (one matrix
+        multiplication per block), keeping only each block's best `k`, so
+        temporary memory is bounded by the block, not the tenant.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        n = len(self.ids)
+        k = min(k, n)
+        if k == 0:
+            empty = np.zeros((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        block_rows = block_rows or settings.EMBEDDING_SEARCH_BLOCK_ROWS
+
+        cand_rows: List[np.ndarray] = []
+        cand_scores: List[np.ndarray] = []
+        for start in range(0, n, block_rows):
+            scores = queries @ self.matrix[start:start + block_rows].T  # (q, block)
+            if scores.shape[1] > k:
+                best = np.argpartition(scores, -k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, best, axis=1)
+            else:
+                best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            cand_rows.append(best + start)
+            cand_scores.append(scores)
+
+        rows = np.hstack(cand_rows)
+        scores = np.hstack(cand_scores)
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        return self.ids[np.take_along_axis(rows, order, axis=1)], np.take_along_axis(scores, order, axis=1)
+
+
+def load_client_matrix(client_id: int) -> ClientMatrix:
+    """
+    Read a client's embeddings with a server-side cursor into a `ClientMatrix`.
+    Always from the primary, generation first: the rows read afterwards
+    include every write the generation stands for (and maybe newer ones).
+    """
+    conn = db_pool.getconn()
+    try:
+        generation = read_generation(conn.cursor(), client_id)
+        conn.rollback()
+    finally:
+        db_pool.putconn(conn)
+
+    id_batches: List[np.ndarray] = []
+    vector_batches: List[np.ndarray] = []
+    for _, rows in stream_rows(EMBEDDINGS_QUERY, (client_id, EMBEDDING_DIM), read_only=False):
+        id_batches.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+        vector_batches.append(np.asarray([row[1] for row in rows], dtype=np.float32))
+
+    if not id_batches:
+        return ClientMatrix(np.zeros(0, dtype=np.int64), np.zeros((0, EMBEDDING_DIM), dtype=np.float32), generation)
+
+    matrix = np.ascontiguousarray(np.vstack(vector_batches))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return ClientMatrix(np.concatenate(id_batches), matrix, generation)
+
+
+class EmbeddingMatrixCache:
+    """
+    Per-worker LRU of `ClientMatrix` by client id, built lazily on first
+    search.
+
+    Searches pass the client's current generation (the shared
+    `knowledge_cache_generations` counter, see migration 0009), and a matrix
+    built before that generation is rebuilt, so writes made through any
+    worker show up on the next search everywhere. A matrix newer than the
+    caller's generation (read on a lagging replica) is still used. Writes
+    through `KnowledgeService` also drop their client in this worker once
+    they have committed (`on_commit`), which frees the memory sooner; `ttl`
+    still caps the age of a matrix.
+    """
+
+    def __init__(self, max_clients: int = 32, ttl: float = 300.0):
+        self.max_clients = max_clients
+        self.ttl = ttl
+        self._matrices: "OrderedDict[int, ClientMatrix]" = OrderedDict()
+        self._build_locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "invalidations": 0}
+
+    def _fresh(self, client_id: int, generation: int) -> Optional[ClientMatrix]:
+        matrix = self._matrices.get(client_id)
+        if matrix is None:
+            return None
+        if matrix.generation < generation:
+            self._stats["stale"] += 1
+        elif time.monotonic() - matrix.built_at < self.ttl:
+            self._matrices.move_to_end(client_id)
+            return matrix
+        del self._matrices[client_id]
+        return None
+
+    def get(self, client_id: int, generation: int) -> ClientMatrix:
+        """Matrix of the client holding at least every write up to `generation`."""
+        with self._lock:
+            matrix = self._fresh(client_id, generation)
+            if matrix is not None:
+                self._stats["hits"] += 1
+                return matrix
+            build_lock = self._build_locks.setdefault(client_id, threading.Lock())
+
+        # One build per client at a time; concurrent searches wait for it.
+        with build_lock:
+            with self._lock:
+                matrix = self._fresh(client_id, generation)
+                if matrix is not None:
+                    self._stats["hits"] += 1
+                    return matrix
+                self._stats["misses"] += 1
+
+            matrix = load_client_matrix(client_id)
+
+            with self._lock:
+                # A concurrent invalidation does not matter: the next search sees the newer generation
+                current = self._matrices.get(client_id)
+                if current is None or current.generation <= matrix.generation:
+                    self._matrices[client_id] = matrix
+                    self._matrices.move_to_end(client_id)
+                    while len(self._matrices) > self.max_clients:
+                        self._matrices.popitem(last=False)
+                        self._stats["evictions"] += 1
+            return matrix
+
+    def invalidate(self, client_id: int) -> None:
+        with self._lock:
+            if self._matrices.pop(client_id, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "clients": len(self._matrices),
+                "bytes": sum(m.nbytes for m in self._matrices.values()),
+            }
+
+
+embedding_cache = EmbeddingMatrixCache(
+    max_clients=settings.EMBEDDING_CACHE_MAX_CLIENTS,
+    ttl=settings.EMBEDDING_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,53 @@
+"""
+Embed knowledge entries that have no embedding, or one from an older
+EMBEDDING_VERSION (see app/vector/backfill.py).
+
+Entries are claimed in batches with FOR UPDATE SKIP LOCKED, embedded across
+a pool of processes and written back one UPDATE per batch. Progress is
+stored in the rows, so the run can be stopped and restarted at any time and
+several copies (on one or more hosts) can run at once. Throughput is
+reported in rows/s.
+
+Usage:
+    python backfill_embeddings.py
+    python backfill_embeddings.py --client-id 42 --max-rows-per-second 2000
+    python backfill_embeddings.py --follow --processes 4   # keep embedding new entries
+"""
+
+import argparse
+
+from app.config.settings import settings
+from app.vector.backfill import EmbeddingBackfill
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client-id", type=int, action="append", default=[], help="only this client (repeatable)")
+    parser.add_argument("--batch-rows", type=int, default=settings.EMBEDDING_BACKFILL_BATCH_ROWS)
+    parser.add_argument("--processes", type=int, default=settings.EMBEDDING_BACKFILL_PROCESSES, help="0 = one per CPU")
+    parser.add_argument(
+        "--max-rows-per-second", type=float, default=settings.EMBEDDING_BACKFILL_MAX_ROWS_PER_SECOND,
+        help="rate limit; 0 = unlimited",
+    )
+    parser.add_argument("--limit", type=int, help="stop after this many entries")
+    parser.add_argument("--follow", action="store_true", help="keep polling for new entries instead of exiting")
+    parser.add_argument("--report-every", type=float, default=10.0, metavar="SECONDS")
+    args = parser.parse_args()
+
+    backfill = EmbeddingBackfill(args.batch_rows, args.processes, args.max_rows_per_second, args.client_id)
+    try:
+        print(f"{backfill.pending():,} entries to embed, {backfill.batch_rows:,} per batch, {backfill.processes} processes")
+        stats = backfill.run(limit=args.limit, follow=args.follow, report_every=args.report_every)
+    except KeyboardInterrupt:
+        print("Interrupted; committed batches are kept, rerun to resume")
+        return
+    finally:
+        backfill.close()
+    print(
+        f"Embedded {stats.rows:,} entries in {stats.batches:,} batches, {stats.seconds:.1f}s "
+        f"({stats.rows_per_second:,.0f} rows/s); {backfill.pending():,} pending"
+    )
+
+
+if __name__ == "__main__":
+    main()
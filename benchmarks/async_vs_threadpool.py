@@ -0,0 +1,119 @@
+"""
+Compare the threadpool (psycopg2 pool) and native async (asyncpg engine)
+read paths under concurrent load.
+
+The sync path is driven through a thread pool capped at 40 workers, which is
+Starlette's default threadpool size for sync `def` routes. The async path is
+driven by plain asyncio tasks, like `async def` routes on the event loop.
+
+Usage:
+    python -m benchmarks.async_vs_threadpool --client-id 1 --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.db.pool import db_pool
+from app.db.result_cache import search_cache
+from app.db.session import engine
+from app.dto.core import KnowledgeSearchRequest
+from app.service.client_service import ClientService
+from app.service.knowledge_service import KnowledgeService
+from app.service.stakeholder_service import StakeholderService
+
+STARLETTE_THREADPOOL_SIZE = 40
+SUPER_ADMIN = {"user_id": 0, "role": "super_admin", "client_access": []}
+
+
+def _operations(client_id: int):
+    filters = KnowledgeSearchRequest(clientId=client_id, limit=20, offset=0)
+    sync_ops = {
+        "knowledge.search": lambda: KnowledgeService.search_entries(filters, SUPER_ADMIN),
+        "stakeholders.list": lambda: StakeholderService.get_stakeholders(client_id=client_id),
+        "organisations.list": lambda: ClientService.list_organisations(1, 20, "", "", ""),
+        "organisations.dropdown": lambda: ClientService.get_dropdown(),
+    }
+    async_ops = {
+        "knowledge.search": lambda: KnowledgeService.search_entries_async(filters, SUPER_ADMIN),
+        "stakeholders.list": lambda: StakeholderService.get_stakeholders_async(client_id=client_id),
+        "organisations.list": lambda: ClientService.list_organisations_async(1, 20, "", "", ""),
+        "organisations.dropdown": lambda: ClientService.get_dropdown_async(),
+    }
+    return sync_ops, async_ops
+
+
+def _report(label: str, latencies, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(
+        f"{label:<34} {len(latencies) / elapsed:>9.1f} req/s"
+        f"   p50 {p(0.50):>7.2f} ms   p95 {p(0.95):>7.2f} ms   p99 {p(0.99):>7.2f} ms"
+        f"   mean {statistics.mean(latencies) * 1000:>7.2f} ms"
+    )
+
+
+def run_threadpool(op, total: int):
+    latencies = []
+
+    def timed(queued_at: float):
+        op()
+        # Latency includes time queued for a worker thread, as it would in Starlette.
+        latencies.append(time.perf_counter() - queued_at)
+
+    with ThreadPoolExecutor(max_workers=STARLETTE_THREADPOOL_SIZE) as pool:
+        started = time.perf_counter()
+        futures = [pool.submit(timed, time.perf_counter()) for _ in range(total)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+async def run_async(op, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        queued_at = time.perf_counter()
+        async with semaphore:
+            await op()
+        latencies.append(time.perf_counter() - queued_at)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(total)))
+    return latencies, time.perf_counter() - started
+
+
+async def main(client_id: int, total: int, concurrency: int) -> None:
+    sync_ops, async_ops = _operations(client_id)
+    db_pool.open()
+    try:
+        for name in sync_ops:
+            # Warm both pools so connection setup is not measured.
+            sync_ops[name]()
+            await async_ops[name]()
+
+            latencies, elapsed = run_threadpool(sync_ops[name], total)
+            _report(f"{name} [threadpool]", latencies, elapsed)
+            latencies, elapsed = await run_async(async_ops[name], total, concurrency)
+            _report(f"{name} [async]", latencies, elapsed)
+            print()
+        print(f"psycopg2 pool: {db_pool.stats()}")
+        print(f"asyncpg pool:  {engine.pool.status()}")
+    finally:
+        db_pool.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    # Measure the queries, not the search result cache
+    search_cache.enabled = False
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.client_id, args.requests, args.concurrency))
@@ -0,0 +1,111 @@
+"""
+Latency of knowledge search with `mode=substring` (ILIKE, sequential scan
+of the tenant) vs `mode=fulltext` (GIN on search_vector, ranked with
+ts_rank_cd), through `KnowledgeService.search_entries` (count + page).
+
+`--seed N` first bulk-loads a new synthetic tenant of N entries with COPY,
+e.g. the 1M-row case:
+
+    python -m benchmarks.fulltext_search --seed 1000000
+    python -m benchmarks.fulltext_search --client-id 42 --repeat 20 --explain
+
+Requires migration 0003 (`alembic upgrade head`).
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.db.bulk import copy_knowledge_entries
+from app.db.pool import db_pool
+from app.db.result_cache import search_cache
+from app.dto.core import KnowledgeSearchRequest
+from app.service.knowledge_service import KnowledgeService
+
+SUPER_ADMIN = {"user_id": 0, "role": "super_admin", "client_access": []}
+
+WORDS = (
+    "budget timeline risk migration vendor contract renewal forecast audit hiring "
+    "roadmap onboarding churn pricing security compliance analytics integration "
+    "workshop proposal escalation invoice stakeholder retention launch pilot"
+).split()
+ENTRY_TYPES = ["meeting", "email", "document", "note"]
+DAAEG_PHASES = ["discover", "assess", "analyze", "execute", "grow"]
+
+QUERIES = ["budget", "vendor contract", "security audit", "churn -pricing", '"pilot launch"']
+
+
+def seed_tenant(rows: int) -> int:
+    rng = random.Random(7)
+
+    def entries(client_id: int):
+        for i in range(rows):
+            words = rng.choices(WORDS, k=40)
+            yield (
+                client_id, " ".join(words).capitalize() + f". Ref {i}.",
+                ENTRY_TYPES[i % 4], "benchmark", DAAEG_PHASES[i % 5],
+                rng.sample(WORDS, 3), [], {"benchmark": True}, None, None, None,
+            )
+
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO clients (name, industry, is_active) VALUES (%s, %s, true) RETURNING client_id",
+            (f"Search benchmark {int(time.time())}", "Benchmark"),
+        )
+        client_id = cur.fetchone()[0]
+        started = time.perf_counter()
+        copy_knowledge_entries(cur, entries(client_id))
+        conn.commit()
+        print(f"Seeded client {client_id} with {rows:,} entries in {time.perf_counter() - started:.1f}s")
+        cur.execute("ANALYZE knowledge_entries")
+        conn.commit()
+        return client_id
+    finally:
+        db_pool.putconn(conn)
+
+
+def explain(filters: KnowledgeSearchRequest) -> None:
+    query, params = KnowledgeService._build_search_query(filters)
+    query, params = KnowledgeService._build_page_query(filters, query, params)
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+        for (line,) in cur.fetchall():
+            print(f"      {line}")
+    finally:
+        db_pool.putconn(conn)
+
+
+def main(client_id: int, repeat: int, show_plans: bool) -> None:
+    print(f"{'query':<20} {'mode':<10} {'total':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for text in QUERIES:
+        for mode in ("substring", "fulltext"):
+            filters = KnowledgeSearchRequest(clientId=client_id, query=text, mode=mode, limit=20, offset=0)
+            result = KnowledgeService.search_entries(filters, SUPER_ADMIN)  # warm up
+            latencies = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                KnowledgeService.search_entries(filters, SUPER_ADMIN)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            print(f"{text:<20} {mode:<10} {result['total']:>9,} {statistics.median(latencies):>9.2f} {p95:>9.2f}")
+            if show_plans:
+                explain(filters)
+
+
+if __name__ == "__main__":
+    # Measure the queries, not the search result cache
+    search_cache.enabled = False
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--client-id", type=int, help="existing tenant to search")
+    target.add_argument("--seed", type=int, metavar="ROWS", help="bulk-load a new synthetic tenant first")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--explain", action="store_true", help="print EXPLAIN ANALYZE for each page query")
+    args = parser.parse_args()
+    main(args.client_id or seed_tenant(args.seed), args.repeat, args.explain)
@@ -0,0 +1,77 @@
+"""
+Recall@k and queries/sec of the HNSW index vs exact (brute-force matrix)
+cosine search, across `ef` values.
+
+By default runs on synthetic clustered unit vectors, so no database is
+needed; `--client-id` uses that client's stored embeddings instead (queries
+are then perturbed copies of stored vectors). The index is built in a
+temporary directory.
+
+Usage:
+    python -m benchmarks.hnsw_vs_exact --rows 50000 --queries 500 --k 10
+    python -m benchmarks.hnsw_vs_exact --client-id 42 --m 32 --ef 32 64 128 256
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.vector.embedder import EMBEDDING_DIM
+from app.vector.hnsw import HNSWIndex
+from app.vector.matrix_cache import ClientMatrix, load_client_matrix
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def synthetic(rows: int, clusters: int = 100, seed: int = 0) -> ClientMatrix:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, EMBEDDING_DIM))
+    vectors = centres[rng.integers(0, clusters, rows)] + 0.6 * rng.normal(size=(rows, EMBEDDING_DIM))
+    return ClientMatrix(np.arange(rows, dtype=np.int64), np.ascontiguousarray(_unit(vectors)))
+
+
+def _qps(search, queries: np.ndarray):
+    started = time.perf_counter()
+    ids = np.vstack([search(q)[0] for q in queries])
+    return ids, len(queries) / (time.perf_counter() - started)
+
+
+def main(exact: ClientMatrix, n_queries: int, k: int, m: int, ef_construction: int, efs) -> None:
+    rng = np.random.default_rng(1)
+    picks = exact.matrix[rng.integers(0, len(exact), n_queries)]
+    queries = _unit(picks + 0.1 * rng.normal(size=picks.shape))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = HNSWIndex.create(Path(tmp) / "index", EMBEDDING_DIM, m, ef_construction, capacity=len(exact))
+        started = time.perf_counter()
+        index.add(exact.ids, exact.matrix)
+        build = time.perf_counter() - started
+        print(f"{len(exact):,} vectors, M={m}, ef_construction={ef_construction}: "
+              f"built in {build:.1f}s ({len(exact) / build:,.0f} inserts/s)\n")
+
+        truth, exact_qps = _qps(lambda q: exact.top_k(q, k), queries)
+        print(f"{'method':<16} {'recall@' + str(k):>10} {'QPS':>10} {'speedup':>9}")
+        print(f"{'exact':<16} {1.0:>10.3f} {exact_qps:>10,.0f} {1.0:>8.1f}x")
+        for ef in efs:
+            found, qps = _qps(lambda q: index.top_k(q, k, ef=ef), queries)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found.tolist(), truth.tolist())])
+            print(f"{'hnsw ef=' + str(ef):<16} {recall:>10.3f} {qps:>10,.0f} {qps / exact_qps:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="synthetic vectors")
+    parser.add_argument("--client-id", type=int, help="use this client's embeddings instead")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+    data = load_client_matrix(args.client_id) if args.client_id else synthetic(args.rows)
+    main(data, args.queries, args.k, args.m, args.ef_construction, args.ef)
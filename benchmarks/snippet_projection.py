@@ -0,0 +1,102 @@
+"""
+Response size and latency of knowledge search pages with
+`projection=full` (every hit's whole content) vs `projection=snippet`
+(bounded excerpt / ts_headline plus contentLength), through
+`KnowledgeService.search_entries`. The size is that of the JSON body the
+endpoint sends.
+
+`--seed N` first bulk-loads a new synthetic tenant of N transcript-sized
+entries (`--words` words each, ~7 bytes per word):
+
+    python -m benchmarks.snippet_projection --seed 5000 --words 8000
+    python -m benchmarks.snippet_projection --client-id 42 --repeat 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.db.bulk import copy_knowledge_entries
+from app.db.pool import db_pool
+from app.db.result_cache import search_cache
+from app.dto.api_response import APIResponse
+from app.dto.core import KnowledgeSearchRequest
+from app.service.knowledge_service import KnowledgeService
+from benchmarks.fulltext_search import DAAEG_PHASES, WORDS
+
+SUPER_ADMIN = {"user_id": 0, "role": "super_admin", "client_access": []}
+
+# (query, mode): a plain listing, a substring and a full-text search
+SEARCHES = [(None, "substring"), ("budget", "substring"), ("vendor contract", "fulltext")]
+
+
+def seed_tenant(rows: int, words: int) -> int:
+    rng = random.Random(11)
+
+    def entries(client_id: int):
+        for i in range(rows):
+            speakers = [f"Speaker {n}:" for n in range(1, 5)]
+            lines = (
+                rng.choice(speakers) + " " + " ".join(rng.choices(WORDS, k=40)) + "."
+                for _ in range(max(1, words // 40))
+            )
+            yield (
+                client_id, "\n".join(lines), "meeting", "transcript", DAAEG_PHASES[i % 5],
+                rng.sample(WORDS, 3), [], {"benchmark": True}, None, None, None,
+            )
+
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO clients (name, industry, is_active) VALUES (%s, %s, true) RETURNING client_id",
+            (f"Transcript benchmark {int(time.time())}", "Benchmark"),
+        )
+        client_id = cur.fetchone()[0]
+        started = time.perf_counter()
+        copy_knowledge_entries(cur, entries(client_id))
+        conn.commit()
+        print(f"Seeded client {client_id} with {rows:,} entries of ~{words:,} words in {time.perf_counter() - started:.1f}s")
+        cur.execute("ANALYZE knowledge_entries")
+        conn.commit()
+        return client_id
+    finally:
+        db_pool.putconn(conn)
+
+
+def body_size(result) -> int:
+    return len(APIResponse[dict](status="success", success=True, data=result).model_dump_json(by_alias=True))
+
+
+def main(client_id: int, repeat: int, limit: int) -> None:
+    print(f"{'query':<18} {'projection':<11} {'body KB':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for text, mode in SEARCHES:
+        for projection in ("full", "snippet"):
+            filters = KnowledgeSearchRequest(
+                clientId=client_id, query=text, mode=mode, projection=projection, limit=limit, count="none"
+            )
+            result = KnowledgeService.search_entries(filters, SUPER_ADMIN)  # warm up
+            latencies = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                body = body_size(KnowledgeService.search_entries(filters, SUPER_ADMIN))
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            label = f"{text or '(none)'} [{mode[:4]}]"
+            print(f"{label:<18} {projection:<11} {body / 1024:>10,.1f} {statistics.median(latencies):>9.2f} {p95:>9.2f}")
+
+
+if __name__ == "__main__":
+    # Measure the queries, not the search result cache
+    search_cache.enabled = False
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--client-id", type=int, help="existing tenant to search")
+    target.add_argument("--seed", type=int, metavar="ROWS", help="bulk-load a new synthetic transcript tenant first")
+    parser.add_argument("--words", type=int, default=8000, help="words per seeded entry")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    args = parser.parse_args()
+    main(args.client_id or seed_tenant(args.seed, args.words), args.repeat, args.limit)
@@ -0,0 +1,87 @@
+"""
+Build (or drop) the per-client HNSW indexes used by semantic search.
+
+Clients with an index are searched approximately through it and kept up to
+date incrementally by KnowledgeService; all other clients are searched
+exactly. Build indexes for large tenants, and rebuild one after heavy
+deletes (deleted entries stay in the graph as tombstones) or after changing
+HNSW_M / HNSW_EF_CONSTRUCTION. A rebuild is swapped in atomically; running
+workers pick it up on their next search.
+
+Building runs in this process (pure Python/NumPy), at roughly a few
+hundred to a thousand entries per second depending on HNSW_EF_CONSTRUCTION.
+
+Usage:
+    python build_vector_index.py --client-id 42 [--client-id 43 ...]
+    python build_vector_index.py --min-entries 100000
+    python build_vector_index.py --drop --client-id 42
+"""
+
+import argparse
+import shutil
+import time
+
+from app.db.pool import db_pool
+from app.vector.backends import PgvectorBackend, vector_store
+from app.vector.hnsw import vector_indexes
+from app.vector.matrix_cache import load_client_matrix
+
+LARGE_CLIENTS_QUERY = """
+    SELECT client_id, COUNT(*)
+    FROM knowledge_entries
+    WHERE embedding IS NOT NULL
+    GROUP BY client_id
+    HAVING COUNT(*) >= %s
+    ORDER BY client_id
+"""
+
+
+def large_clients(min_entries: int):
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(LARGE_CLIENTS_QUERY, (min_entries,))
+        return [client_id for client_id, _ in cur.fetchall()]
+    finally:
+        db_pool.putconn(conn)
+
+
+def build(client_id: int) -> None:
+    started = time.perf_counter()
+    matrix = load_client_matrix(client_id)
+    loaded = time.perf_counter()
+    index = vector_indexes.build(client_id, matrix.ids, matrix.matrix)
+    elapsed = time.perf_counter() - loaded
+    print(
+        f"client {client_id}: {len(index):,} entries, loaded in {loaded - started:.1f}s, "
+        f"indexed in {elapsed:.1f}s ({len(index) / max(elapsed, 1e-9):,.0f} entries/s) "
+        f"-> {vector_indexes.path(client_id)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client-id", type=int, action="append", default=[], help="client to index (repeatable)")
+    parser.add_argument("--min-entries", type=int, help="index every client with at least this many embeddings")
+    parser.add_argument("--drop", action="store_true", help="remove the index of the given clients instead")
+    args = parser.parse_args()
+
+    if isinstance(vector_store.detect(), PgvectorBackend):
+        parser.exit(1, "knowledge_entries.embedding is a pgvector column; its index lives in Postgres (migration 0005)\n")
+
+    client_ids = list(args.client_id)
+    if args.min_entries is not None:
+        client_ids += [c for c in large_clients(args.min_entries) if c not in client_ids]
+    if not client_ids:
+        parser.error("give --client-id or --min-entries")
+
+    for client_id in client_ids:
+        if args.drop:
+            shutil.rmtree(vector_indexes.path(client_id), ignore_errors=True)
+            print(f"client {client_id}: index dropped")
+        else:
+            build(client_id)
+
+
+if __name__ == "__main__":
+    main()
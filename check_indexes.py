@@ -0,0 +1,140 @@
+"""
+Report missing, invalid, unused and redundant indexes.
+
+- missing:   indexes created by migrations that do not exist
+- invalid:   indexes left INVALID by a failed CREATE INDEX CONCURRENTLY
+- unused:    indexes scanned at most --max-scans times according to
+             pg_stat_user_indexes (primary keys and unique indexes are skipped,
+             they enforce constraints)
+- redundant: plain indexes whose columns are a leading prefix of another
+             index on the same table
+
+Usage counters are per server and reset with pg_stat_reset(); check
+`stats_reset` before dropping anything. Exits with status 1 when indexes are
+missing or invalid, so it can gate deploys.
+
+Usage:
+    python check_indexes.py [--max-scans 0]
+"""
+
+import argparse
+import sys
+
+import psycopg2
+
+from app.config.settings import settings
+
+# Indexes created by the index migrations in migrations/versions/
+EXPECTED_INDEXES = {
+    "idx_knowledge_entries_tags": "knowledge_entries",
+    "idx_knowledge_entries_stakeholder_ids": "knowledge_entries",
+    "idx_knowledge_entries_client_created_id": "knowledge_entries",
+    "idx_user_sessions_token_hash": "user_sessions",
+    "idx_clients_name_lower": "clients",
+    "idx_users_live_created_at": "users",
+    "idx_clients_live_name": "clients",
+    "idx_knowledge_entries_search_vector": "knowledge_entries",
+    "idx_knowledge_entries_content_trgm": "knowledge_entries",
+    "idx_knowledge_entries_embedding_pending": "knowledge_entries",
+}
+
+EXISTING_QUERY = """
+    SELECT c.relname, i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+"""
+
+UNUSED_QUERY = """
+    SELECT s.relname, s.indexrelname, s.idx_scan,
+           pg_size_pretty(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = current_schema()
+      AND NOT i.indisunique
+      AND NOT i.indisprimary
+      AND s.idx_scan <= %s
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+
+# Plain (non-partial, non-expression, non-unique) indexes whose key columns
+# are a leading prefix of another index with the same access method.
+REDUNDANT_QUERY = """
+    SELECT t.relname, a.relname, b.relname
+    FROM pg_index ia
+    JOIN pg_index ib ON ib.indrelid = ia.indrelid AND ib.indexrelid != ia.indexrelid
+    JOIN pg_class a ON a.oid = ia.indexrelid
+    JOIN pg_class b ON b.oid = ib.indexrelid
+    JOIN pg_class t ON t.oid = ia.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = current_schema()
+      AND a.relam = b.relam
+      AND NOT ia.indisunique AND NOT ia.indisprimary
+      AND ia.indpred IS NULL AND ia.indexprs IS NULL
+      AND ib.indpred IS NULL
+      AND (ib.indkey::text || ' ') LIKE (ia.indkey::text || ' %')
+      AND ia.indkey::text != ib.indkey::text
+    ORDER BY t.relname, a.relname
+"""
+
+STATS_RESET_QUERY = """
+    SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()
+"""
+
+
+def check_indexes(max_scans: int = 0) -> bool:
+    conn = psycopg2.connect(settings.DATABASE_URL)
+    try:
+        cur = conn.cursor()
+
+        cur.execute(EXISTING_QUERY)
+        existing = dict(cur.fetchall())
+        missing = [name for name in EXPECTED_INDEXES if name not in existing]
+        invalid = sorted(name for name, valid in existing.items() if not valid)
+
+        cur.execute(UNUSED_QUERY, (max_scans,))
+        unused = cur.fetchall()
+
+        cur.execute(REDUNDANT_QUERY)
+        redundant = cur.fetchall()
+
+        cur.execute(STATS_RESET_QUERY)
+        row = cur.fetchone()
+        stats_reset = row[0] if row else None
+        cur.close()
+    finally:
+        conn.close()
+
+    print("Missing indexes:")
+    for name in missing:
+        print(f"  - {name} on {EXPECTED_INDEXES[name]} (run `alembic upgrade head`)")
+    if not missing:
+        print("  none")
+
+    print("\nInvalid indexes (drop and rebuild):")
+    for name in invalid:
+        print(f"  - {name}")
+    if not invalid:
+        print("  none")
+
+    print(f"\nUnused indexes (idx_scan <= {max_scans}, statistics since {stats_reset or 'server start'}):")
+    for table, name, scans, size in unused:
+        print(f"  - {table}.{name}: {scans} scans, {size}")
+    if not unused:
+        print("  none")
+
+    print("\nRedundant indexes (prefix of another index):")
+    for table, name, covered_by in redundant:
+        print(f"  - {table}.{name} is covered by {covered_by}")
+    if not redundant:
+        print("  none")
+
+    return not missing and not invalid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-scans", type=int, default=0, help="report indexes scanned at most this many times")
+    args = parser.parse_args()
+    sys.exit(0 if check_indexes(args.max_scans) else 1)
@@ -1,29 +1,34 @@
 import psycopg2
-import os
+from alembic import command
+from alembic.config import Config
 from app.config.settings import settings
 
+BASELINE_REVISION = "0001_baseline"
+
 def init_db():
     try:
         # Connect to the database
         print("🔌 Connecting to database...")
         conn = psycopg2.connect(settings.DATABASE_URL)
         cur = conn.cursor()
-        
-        # Read schema file
-        print("📖 Reading schema.sql...")
-        with open("app/db/schema.sql", "r") as f:
-            schema_sql = f.read()
-            
-        # Execute schema
-        print("🚀 Executing schema...")
-        cur.execute(schema_sql)
-        
-        conn.commit()
-        print("✅ Database initialized successfully!")
-        
+        cur.execute("SELECT to_regclass('alembic_version') IS NOT NULL, to_regclass('users') IS NOT NULL")
+        has_alembic, has_schema = cur.fetchone()
         cur.close()
         conn.close()
-        
+
+        alembic_cfg = Config("alembic.ini")
+
+        # Databases created from schema.sql before migrations existed
+        if has_schema and not has_alembic:
+            print(f"📌 Existing schema found, stamping it as {BASELINE_REVISION}...")
+            command.stamp(alembic_cfg, BASELINE_REVISION)
+
+        # Apply migrations
+        print("🚀 Running migrations...")
+        command.upgrade(alembic_cfg, "head")
+
+        print("✅ Database initialized successfully!")
+
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
         exit(1)
@@ -4,11 +4,22 @@ import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="fastapi._compat.v1")
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic._internal._config")
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.dto.api_response import APIResponse
 
 
 from app.config.settings import settings
+from app.db.pool import db_pool
+from app.db.session import engine
+from app.db.routing import replica_router
+from app.db.instrumentation import QueryStatsMiddleware
+from app.db.timeouts import QueryTimeoutMiddleware
+from app.db.unit_of_work import UnitOfWorkMiddleware
+from app.vector.backends import vector_store
+from app.vector.backfill import run_backfill_task
 from app.exceptions import (
     HTTPException,
     RateLimitExceeded,
@@ -26,16 +37,42 @@ from app.routers import (
     stakeholders,
     templates,
     deliverables,
-    clients
+    clients,
+    health
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker process owns its own pool, opened after gunicorn forks.
+    db_pool.open()
+    replica_router.open()
+    vector_store.detect()
+    backfill = asyncio.create_task(run_backfill_task()) if settings.EMBEDDING_BACKFILL_IN_PROCESS else None
+    try:
+        yield
+    finally:
+        if backfill is not None:
+            backfill.cancel()
+        await replica_router.close()
+        db_pool.close()
+        await engine.dispose()
+
+
 # CREATE APP
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
+# One connection/transaction per request, shared by all service calls
+app.add_middleware(UnitOfWorkMiddleware)
+# Query count/time/rows per request as Server-Timing; wraps the commit above
+app.add_middleware(QueryStatsMiddleware)
+# Per-route statement timeouts; cancels queries when the client disconnects
+app.add_middleware(QueryTimeoutMiddleware)
+
 
 @app.get("/", response_model=APIResponse[dict])
 def root():
@@ -59,6 +96,7 @@ app.include_router(stakeholders.router)
 app.include_router(clients.router)
 app.include_router(templates.router)
 app.include_router(deliverables.router)
+app.include_router(health.router)
 
 
 
@@ -0,0 +1,54 @@
+"""Baseline schema from app/db/schema.sql
+
+Databases created before migrations were introduced already have this
+schema; `python init_db.py` stamps them at this revision instead of
+running it. Downgrading drops every table of the baseline, with its data;
+the uuid-ossp extension is left installed since other schemas may use it.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA_FILE = Path(__file__).resolve().parents[2] / "app" / "db" / "schema.sql"
+
+# Tables created by schema.sql, dependents first
+TABLES = (
+    "notifications",
+    "enrichment_queue",
+    "workflow_reviewers",
+    "deliverable_reviews",
+    "deliverable_workflows",
+    "template_versions",
+    "templates",
+    "knowledge_entries",
+    "stakeholders",
+    "audit_log",
+    "user_sessions",
+    "users",
+    "clients",
+)
+
+
+def upgrade() -> None:
+    # Run through the DBAPI cursor directly: the file holds several statements
+    # and a plpgsql body, which SQLAlchemy's text() would try to parse.
+    cur = op.get_bind().connection.cursor()
+    cur.execute(SCHEMA_FILE.read_text())
+    cur.close()
+
+
+def downgrade() -> None:
+    # CASCADE also removes the updated_at triggers and any foreign keys left pointing at these tables
+    for table in TABLES:
+        op.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS update_updated_at_column()")
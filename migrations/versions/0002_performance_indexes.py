@@ -0,0 +1,57 @@
+"""Performance index pack for hot query predicates
+
+- knowledge_entries: GIN on tags (`tags && ...`) and stakeholder_ids
+  (`stakeholder_ids @> ARRAY[...]`), and (client_id, created_at DESC) for the
+  search ORDER BY.
+- user_sessions(token_hash) for reset-token lookups.
+- lower(clients.name) for the duplicate-name check on update.
+- Partial indexes matching the `metadata->>'is_deleted'` filters used by
+  `list_users` and the organisation list on login.
+
+Indexes are built with CREATE INDEX CONCURRENTLY so writes are not blocked;
+each statement runs outside a transaction. If a build fails it leaves an
+INVALID index behind: drop it and re-run (`python check_indexes.py` lists
+invalid indexes).
+
+Revision ID: 0002_performance_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002_performance_indexes"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("idx_knowledge_entries_tags", "ON knowledge_entries USING GIN (tags)"),
+    ("idx_knowledge_entries_stakeholder_ids", "ON knowledge_entries USING GIN (stakeholder_ids)"),
+    ("idx_knowledge_entries_client_created", "ON knowledge_entries (client_id, created_at DESC)"),
+    ("idx_user_sessions_token_hash", "ON user_sessions (token_hash)"),
+    ("idx_clients_name_lower", "ON clients (lower(name))"),
+    (
+        "idx_users_live_created_at",
+        "ON users (created_at DESC) "
+        "WHERE COALESCE((metadata->>'is_deleted')::boolean, false) = false",
+    ),
+    (
+        "idx_clients_live_name",
+        "ON clients (name) "
+        "WHERE is_active = true AND (metadata->>'is_deleted' IS NULL OR metadata->>'is_deleted' != 'true')",
+    ),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
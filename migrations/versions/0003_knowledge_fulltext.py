@@ -0,0 +1,56 @@
+"""Full-text search column and index for knowledge entries
+
+Adds `knowledge_entries.search_vector`, a stored generated tsvector over
+content (weight A), tags (B) and source (C), and a GIN index on it for
+`mode=fulltext` searches.
+
+`array_to_string` is only STABLE, so tags go through the IMMUTABLE
+`knowledge_tags_text()` wrapper, as generated columns require.
+
+Adding a stored generated column rewrites the table under an ACCESS
+EXCLUSIVE lock: run this in a maintenance window on large databases. The
+index itself is built CONCURRENTLY.
+
+Revision ID: 0003_knowledge_fulltext
+Revises: 0002_performance_indexes
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003_knowledge_fulltext"
+down_revision: Union[str, Sequence[str], None] = "0002_performance_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match TEXT_SEARCH_CONFIG in app/service/knowledge_service.py
+TEXT_SEARCH_CONFIG = "english"
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION knowledge_tags_text(tags TEXT[]) RETURNS TEXT
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT array_to_string(tags, ' ') $$
+    """)
+    op.execute(f"""
+        ALTER TABLE knowledge_entries
+        ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(content, '')), 'A') ||
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(knowledge_tags_text(tags), '')), 'B') ||
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(source, '')), 'C')
+        ) STORED
+    """)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_knowledge_entries_search_vector "
+            "ON knowledge_entries USING GIN (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_knowledge_entries_search_vector")
+    op.execute("ALTER TABLE knowledge_entries DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP FUNCTION IF EXISTS knowledge_tags_text(TEXT[])")
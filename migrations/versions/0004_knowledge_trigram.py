@@ -0,0 +1,37 @@
+"""Trigram index on knowledge entry content
+
+Enables pg_trgm and adds a GIN trigram index on `knowledge_entries.content`.
+It serves the substring search (`content ILIKE '%...%'`, for patterns of at
+least three characters) and the `fuzzy=true` word-similarity search
+(`query <% content`).
+
+CREATE EXTENSION needs a role allowed to create it (pg_trgm is a trusted
+extension from PostgreSQL 13, so the database owner is enough).
+
+Revision ID: 0004_knowledge_trigram
+Revises: 0003_knowledge_fulltext
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004_knowledge_trigram"
+down_revision: Union[str, Sequence[str], None] = "0003_knowledge_fulltext"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_knowledge_entries_content_trgm "
+            "ON knowledge_entries USING GIN (content gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    # The extension is left installed; other objects may depend on it.
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_knowledge_entries_content_trgm")
@@ -0,0 +1,88 @@
+"""Move knowledge embeddings to pgvector when it is available
+
+If the `vector` extension can be installed, converts
+`knowledge_entries.embedding` from float8[] to vector(384) and builds a
+cosine-distance ANN index on it (HNSW by default, IVFFlat with
+PGVECTOR_INDEX=ivfflat). Embeddings that are not 384-dimensional become
+NULL. The application detects the column type at startup and searches in
+SQL; without pgvector this revision is a no-op and the float8[] path stays
+in use. With PGVECTOR_ENABLED off the revision is a no-op as well.
+
+Changing the column type rewrites the table under an ACCESS EXCLUSIVE
+lock. Build IVFFlat indexes after the table holds representative data
+(its lists are trained on the rows present at build time).
+
+Revision ID: 0005_pgvector_embeddings
+Revises: 0004_knowledge_trigram
+Create Date: 2026-10-17
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from app.config.settings import settings
+
+revision: str = "0005_pgvector_embeddings"
+down_revision: Union[str, Sequence[str], None] = "0004_knowledge_trigram"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Alembic's own migration logger, configured in alembic.ini
+log = logging.getLogger("alembic.runtime.migration")
+
+INDEX_NAME = "idx_knowledge_entries_embedding"
+
+EMBEDDING_TYPE = text("""
+    SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+    WHERE attrelid = 'knowledge_entries'::regclass AND attname = 'embedding'
+""")
+
+
+def _index_definition() -> str:
+    if settings.PGVECTOR_INDEX == "ivfflat":
+        return f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {settings.PGVECTOR_IVFFLAT_LISTS})"
+    return (
+        f"USING hnsw (embedding vector_cosine_ops) "
+        f"WITH (m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION})"
+    )
+
+
+def upgrade() -> None:
+    if not settings.PGVECTOR_ENABLED:
+        log.info("PGVECTOR_ENABLED is off; keeping embedding as float8[]")
+        return
+
+    bind = op.get_bind()
+    available = bind.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'")).scalar()
+    if not available:
+        log.info("pgvector is not available on this server; keeping embedding as float8[]")
+        return
+
+    try:
+        with bind.begin_nested():
+            bind.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    except Exception as e:
+        log.warning(f"Could not create the vector extension ({e}); keeping embedding as float8[]")
+        return
+
+    if bind.execute(EMBEDDING_TYPE).scalar() != "vector(384)":
+        op.execute("""
+            ALTER TABLE knowledge_entries
+            ALTER COLUMN embedding TYPE vector(384)
+            USING CASE WHEN array_length(embedding, 1) = 384 THEN embedding::vector(384) END
+        """)
+
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON knowledge_entries {_index_definition()}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+    if op.get_bind().execute(EMBEDDING_TYPE).scalar() == "vector(384)":
+        op.execute("""
+            ALTER TABLE knowledge_entries
+            ALTER COLUMN embedding TYPE float8[] USING embedding::real[]::float8[]
+        """)
@@ -0,0 +1,39 @@
+"""Keyset index for chronological knowledge search
+
+Adds (client_id, created_at DESC, entry_id DESC) on knowledge_entries, which
+serves both the `ORDER BY created_at DESC, entry_id DESC` of the search and
+its cursor predicate `(created_at, entry_id) < (...)`, so every page is an
+index range scan however deep it is. It supersedes
+idx_knowledge_entries_client_created (a leading prefix of it), which is
+dropped once the new index is built.
+
+Revision ID: 0006_knowledge_keyset_index
+Revises: 0005_pgvector_embeddings
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0006_knowledge_keyset_index"
+down_revision: Union[str, Sequence[str], None] = "0005_pgvector_embeddings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_knowledge_entries_client_created_id "
+            "ON knowledge_entries (client_id, created_at DESC, entry_id DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_knowledge_entries_client_created")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_knowledge_entries_client_created "
+            "ON knowledge_entries (client_id, created_at DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_knowledge_entries_client_created_id")
@@ -0,0 +1,124 @@
+"""Per-client facet counters for knowledge entries
+
+Adds `knowledge_facet_values()`, which lists the facet values of one entry:
+`total`, its entry_type, daaeg_phase, distinct tags and stakeholders. Both the
+`GET /knowledge/facets` query and the counters use it, so the two paths count
+the same way.
+
+`knowledge_facet_counts` holds the number of entries per (client, facet,
+value). It is maintained by statement-level triggers that use transition
+tables, so a COPY or a multi-row statement applies one aggregated upsert per
+statement rather than one per row. Updates net old against new values, so
+updates that do not touch faceted columns change nothing (migration 0010
+narrows the UPDATE trigger so they do not fire it at all). Rows are upserted in
+key order to avoid deadlocks between concurrent writers. Writers of one client
+still serialize briefly on its `total` row until they commit.
+
+The counters are backfilled in the same transaction as the trigger creation.
+CREATE TRIGGER blocks writes to knowledge_entries until the commit, so no
+write is missed or counted twice.
+
+Revision ID: 0007_knowledge_facet_counts
+Revises: 0006_knowledge_keyset_index
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0007_knowledge_facet_counts"
+down_revision: Union[str, Sequence[str], None] = "0006_knowledge_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Facet deltas of a transition table (`rows`), `sign` per entry
+DELTAS = """
+    SELECT e.client_id, f.facet, f.value, {sign} AS delta
+    FROM {rows} e, LATERAL knowledge_facet_values(e.entry_type, e.daaeg_phase, e.tags, e.stakeholder_ids) f
+"""
+
+UPSERT = """
+    INSERT INTO knowledge_facet_counts AS c (client_id, facet, value, entries)
+    SELECT client_id, facet, value, sum(delta)
+    FROM ({deltas}) d
+    GROUP BY client_id, facet, value
+    HAVING sum(delta) <> 0
+    ORDER BY client_id, facet, value
+    ON CONFLICT (client_id, facet, value) DO UPDATE SET entries = c.entries + EXCLUDED.entries
+"""
+
+CLEANUP = """
+    DELETE FROM knowledge_facet_counts
+    WHERE entries <= 0 AND client_id IN (SELECT DISTINCT client_id FROM old_rows)
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION knowledge_facet_values(
+            entry_type TEXT, daaeg_phase TEXT, tags TEXT[], stakeholder_ids INTEGER[]
+        ) RETURNS TABLE (facet TEXT, value TEXT)
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT 'total', ''
+            UNION ALL SELECT 'entry_type', entry_type WHERE entry_type IS NOT NULL
+            UNION ALL SELECT 'daaeg_phase', daaeg_phase WHERE daaeg_phase IS NOT NULL
+            UNION ALL SELECT DISTINCT 'tag', tag FROM unnest(tags) AS tag WHERE tag IS NOT NULL
+            UNION ALL SELECT DISTINCT 'stakeholder', s::text FROM unnest(stakeholder_ids) AS s WHERE s IS NOT NULL
+        $$
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS knowledge_facet_counts (
+            client_id INTEGER NOT NULL,
+            facet TEXT NOT NULL,
+            value TEXT NOT NULL,
+            entries BIGINT NOT NULL,
+            PRIMARY KEY (client_id, facet, value)
+        )
+    """)
+    inserted = UPSERT.format(deltas=DELTAS.format(sign=1, rows="new_rows"))
+    deleted = UPSERT.format(deltas=DELTAS.format(sign=-1, rows="old_rows"))
+    updated = UPSERT.format(
+        deltas=DELTAS.format(sign=1, rows="new_rows") + " UNION ALL " + DELTAS.format(sign=-1, rows="old_rows")
+    )
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION knowledge_facet_counts_apply() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {inserted};
+            ELSIF TG_OP = 'DELETE' THEN
+                {deleted};
+                {CLEANUP};
+            ELSE
+                {updated};
+                {CLEANUP};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for event, referencing in (
+        ("INSERT", "NEW TABLE AS new_rows"),
+        ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+        ("DELETE", "OLD TABLE AS old_rows"),
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS knowledge_facet_counts_{event.lower()} ON knowledge_entries")
+        op.execute(f"""
+            CREATE TRIGGER knowledge_facet_counts_{event.lower()}
+            AFTER {event} ON knowledge_entries
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION knowledge_facet_counts_apply()
+        """)
+
+    op.execute("TRUNCATE knowledge_facet_counts")
+    op.execute(UPSERT.format(deltas=DELTAS.format(sign=1, rows="knowledge_entries")))
+
+
+def downgrade() -> None:
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS knowledge_facet_counts_{event} ON knowledge_entries")
+    op.execute("DROP FUNCTION IF EXISTS knowledge_facet_counts_apply()")
+    op.execute("DROP TABLE IF EXISTS knowledge_facet_counts")
+    op.execute("DROP FUNCTION IF EXISTS knowledge_facet_values(TEXT, TEXT, TEXT[], INTEGER[])")
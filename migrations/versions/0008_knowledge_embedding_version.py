@@ -0,0 +1,63 @@
+"""Track which embedder produced each knowledge embedding
+
+Adds knowledge_entries.embedding_version (EMBEDDING_VERSION in
+app/vector/embedder.py, NULL while the entry has no embedding) and an index
+on (COALESCE(embedding_version, 0), entry_id). The embedding backfill
+(app/vector/backfill.py) claims rows with `COALESCE(embedding_version, 0) <
+EMBEDDING_VERSION` in that index order, so finding work is a range scan
+that is empty once the table is caught up.
+
+Existing embeddings were all written by version 1 of the embedder and are
+marked as such.
+
+The updated_at trigger of knowledge_entries is narrowed to the entry's own
+columns, so writing embeddings back does not change `updatedAt`.
+
+Revision ID: 0008_knowledge_embedding_version
+Revises: 0007_knowledge_facet_counts
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0008_knowledge_embedding_version"
+down_revision: Union[str, Sequence[str], None] = "0007_knowledge_facet_counts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "idx_knowledge_entries_embedding_pending"
+
+# Columns whose changes bump updated_at (everything but embedding / embedding_version)
+ENTRY_COLUMNS = "client_id, content, entry_type, source, metadata, tags, daaeg_phase, stakeholder_ids, created_by"
+
+
+def _updated_at_trigger(columns: str = "") -> None:
+    op.execute("DROP TRIGGER IF EXISTS update_knowledge_entries_updated_at ON knowledge_entries")
+    op.execute(f"""
+        CREATE TRIGGER update_knowledge_entries_updated_at
+        BEFORE UPDATE {f"OF {columns} " if columns else ""}ON knowledge_entries
+        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()
+    """)
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE knowledge_entries ADD COLUMN IF NOT EXISTS embedding_version smallint")
+    _updated_at_trigger(ENTRY_COLUMNS)
+    # Facets do not depend on the embedding; skip 0007's counter diff for this table-wide update
+    op.execute("ALTER TABLE knowledge_entries DISABLE TRIGGER knowledge_facet_counts_update")
+    op.execute("UPDATE knowledge_entries SET embedding_version = 1 WHERE embedding IS NOT NULL AND embedding_version IS NULL")
+    op.execute("ALTER TABLE knowledge_entries ENABLE TRIGGER knowledge_facet_counts_update")
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+            "ON knowledge_entries ((COALESCE(embedding_version, 0)), entry_id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+    _updated_at_trigger()
+    op.execute("ALTER TABLE knowledge_entries DROP COLUMN IF EXISTS embedding_version")
@@ -0,0 +1,79 @@
+"""Shared per-client generation for cached knowledge search results
+
+`knowledge_cache_generations` holds one counter per client that every
+statement writing knowledge_entries bumps, from statement-level triggers with
+transition tables, in the writer's own transaction. Search and facet
+requests read it before querying and cache their result under it (see
+app/db/result_cache.py). The bump becomes visible together with the data,
+so no worker can cache pre-write rows under a post-write generation. Every
+worker sees it as soon as it commits, instead of waiting out the cache TTL.
+
+Counters are upserted in client order to avoid deadlocks between
+concurrent writers. Writers of one client briefly serialize on its row,
+as they already do on the facet `total` row (migration 0007).
+
+Revision ID: 0009_knowledge_cache_generations
+Revises: 0008_knowledge_embedding_version
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0009_knowledge_cache_generations"
+down_revision: Union[str, Sequence[str], None] = "0008_knowledge_embedding_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BUMP = """
+    INSERT INTO knowledge_cache_generations AS g (client_id, generation)
+    SELECT DISTINCT client_id, 1 FROM ({clients}) c ORDER BY client_id
+    ON CONFLICT (client_id) DO UPDATE SET generation = g.generation + 1
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS knowledge_cache_generations (
+            client_id INTEGER PRIMARY KEY,
+            generation BIGINT NOT NULL
+        )
+    """)
+    inserted = BUMP.format(clients="SELECT client_id FROM new_rows")
+    deleted = BUMP.format(clients="SELECT client_id FROM old_rows")
+    updated = BUMP.format(clients="SELECT client_id FROM new_rows UNION SELECT client_id FROM old_rows")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION knowledge_cache_generations_bump() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {inserted};
+            ELSIF TG_OP = 'DELETE' THEN
+                {deleted};
+            ELSE
+                {updated};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for event, referencing in (
+        ("INSERT", "NEW TABLE AS new_rows"),
+        ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+        ("DELETE", "OLD TABLE AS old_rows"),
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS knowledge_cache_generations_{event.lower()} ON knowledge_entries")
+        op.execute(f"""
+            CREATE TRIGGER knowledge_cache_generations_{event.lower()}
+            AFTER {event} ON knowledge_entries
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION knowledge_cache_generations_bump()
+        """)
+
+
+def downgrade() -> None:
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS knowledge_cache_generations_{event} ON knowledge_entries")
+    op.execute("DROP FUNCTION IF EXISTS knowledge_cache_generations_bump()")
+    op.execute("DROP TABLE IF EXISTS knowledge_cache_generations")
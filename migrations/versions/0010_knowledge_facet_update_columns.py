@@ -0,0 +1,80 @@
+"""Only maintain facet counters on updates of faceted columns
+
+The UPDATE trigger of migration 0007 fired for every update of
+knowledge_entries, so embedding writes (the backfill, re-embedding) paid for
+two transition tables and a facet diff that always nets to zero.
+
+PostgreSQL does not allow transition tables on `UPDATE OF` triggers, so the
+UPDATE trigger becomes a row-level `AFTER UPDATE OF client_id, entry_type,
+daaeg_phase, tags, stakeholder_ids` trigger whose WHEN clause also skips rows
+where none of them changed. Statements that do not set a faceted column no
+longer fire it at all. Each changed row applies its own old/new delta, with
+upserts in key order as before. INSERT and DELETE keep their statement-level
+triggers.
+
+Revision ID: 0010_knowledge_facet_update_columns
+Revises: 0009_knowledge_cache_generations
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0010_knowledge_facet_update_columns"
+down_revision: Union[str, Sequence[str], None] = "0009_knowledge_cache_generations"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The columns knowledge_facet_values() reads, plus the client the counters belong to
+FACET_COLUMNS = ("client_id", "entry_type", "daaeg_phase", "tags", "stakeholder_ids")
+
+# Facet deltas of one row (`rec` is OLD or NEW)
+DELTAS = """
+    SELECT {rec}.client_id AS client_id, f.facet, f.value, {sign} AS delta
+    FROM knowledge_facet_values({rec}.entry_type, {rec}.daaeg_phase, {rec}.tags, {rec}.stakeholder_ids) f
+"""
+
+
+def _drop_update_trigger() -> None:
+    op.execute("DROP TRIGGER IF EXISTS knowledge_facet_counts_update ON knowledge_entries")
+
+
+def upgrade() -> None:
+    deltas = DELTAS.format(rec="NEW", sign=1) + " UNION ALL " + DELTAS.format(rec="OLD", sign=-1)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION knowledge_facet_counts_update_row() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO knowledge_facet_counts AS c (client_id, facet, value, entries)
+            SELECT client_id, facet, value, sum(delta)
+            FROM ({deltas}) d
+            GROUP BY client_id, facet, value
+            HAVING sum(delta) <> 0
+            ORDER BY client_id, facet, value
+            ON CONFLICT (client_id, facet, value) DO UPDATE SET entries = c.entries + EXCLUDED.entries;
+
+            DELETE FROM knowledge_facet_counts WHERE entries <= 0 AND client_id = OLD.client_id;
+            RETURN NULL;
+        END
+        $$
+    """)
+    changed = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in FACET_COLUMNS)
+    _drop_update_trigger()
+    op.execute(f"""
+        CREATE TRIGGER knowledge_facet_counts_update
+        AFTER UPDATE OF {", ".join(FACET_COLUMNS)} ON knowledge_entries
+        FOR EACH ROW WHEN ({changed})
+        EXECUTE FUNCTION knowledge_facet_counts_update_row()
+    """)
+
+
+def downgrade() -> None:
+    _drop_update_trigger()
+    op.execute("""
+        CREATE TRIGGER knowledge_facet_counts_update
+        AFTER UPDATE ON knowledge_entries
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION knowledge_facet_counts_apply()
+    """)
+    op.execute("DROP FUNCTION IF EXISTS knowledge_facet_counts_update_row()")
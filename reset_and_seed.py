@@ -1,8 +1,11 @@
 
+import argparse
 import psycopg2
 import secrets
 import hashlib
+import time
 from app.config.settings import settings
+from app.db.bulk import copy_knowledge_entries, copy_stakeholders
 
 def hash_password(password: str) -> tuple[str, str]:
     salt = secrets.token_hex(32)
@@ -14,7 +17,31 @@ def hash_password(password: str) -> tuple[str, str]:
     ).hex()
     return password_hash, salt
 
-def reset_and_seed():
+ENTRY_TYPES = ['meeting', 'email', 'document', 'note']
+DAAEG_PHASES = ['discover', 'assess', 'analyze', 'execute', 'grow']
+
+def _synthetic_stakeholders(client_id: int, count: int):
+    for i in range(count):
+        yield (client_id, f'Stakeholder {i}', 'Manager', f'stakeholder{i}@example.com', 'neutral', {}, None, {'seeded': True})
+
+def _synthetic_entries(client_id: int, created_by: int, stakeholder_ids: list, count: int):
+    for i in range(count):
+        linked = [stakeholder_ids[i % len(stakeholder_ids)]] if stakeholder_ids else []
+        yield (
+            client_id,
+            f'Seeded note {i}: discussed budget, timeline and risks for workstream {i % 50}.',
+            ENTRY_TYPES[i % len(ENTRY_TYPES)],
+            'seed',
+            DAAEG_PHASES[i % len(DAAEG_PHASES)],
+            [f'topic-{i % 20}', 'seeded'],
+            linked,
+            {'seeded': True, 'index': i},
+            created_by,
+            None,  # embedding, filled by the backfill (backfill_embeddings.py)
+            None,  # embedding_version
+        )
+
+def reset_and_seed(stakeholders: int = 0, entries: int = 0):
     try:
         conn = psycopg2.connect(settings.DATABASE_URL)
         cur = conn.cursor()
@@ -58,6 +85,17 @@ def reset_and_seed():
         ))
         admin = cur.fetchone()
         print(f"--> Created Admin: {admin[1]} (Password: admin123)")
+
+        # 3. Optional synthetic volume, loaded with COPY
+        stakeholder_ids = []
+        if stakeholders:
+            started = time.perf_counter()
+            stakeholder_ids = copy_stakeholders(cur, _synthetic_stakeholders(client_id, stakeholders))
+            print(f"--> Loaded {len(stakeholder_ids)} stakeholders in {time.perf_counter() - started:.1f}s")
+        if entries:
+            started = time.perf_counter()
+            entry_ids = copy_knowledge_entries(cur, _synthetic_entries(client_id, admin[0], stakeholder_ids, entries))
+            print(f"--> Loaded {len(entry_ids)} knowledge entries in {time.perf_counter() - started:.1f}s")
         
         conn.commit()
         print("✅ Database reset and seeded successfully!")
@@ -71,4 +109,8 @@ def reset_and_seed():
             conn.rollback()
 
 if __name__ == "__main__":
-    reset_and_seed()
+    parser = argparse.ArgumentParser(description="Reset the database and seed the default org and admin.")
+    parser.add_argument("--stakeholders", type=int, default=0, help="synthetic stakeholders to bulk-load")
+    parser.add_argument("--entries", type=int, default=0, help="synthetic knowledge entries to bulk-load")
+    args = parser.parse_args()
+    reset_and_seed(args.stakeholders, args.entries)
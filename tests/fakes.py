@@ -0,0 +1,51 @@
+"""In-memory stand-ins for psycopg2 connections and the connection pool."""
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_commit = False
+
+    def cursor(self, *args, **kwargs):
+        raise AssertionError("no SQL expected")
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    def __init__(self):
+        self.checked_out = []
+        self.returned = []
+
+    def getconn(self):
+        conn = FakeConnection()
+        self.checked_out.append(conn)
+        return conn
+
+    def putconn(self, conn, discard=False):
+        self.returned.append(conn)
+
+
+class FakeCursor:
+    """Records statements and returns `row` from fetchone."""
+
+    def __init__(self, row=None):
+        self.connection = object()  # no prepared_statements: statements run unprepared
+        self.executed = []
+        self.row = row
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
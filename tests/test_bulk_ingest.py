@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.config.settings import settings
+from app.db.unit_of_work import current_unit_of_work, unit_of_work
+from app.service.knowledge_service import KnowledgeService
+from tests.fakes import FakePool
+
+USER = {"user_id": 7, "role": "super_admin", "client_access": []}
+
+
+async def _records(count):
+    for i in range(count):
+        yield {"clientId": 1, "content": f"entry {i}", "entryType": "note"}
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Stands in for bulk_create_entries; records the unit of work of every batch."""
+    seen = []
+
+    def bulk_create_entries(payloads, created_by):
+        uow = current_unit_of_work()
+        seen.append(uow)
+        if len(seen) == 2:
+            # What conn.rollback() does to the unit of work in the real method
+            uow.rollback_only = True
+            raise RuntimeError("batch failed")
+        uow.on_commit(lambda: uow.committed.append(True))
+        uow.committed = []
+        return [len(seen) * 100 + i for i in range(len(payloads))]
+
+    monkeypatch.setattr(settings, "KNOWLEDGE_BULK_BATCH_ROWS", 2)
+    monkeypatch.setattr(KnowledgeService, "_has_client_access", staticmethod(lambda client_id, user: True))
+    monkeypatch.setattr(KnowledgeService, "bulk_create_entries", staticmethod(bulk_create_entries))
+    return seen
+
+
+def test_every_batch_commits_outside_the_request_unit_of_work(batches):
+    with unit_of_work(FakePool()) as request_uow:
+        asyncio.run(KnowledgeService.ingest_entries_async(_records(5), USER))
+
+    assert len(batches) == 3
+    assert request_uow not in batches
+    assert len({id(uow) for uow in batches}) == 3
+    assert batches[0].committed == [True] and batches[2].committed == [True]
+
+
+def test_failed_batch_only_fails_its_own_rows(batches):
+    with unit_of_work(FakePool()) as request_uow:
+        result = asyncio.run(KnowledgeService.ingest_entries_async(_records(5), USER))
+        assert not request_uow.rollback_only
+
+    assert result["inserted"] == 3
+    assert result["failed"] == 2
+    assert [row["id"] for row in result["results"]] == [100, 101, None, None, 300]
+    assert all("batch failed" in row["error"] for row in result["results"][2:4])
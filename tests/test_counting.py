@@ -0,0 +1,59 @@
+import pytest
+
+from app.config.settings import settings
+from app.db.counting import count_statement, read_total, run_count, total_pages, window_total
+from tests.fakes import FakeCursor
+
+QUERY = "SELECT 1 FROM clients c WHERE c.industry = %s"
+
+
+def test_exact_counts_the_whole_query():
+    sql, params = count_statement("exact", QUERY, ["Retail"])
+    assert sql == f"SELECT COUNT(*) FROM ({QUERY}) AS sub"
+    assert params == ["Retail"]
+
+
+def test_capped_stops_one_row_past_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "COUNT_CAP", 100)
+    sql, params = count_statement("capped", QUERY, ["Retail"])
+    assert sql == f"SELECT COUNT(*) FROM ({QUERY} LIMIT %s) AS sub"
+    assert params == ["Retail", 101]
+
+    assert read_total("capped", 100) == 100
+    assert read_total("capped", 101) == "100+"
+
+
+def test_estimate_reads_the_planner_row_count():
+    sql, params = count_statement("estimate", QUERY, ["Retail"])
+    assert sql == f"EXPLAIN (FORMAT JSON) {QUERY}"
+    plan = [{"Plan": {"Plan Rows": 4200}}]
+    assert read_total("estimate", plan) == 4200
+    assert read_total("estimate", '[{"Plan": {"Plan Rows": 4200}}]') == 4200
+
+
+@pytest.mark.parametrize("mode", ["window", "none"])
+def test_window_and_none_need_no_count_statement(mode):
+    assert count_statement(mode, QUERY, []) is None
+
+
+def test_run_count_executes_the_statement():
+    cur = FakeCursor(row=(42,))
+    assert run_count(cur, "exact", count_statement("exact", QUERY, ["Retail"]), label="client_count") == 42
+    assert cur.executed == [(f"SELECT COUNT(*) FROM ({QUERY}) AS sub", ("Retail",))]
+
+    cur = FakeCursor(row=([{"Plan": {"Plan Rows": 7}}],))
+    assert run_count(cur, "estimate", count_statement("estimate", QUERY, []), label="client_count") == 7
+
+
+def test_window_total_comes_from_the_last_column():
+    assert window_total([(1, "a", 57), (2, "b", 57)], offset=0) == 57
+    assert window_total([], offset=0) == 0
+    # Past the last page the window saw nothing: the caller counts separately
+    assert window_total([], offset=40) is None
+
+
+def test_total_pages_only_for_numeric_totals():
+    assert total_pages(41, 20) == 3
+    assert total_pages(0, 20) == 0
+    assert total_pages("1000+", 20) is None
+    assert total_pages(None, 20) is None
@@ -0,0 +1,71 @@
+import numpy as np
+
+from app.vector.hnsw import ENTRY_POINT, NEXT_ID, TOP_LEVEL, HNSWIndex
+
+
+def unit_vectors(n, dim=16, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_index(tmp_path, n=50):
+    index = HNSWIndex.create(tmp_path / "index", dim=16, m=8, ef_construction=64, capacity=16)
+    vectors = unit_vectors(n)
+    assert index.add(np.arange(1, n + 1), vectors) == n
+    return index, vectors
+
+
+def test_nearest_neighbour_of_an_indexed_vector_is_itself(tmp_path):
+    index, vectors = make_index(tmp_path)
+    ids, scores = index.top_k(vectors[9], 1, ef=64)
+    assert ids[0, 0] == 10
+    assert scores[0, 0] > 0.999
+
+
+def test_re_adding_indexed_ids_is_skipped(tmp_path):
+    index, vectors = make_index(tmp_path)
+    assert index.add([5, 6], vectors[4:6]) == 0
+    assert len(index) == 50
+
+
+def test_new_ids_take_the_fast_path_and_are_recorded(tmp_path):
+    index, _ = make_index(tmp_path)
+    assert int(index._header[NEXT_ID]) == 51
+    assert index.add([51, 52], unit_vectors(2, seed=1)) == 2
+    assert int(index._header[NEXT_ID]) == 53
+
+
+def test_indexes_without_next_id_still_skip_duplicates(tmp_path):
+    index, vectors = make_index(tmp_path)
+    index._header[NEXT_ID] = 0  # as built before the field existed
+    assert index.add([50], vectors[49:50]) == 0
+    assert int(index._header[NEXT_ID]) == 51
+
+
+def test_removed_entries_are_not_returned_and_can_be_re_added(tmp_path):
+    index, vectors = make_index(tmp_path)
+    assert index.remove([10]) == 1
+    ids, _ = index.top_k(vectors[9], 5, ef=64)
+    assert 10 not in ids[0]
+
+    assert index.add([10], vectors[9:10]) == 1
+    ids, _ = index.top_k(vectors[9], 1, ef=64)
+    assert ids[0, 0] == 10
+
+
+def test_search_remaps_when_the_entry_point_is_beyond_the_mapping(tmp_path):
+    vectors = unit_vectors(50)
+    writer = HNSWIndex.create(tmp_path / "index", dim=16, m=8, ef_construction=64, capacity=16)
+    writer.add(np.arange(1, 11), vectors[:10])
+    reader = HNSWIndex(tmp_path / "index")
+    writer.add(np.arange(11, 51), vectors[10:])
+    # Make one of the nodes the grow added the entry point
+    node = 16 + int(np.argmax(writer._levels[16:50]))
+    writer._header[ENTRY_POINT] = node
+    writer._header[TOP_LEVEL] = int(writer._levels[node])
+
+    # The files grow between the reader's refresh and its read of the entry point
+    refresh, skipped = reader._refresh, []
+    reader._refresh = lambda: refresh() if skipped else skipped.append(True)
+    ids, _ = reader.top_k(vectors[29], 1, ef=64)
+    assert ids[0, 0] == 30
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from app.vector import matrix_cache
+from app.vector.embedder import EMBEDDING_DIM
+from app.vector.matrix_cache import ClientMatrix, EmbeddingMatrixCache
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Shared state seen by every worker: the client's generation, and the loads made."""
+    state = {"generation": 0, "loads": 0}
+
+    def load_client_matrix(client_id):
+        state["loads"] += 1
+        return ClientMatrix(np.zeros(0, dtype=np.int64), np.zeros((0, EMBEDDING_DIM), dtype=np.float32), state["generation"])
+
+    monkeypatch.setattr(matrix_cache, "load_client_matrix", load_client_matrix)
+    return state
+
+
+def test_matrix_is_reused_while_the_generation_holds(database):
+    cache = EmbeddingMatrixCache()
+    first = cache.get(1, 0)
+    assert cache.get(1, 0) is first
+    assert database["loads"] == 1
+
+
+def test_write_in_another_worker_rebuilds_on_the_next_search(database):
+    # Two workers; the write goes through neither's on_commit invalidation
+    worker, other = EmbeddingMatrixCache(), EmbeddingMatrixCache()
+    worker.get(1, 0)
+    other.get(1, 0)
+
+    database["generation"] = 1
+    assert worker.get(1, 1).generation == 1
+    assert database["loads"] == 3
+
+
+def test_generation_from_a_lagging_replica_keeps_the_newer_matrix(database):
+    cache = EmbeddingMatrixCache()
+    database["generation"] = 5
+    matrix = cache.get(1, 5)
+    assert cache.get(1, 4) is matrix
+    assert database["loads"] == 1
+
+
+def test_matrices_older_than_the_ttl_are_rebuilt(database):
+    cache = EmbeddingMatrixCache(ttl=0)
+    cache.get(1, 0)
+    cache.get(1, 0)
+    assert database["loads"] == 2
@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+from pydantic import BaseModel
+
+from app.utils.responses import streaming_api_response
+
+
+class Item(BaseModel):
+    id: int
+
+
+async def _body(response) -> dict:
+    chunks = [chunk async for chunk in response.body_iterator]
+    return json.loads(b"".join(chunks))
+
+
+def test_async_batches_are_streamed_and_closed():
+    closed = []
+
+    async def batches():
+        try:
+            yield [Item(id=1), Item(id=2)]
+            yield []
+            yield [Item(id=3)]
+        finally:
+            closed.append(True)
+
+    async def run():
+        return await _body(await streaming_api_response(batches(), message="ok"))
+
+    body = asyncio.run(run())
+    assert body["data"] == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert body["success"] is True
+    assert closed == [True]
+
+
+def test_sync_batches_still_run_in_the_threadpool():
+    async def run():
+        return await _body(await streaming_api_response(iter([[Item(id=1)]]), message="ok"))
+
+    assert asyncio.run(run())["data"] == [{"id": 1}]
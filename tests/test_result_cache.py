@@ -0,0 +1,77 @@
+from app.db.result_cache import ClientResultCache
+from app.db.unit_of_work import UnitOfWork, on_commit
+from tests.fakes import FakePool
+
+
+def test_entry_is_served_only_under_its_generation():
+    cache = ClientResultCache()
+    cache.put(1, "page", ["a"], generation=3)
+    assert cache.get(1, "page", 3) == ["a"]
+    # A write elsewhere bumped the shared generation
+    assert cache.get(1, "page", 4) is None
+    assert cache.get(1, "page", 3) is None  # the stale entry was dropped
+
+
+def test_result_computed_across_a_write_is_never_served_after_it():
+    cache = ClientResultCache()
+    generation = 7  # read before querying
+    pre_write_rows = ["old"]
+    # The writer commits (generation becomes 8) before the reader stores its result
+    cache.put(1, "page", pre_write_rows, generation)
+    assert cache.get(1, "page", 8) is None
+
+
+def test_older_generation_does_not_replace_a_newer_entry():
+    cache = ClientResultCache()
+    cache.put(1, "page", ["new"], generation=5)
+    cache.put(1, "page", ["old"], generation=4)
+    assert cache.get(1, "page", 5) == ["new"]
+
+
+def test_uncacheable_generation_is_never_stored():
+    cache = ClientResultCache()
+    cache.put(1, "page", ["uncommitted"], generation=None)
+    assert cache.get(1, "page", 0) is None
+    assert cache.get(1, "page", None) is None
+
+
+def test_entries_expire_after_ttl():
+    cache = ClientResultCache(ttl=0)
+    cache.put(1, "page", ["a"], generation=1)
+    assert cache.get(1, "page", 1) is None
+
+
+def test_invalidate_only_drops_the_client():
+    cache = ClientResultCache()
+    cache.put(1, "page", ["a"], generation=1)
+    cache.put(2, "page", ["b"], generation=1)
+    cache.invalidate(1)
+    assert cache.get(1, "page", 1) is None
+    assert cache.get(2, "page", 1) == ["b"]
+
+
+def test_local_invalidation_waits_for_the_commit():
+    cache = ClientResultCache()
+    cache.put(1, "page", ["a"], generation=1)
+    uow = UnitOfWork(FakePool())
+    on_commit(uow.connection(), lambda: cache.invalidate(1))
+    assert cache.get(1, "page", 1) == ["a"]
+
+    uow.commit()
+    assert cache.get(1, "page", 1) is None
+
+
+def test_rolled_back_write_keeps_the_cache():
+    cache = ClientResultCache()
+    cache.put(1, "page", ["a"], generation=1)
+    uow = UnitOfWork(FakePool())
+    on_commit(uow.connection(), lambda: cache.invalidate(1))
+
+    uow.rollback()
+    assert cache.get(1, "page", 1) == ["a"]
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ClientResultCache(enabled=False)
+    cache.put(1, "page", ["a"], generation=1)
+    assert cache.get(1, "page", 1) is None
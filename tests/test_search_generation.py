@@ -0,0 +1,74 @@
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import cycle
+
+import pytest
+
+from app.db.result_cache import ClientResultCache
+from app.dto.core import KnowledgeSearchRequest
+from app.service import knowledge_service
+from app.service.knowledge_service import KnowledgeService
+
+FILTERS = KnowledgeSearchRequest(clientId=1, query="renewal")
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def one(self):
+        return self.value
+
+    def scalar_one(self):
+        return self.value
+
+    def fetchall(self):
+        return []
+
+
+class FakeReplica:
+    """A replica whose rows are as of `generation` (its count is the generation too)."""
+
+    def __init__(self, generation):
+        self.generation = generation
+
+    async def execute(self, statement, params=None):
+        if "knowledge_cache_generations" in str(statement):
+            return FakeResult((self.generation, False))
+        return FakeResult(self.generation)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ClientResultCache(ttl=60)
+    # Round robin between a replica that caught up with the write (generation 2) and one that lags
+    replicas = cycle([FakeReplica(2), FakeReplica(1)])
+
+    @asynccontextmanager
+    async def read_connection():
+        yield next(replicas)
+
+    monkeypatch.setattr(knowledge_service, "search_cache", cache)
+    monkeypatch.setattr(knowledge_service, "read_connection", read_connection)
+    monkeypatch.setattr(KnowledgeService, "_check_client_access", staticmethod(lambda filters, user: None))
+    return cache
+
+
+def test_page_from_a_lagging_replica_is_not_cached_under_a_newer_generation(cache):
+    async def search():
+        return await KnowledgeService.search_entries_async(FILTERS, {})
+
+    totals = [asyncio.run(search())["total"] for _ in range(4)]
+    # Every page comes from the connection its generation was read on
+    assert totals == [2, 1, 2, 1]
+
+    cached = cache.get(1, KnowledgeService._cache_key(FILTERS), 2)
+    assert cached is None or cached["total"] == 2
+
+
+def test_cached_page_is_served_for_its_own_generation(cache):
+    async def search():
+        return await KnowledgeService.search_entries_async(FILTERS, {})
+
+    asyncio.run(search())
+    assert cache.get(1, KnowledgeService._cache_key(FILTERS), 2)["total"] == 2
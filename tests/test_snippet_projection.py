@@ -0,0 +1,24 @@
+from app.config.settings import settings
+from app.dto.core import HIGHLIGHT_START, HIGHLIGHT_STOP, KnowledgeSearchRequest
+from app.service.knowledge_service import KnowledgeService
+
+
+def test_headline_marks_matches_with_non_html_markers(monkeypatch):
+    # A configured StartSel/StopSel must not bring HTML back
+    monkeypatch.setattr(settings, "KNOWLEDGE_HEADLINE_OPTIONS", "MaxWords=20, StartSel=<b>, StopSel=</b>")
+    filters = KnowledgeSearchRequest(clientId=1, query="renewal", mode="fulltext", projection="snippet")
+    columns, params = KnowledgeService._projection(filters)
+
+    assert "ts_headline" in columns
+    markers, query, options = params
+    assert markers == HIGHLIGHT_START + HIGHLIGHT_STOP
+    assert query == "renewal"
+    assert options.endswith(f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}"')
+
+
+def test_every_snippet_strips_markers_from_the_content():
+    for query, mode in ((None, "fulltext"), ("renewal", "substring"), ("renewal", "fulltext")):
+        filters = KnowledgeSearchRequest(clientId=1, query=query, mode=mode, projection="snippet")
+        columns, params = KnowledgeService._projection(filters)
+        assert "translate(content, %s, '')" in columns
+        assert params[0] == HIGHLIGHT_START + HIGHLIGHT_STOP
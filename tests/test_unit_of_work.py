@@ -0,0 +1,115 @@
+import pytest
+
+from app.db.unit_of_work import UnitOfWork, UnitOfWorkConnection, on_commit, savepoint, unit_of_work
+from tests.fakes import FakeConnection, FakeCursor, FakePool
+
+
+def test_service_commit_is_deferred_to_the_unit_of_work():
+    pool = FakePool()
+    uow = UnitOfWork(pool)
+    conn = uow.connection()
+    conn.commit()
+    assert pool.checked_out[0].commits == 0
+
+    uow.commit()
+    assert pool.checked_out[0].commits == 1
+    assert pool.returned == pool.checked_out
+
+
+def test_every_call_shares_one_connection():
+    uow = UnitOfWork(FakePool())
+    assert uow.connection() is uow.connection()
+
+
+def test_on_commit_runs_after_the_real_commit():
+    pool = FakePool()
+    uow = UnitOfWork(pool)
+    conn = uow.connection()
+    seen = []
+    on_commit(conn, lambda: seen.append(pool.checked_out[0].commits))
+    assert seen == []
+
+    uow.commit()
+    assert seen == [1]
+
+
+def test_service_rollback_marks_the_unit_of_work_and_drops_callbacks():
+    pool = FakePool()
+    uow = UnitOfWork(pool)
+    conn = uow.connection()
+    seen = []
+    on_commit(conn, lambda: seen.append("sent"))
+    conn.rollback()
+    assert uow.rollback_only
+    assert uow.failed
+
+    uow.commit()
+    assert seen == []
+    assert pool.checked_out[0].commits == 0
+    assert pool.returned == pool.checked_out
+
+
+def test_failed_commit_drops_callbacks_and_raises():
+    pool = FakePool()
+    uow = UnitOfWork(pool)
+    conn = uow.connection()
+    pool.checked_out[0].fail_commit = True
+    seen = []
+    on_commit(conn, lambda: seen.append("sent"))
+
+    with pytest.raises(RuntimeError):
+        uow.commit()
+    assert seen == []
+    assert pool.checked_out[0].rollbacks == 1
+    assert pool.returned == pool.checked_out
+
+
+def test_failing_callback_does_not_undo_the_commit():
+    pool = FakePool()
+    uow = UnitOfWork(pool)
+    conn = uow.connection()
+    seen = []
+    on_commit(conn, lambda: 1 / 0)
+    on_commit(conn, lambda: seen.append("second"))
+
+    uow.commit()
+    assert pool.checked_out[0].commits == 1
+    assert seen == ["second"]
+
+
+def test_on_commit_outside_a_unit_of_work_runs_immediately():
+    seen = []
+    on_commit(FakeConnection(), lambda: seen.append("now"))
+    assert seen == ["now"]
+
+
+def test_unit_of_work_block_commits_or_rolls_back():
+    pool = FakePool()
+    with unit_of_work(pool) as uow:
+        assert isinstance(uow.connection(), UnitOfWorkConnection)
+    assert pool.checked_out[0].commits == 1
+
+    with pytest.raises(ValueError):
+        with unit_of_work(pool) as uow:
+            uow.connection()
+            raise ValueError("boom")
+    assert pool.checked_out[1].commits == 0
+    assert pool.checked_out[1].rollbacks == 1
+
+
+def test_failed_read_in_a_savepoint_keeps_the_unit_of_work_committable():
+    pool = FakePool()
+    uow = UnitOfWork(pool)
+    conn = uow.connection()
+    cur = FakeCursor()
+    pool.checked_out[0].cursor = lambda: cur
+
+    with pytest.raises(RuntimeError):
+        with savepoint(conn, "lookup"):
+            raise RuntimeError("lookup failed")
+    assert [sql for sql, _ in cur.executed] == ["SAVEPOINT lookup", "ROLLBACK TO SAVEPOINT lookup"]
+    assert not uow.rollback_only
+
+    uow.commit()
+    assert pool.checked_out[0].commits == 1
+